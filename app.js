@@ -205,17 +205,28 @@ function renderSystemFromPreflight() {
 (async function(){
   try{
     uiLog('fetching json…');
-    const [hist, spot] = await Promise.all([
-      fetch('data/history.json'+nowBust()).then(r=>r.json()).catch(()=>({history:[]})),
-      fetch('data/spot.json'+nowBust()).then(r=>r.json()).catch(()=>({XAUUSD:null,timestamp:null}))
+    const [spot, an, anl] = await Promise.all([
+      fetch('data/spot.json'+nowBust()).then(r=>r.json()).catch(()=>({XAUUSD:null,timestamp:null})),
+      fetch('data/analytics.json'+nowBust()).then(r=>r.ok ? r.json() : null).catch(()=>null),
+      fetch('data/analogs.json'+nowBust()).then(r=>r.ok ? r.json() : null).catch(()=>null)
     ]);
+    // Vorberechnet von scripts/analytics.py; fehlt die Datei, wird wie bisher im Browser gerechnet
+    const pre = (an && an.latestDelta && an.forecast) ? an : null;
+    uiLog(pre ? `analytics.json: ${pre.history_end}` : 'analytics.json fehlt – Berechnung im Browser');
+
+    // Historie nur laden, wenn analytics.json oder analogs.json fehlt (Seitenaufbau unabhängig von der Länge)
+    const needHistory = !pre || !(anl && Array.isArray(anl.hits));
+    const hist = needHistory
+      ? await (window.loadHistory ? window.loadHistory() : fetch('data/history.json'+nowBust()).then(r=>r.json())).catch(()=>({history:[]}))
+      : {history:[]};
 
     // Spot
     const spotVal = (spot && spot.XAUUSD!=null) ? Number(spot.XAUUSD) : null;
     document.getElementById('spotline').textContent = `Spot: ${Number.isFinite(spotVal) ? spotVal.toFixed(2)+' USD/kg' : '—'}`;
 
-    // Rows
-    const rows = (hist.history||[]).map(r=>({
+    // Rows, Goldserie und Serien erst bei Bedarf (Fallback-Pfade)
+    let _rows=null, _gold=null, _series=null;
+    const rows = () => _rows ??= (hist.history||[]).map(r=>({
       date: r.timestamp,
       GOLD: (r.GOLDAMGBD228NLBM ?? null),
       DFII10: r.DFII10 ?? null,
@@ -228,28 +239,27 @@ function renderSystemFromPreflight() {
       RECPROUSM156N: r.RECPROUSM156N ?? null,
       T10Y2Y: r.T10Y2Y ?? null
     })).sort((a,b)=> new Date(a.date)-new Date(b.date));
+    const goldSeries = () => _gold ??= rows().filter(r=>Number.isFinite(r.GOLD)).map(r=>({date:r.date, price:r.GOLD}));
+    const seriesMap = () => _series ??= buildSeriesMap(rows());
+    if(needHistory) uiLog(`loaded: rows=${rows().length}, goldPoints=${goldSeries().length}`);
 
-    const goldSeries = rows.filter(r=>Number.isFinite(r.GOLD)).map(r=>({date:r.date, price:r.GOLD}));
-    uiLog(`loaded: rows=${rows.length}, goldPoints=${goldSeries.length}`);
-
-    // Serien & Indexfinder
-    const seriesMap = buildSeriesMap(rows);
-    const indexFinders = {};
-    for(const k of DRIVER_KEYS){ indexFinders[k] = dateToSeriesIndex(seriesMap[k]); }
+    // letzter Goldpreis (Prognose in %): vorberechnet oder aus der Serie
+    const gs = pre ? null : goldSeries();
+    const lastGold = pre ? (pre.gold?.price ?? null) : (gs.length ? gs[gs.length-1].price : null);
 
     // Momentum
-    let momentum=0;
-    if(goldSeries.length>10){
-      const last=goldSeries[goldSeries.length-1].price;
-      const prev=goldSeries[goldSeries.length-11].price;
+    let momentum = pre ? pre.momentum : 0;
+    if(!pre && gs.length>10){
+      const last=gs[gs.length-1].price;
+      const prev=gs[gs.length-11].price;
       if(Number.isFinite(last) && Number.isFinite(prev) && prev>0) momentum = Math.log(last/prev)/10;
     }
 
     // Aktuelle Deltas
-    const latestDelta = {};
-    for(const k of DRIVER_KEYS){
+    const latestDelta = pre ? pre.latestDelta : {};
+    if(!pre) for(const k of DRIVER_KEYS){
       const cfg = FREQ[k];
-      const arr = seriesMap[k];
+      const arr = seriesMap()[k];
       if(!cfg || !arr || !arr.length){ latestDelta[k]=null; continue; }
       if(cfg.type==="monthly") latestDelta[k] = currentDeltaMonthly(arr);
       else latestDelta[k] = currentDeltaFromSeries(arr, cfg.steps);
@@ -263,7 +273,7 @@ function renderSystemFromPreflight() {
     };
 
     // Bewertung & Anzeige
-    const assess = assessDrivers(latestDelta);
+    const assess = pre ? pre.assess : assessDrivers(latestDelta);
 
     function driverItem(key){
       const a = assess[key]||{status:"neutral",msg:"Neutral"};
@@ -290,11 +300,11 @@ function renderSystemFromPreflight() {
     GROUPS.risk.forEach(k  => $risk.appendChild(driverItem(k)));
     GROUPS.real.forEach(k  => $real.appendChild(driverItem(k)));
 
-    const sum = summarize(assess);
+    const sum = pre ? pre.summary : summarize(assess);
     document.getElementById('drivers-sum').textContent = `In Summe: ${sum.text}`;
 
     // Ampel-Empfehlung (Header)
-    const rec = recommendation(sum.overall, momentum);
+    const rec = pre ? pre.recommendation : recommendation(sum.overall, momentum);
     document.getElementById('sig-dot').className = `dot ${rec.status}`;
     document.getElementById('sig-text').textContent = rec.text;
 
@@ -303,8 +313,8 @@ function renderSystemFromPreflight() {
     const $fc = document.getElementById('forecast');
     $fc.innerHTML = '';
     horizons.forEach(h=>{
-      const f = forecast(goldSeries, h);
-      const last = goldSeries.length ? goldSeries[goldSeries.length-1].price : null;
+      const f = pre ? pre.forecast[h] : forecast(gs, h);
+      const last = lastGold;
       const medPct = (Number.isFinite(f.median) && Number.isFinite(last) && last>0) ? (f.median/last - 1) : null;
       const status = (!Number.isFinite(medPct) ? 'neutral' : medPct>0.02 ? 'green' : medPct<-0.02 ? 'red' : 'yellow');
       const bandLo = (Number.isFinite(f.lo) && Number.isFinite(f.median) && f.median>0) ? (100*(f.lo/f.median - 1)).toFixed(1)+'%' : '—';
@@ -318,55 +328,64 @@ function renderSystemFromPreflight() {
       $fc.appendChild(wrap);
     });
 
-    // Historischer Vergleich (unverändert)
+    // Historischer Vergleich (vorberechnet von scripts/analogs.py, sonst im Browser)
     const $an = document.getElementById('analogs');
     $an.innerHTML = '';
 
-    const deltaRows = rows.map(r=>{
-      const d = {timestamp:r.date};
-      for(const k of DRIVER_KEYS){
-        const cfg=FREQ[k], arr=seriesMap[k], idxF=dateToSeriesIndex(seriesMap[k]||[]);
-        d[k] = (!cfg||!arr||!arr.length) ? null
-              : historicalDeltaAtDate(arr, idxF, cfg.steps, r.date, cfg.type==="monthly");
+    const scored = (anl && Array.isArray(anl.hits))
+      ? anl.hits.map(h=>({date:h.date, sim:h.sim, p90:h.fwd_pct?.["90"] ?? null}))
+      : scoreAnalogsInBrowser();
+
+    function scoreAnalogsInBrowser(){
+      const sm = seriesMap();
+      const deltaRows = rows().map(r=>{
+        const d = {timestamp:r.date};
+        for(const k of DRIVER_KEYS){
+          const cfg=FREQ[k], arr=sm[k], idxF=dateToSeriesIndex(sm[k]||[]);
+          d[k] = (!cfg||!arr||!arr.length) ? null
+                : historicalDeltaAtDate(arr, idxF, cfg.steps, r.date, cfg.type==="monthly");
+        }
+        return d;
+      });
+
+      const refStats = pre ? pre.refStats : {};
+      if(!pre) for(const k of DRIVER_KEYS){
+        const vals = deltaRows.map(d=>d[k]).filter(v=>Number.isFinite(v));
+        const m = vals.length? vals.reduce((a,b)=>a+b,0)/vals.length : 0;
+        const s = vals.length? Math.sqrt(vals.reduce((a,b)=>a+(b-m)*(b-m),0)/vals.length) : 1;
+        refStats[k]={mean:m,std:s||1e-9};
       }
-      return d;
-    });
-
-    const refStats={};
-    for(const k of DRIVER_KEYS){
-      const vals = deltaRows.map(d=>d[k]).filter(v=>Number.isFinite(v));
-      const m = vals.length? vals.reduce((a,b)=>a+b,0)/vals.length : 0;
-      const s = vals.length? Math.sqrt(vals.reduce((a,b)=>a+(b-m)*(b-m),0)/vals.length) : 1;
-      refStats[k]={mean:m,std:s||1e-9};
-    }
-    const currentZ = zscoreVector(latestDelta, refStats);
-
-    const cutoff = rows.length-60;
-    const scored=[];
-    for(let i=20;i<cutoff;i++){
-      const vecZ = zscoreVector(deltaRows[i], refStats);
-      const sim = cosineOverlap(currentZ, vecZ);
-      if(sim>-1) scored.push({i, sim, date: rows[i].date});
+      const currentZ = zscoreVector(latestDelta, refStats);
+
+      const cutoff = rows().length-60;
+      const scored=[];
+      for(let i=20;i<cutoff;i++){
+        const vecZ = zscoreVector(deltaRows[i], refStats);
+        const sim = cosineOverlap(currentZ, vecZ);
+        if(sim>-1) scored.push({i, sim, date: rows()[i].date});
+      }
+      scored.sort((a,b)=>b.sim - a.sim);
+      return scored;
     }
-    scored.sort((a,b)=>b.sim - a.sim);
 
     function perf90d(dateStr){
-      let baseIdx = goldSeries.findIndex(g=>g.date>=dateStr);
+      const gold = goldSeries();
+      let baseIdx = gold.findIndex(g=>g.date>=dateStr);
       if(baseIdx>=0){
         const fwd = baseIdx+90;
-        if(fwd < goldSeries.length){
-          const r = goldSeries[baseIdx], f = goldSeries[fwd];
+        if(fwd < gold.length){
+          const r = gold[baseIdx], f = gold[fwd];
           return ((f.price/r.price - 1)*100);
         }
       }
       return null;
     }
 
-    const threshold = 0.60;
+    const threshold = anl?.threshold ?? 0.60;
     let shown = 0;
     const top = scored.filter(s=>s.sim>=threshold).slice(0,3);
     top.forEach(hit=>{
-      const p90 = perf90d(hit.date);
+      const p90 = ('p90' in hit) ? hit.p90 : perf90d(hit.date);
       const div=document.createElement('div'); div.className='driver';
       const mo = new Date(hit.date).toLocaleDateString('de-DE',{year:'numeric',month:'long'});
       div.innerHTML=`<div><strong>Ähnlich zu ${mo}</strong><div class="muted">Ähnlichkeit: ${(100*hit.sim).toFixed(0)}%</div></div><div class="pill">90-Tage: ${Number.isFinite(p90)? p90.toFixed(1)+'%':'—'}</div>`;
@@ -378,7 +397,7 @@ function renderSystemFromPreflight() {
       const div=document.createElement('div'); div.className='driver';
       if(best){
         const mo = new Date(best.date).toLocaleDateString('de-DE',{year:'numeric',month:'long'});
-        const p90 = perf90d(best.date);
+        const p90 = ('p90' in best) ? best.p90 : perf90d(best.date);
         div.innerHTML=`<div><strong>Nächster Treffer: ${mo}</strong><div class="muted">Ähnlichkeit: ${(100*(Math.max(0,best.sim))).toFixed(0)}% (keine klare Analogie)</div></div><div class="pill">90-Tage: ${Number.isFinite(p90)? p90.toFixed(1)+'%':'—'}</div>`;
       } else {
         div.innerHTML=`<div><strong>Keine Historie vergleichbar</strong><div class="muted">Zu wenig verwertbare Treiberdaten</div></div><div class="pill">—</div>`;
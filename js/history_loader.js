@@ -0,0 +1,75 @@
+// js/history_loader.js
+// Lädt die Historie aus dem Spaltenformat (data/history/, siehe scripts/history_columnar.py)
+// und baut daraus wieder { history: [Zeilen] } wie in data/history.json.
+// - nur manifest.json mit Cache-Busting; die Jahrespartitionen tragen einen Inhalts-Hash
+//   im Namen und werden normal gecacht (abgeschlossene Jahre ändern sich nie)
+// - .json.gz wird per DecompressionStream entpackt (GitHub Pages setzt kein Content-Encoding),
+//   sonst die unkomprimierte .json
+// - Fallback: data/history.json
+// window.loadHistory() liefert ein gemeinsames Promise (app.js; preflight.js nur ohne manifest.json).
+
+(function () {
+  const BASE = "data/history/";
+  const DAY_MS = 86400000;
+  let pending = null;
+
+  async function fetchPartition(file) {
+    if (typeof DecompressionStream === "function") {
+      try {
+        const r = await fetch(BASE + file + ".gz");
+        if (r.ok) {
+          const text = await new Response(r.body.pipeThrough(new DecompressionStream("gzip"))).text();
+          return JSON.parse(text);
+        }
+      } catch (e) { /* z. B. Server hat bereits entpackt → unkomprimiert laden */ }
+    }
+    const r = await fetch(BASE + file);
+    if (!r.ok) throw new Error(`${file} ${r.status}`);
+    return r.json();
+  }
+
+  function decodeValues(enc) {
+    const out = new Array(enc.d.length);
+    let prev = null;
+    for (let i = 0; i < enc.d.length; i++) {
+      const x = enc.d[i];
+      if (x === null) { out[i] = null; continue; }
+      prev = prev === null ? x : prev + x;
+      out[i] = prev / enc.scale;
+    }
+    return out;
+  }
+
+  function decodePartition(part, series) {
+    const cols = {};
+    for (const k of series) cols[k] = part.series[k] ? decodeValues(part.series[k]) : null;
+    const rows = new Array(part.dd.length);
+    let t = Date.parse(part.start + "T00:00:00Z");
+    for (let i = 0; i < part.dd.length; i++) {
+      if (i > 0) t += part.dd[i] * DAY_MS;
+      const row = { timestamp: new Date(t).toISOString().slice(0, 10) };
+      for (const k of series) row[k] = cols[k] ? cols[k][i] : null;
+      rows[i] = row;
+    }
+    return rows;
+  }
+
+  async function loadColumnar() {
+    const r = await fetch(BASE + "manifest.json?t=" + Date.now());
+    if (!r.ok) throw new Error(`manifest.json ${r.status}`);
+    const man = await r.json();
+    const parts = await Promise.all(man.partitions.map(p => fetchPartition(p.file)));
+    return { history: [].concat(...parts.map(p => decodePartition(p, man.series))) };
+  }
+
+  async function loadLegacy() {
+    const r = await fetch("data/history.json?t=" + Date.now());
+    return r.json();
+  }
+
+  window.loadHistory = function () {
+    if (!pending) pending = loadColumnar().catch(() => loadLegacy());
+    return pending;
+  };
+  window.HistoryColumnar = { decodePartition, decodeValues };
+})();
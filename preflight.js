@@ -1,5 +1,7 @@
 /* preflight.js
- * Clientseitige Datenvalidierung für history.json & spot.json.
+ * Clientseitige Datenvalidierung für die Historie & spot.json.
+ * Historie: nur data/history/manifest.json (Zeilen, Zeitraum, Partitionen) –
+ * die Zeilen selbst lädt app.js nur bei Bedarf; ohne Manifest volle Prüfung von history.json.
  * Ergebnis: window.PREFLIGHT = { ok, warnings, errors, stats }
  * Schreibt kurze Meldungen in #diag (falls vorhanden).
  */
@@ -90,6 +92,56 @@
     return { ok, errors, warnings, stats };
   }
 
+  /** Validiert data/history/manifest.json (statt aller Zeilen) */
+  function validateManifest(man) {
+    const errors = [];
+    const warnings = [];
+    const stats = { rows: 0, start: null, end: null, partitions: 0, source: "manifest" };
+
+    if (!man || !Array.isArray(man.partitions) || !Array.isArray(man.series)) {
+      errors.push("manifest.json: Felder `partitions`/`series` fehlen.");
+      return { ok: false, errors, warnings, stats };
+    }
+    stats.rows = man.rows;
+    stats.start = man.start || null;
+    stats.end = man.end || null;
+    stats.partitions = man.partitions.length;
+
+    const missing = SERIES.filter(k => !man.series.includes(k));
+    if (missing.length) warnings.push(`manifest.json: Serien fehlen: ${missing.join(", ")}.`);
+    if (!man.rows) {
+      warnings.push("manifest.json: Keine Zeilen.");
+      return { ok: true, errors, warnings, stats };
+    }
+    if (!isoDateRE.test(stats.start || "") || !isoDateRE.test(stats.end || "")) {
+      errors.push("manifest.json: `start`/`end` fehlen oder sind kein YYYY-MM-DD.");
+      return { ok: false, errors, warnings, stats };
+    }
+
+    // Partitionen: lückenlos aufsteigend, Zeilensumme = rows
+    let prevEnd = "", sum = 0;
+    man.partitions.forEach((p, i) => {
+      if (!(p.start > prevEnd) || !(p.end >= p.start)) {
+        errors.push(`manifest.json: Partition ${i} (${p.file}) ist nicht strikt ansteigend.`);
+      }
+      prevEnd = p.end;
+      sum += p.rows || 0;
+    });
+    if (sum !== man.rows) errors.push(`manifest.json: Partitionen haben ${sum} Zeilen, rows=${man.rows}.`);
+    const parts = man.partitions;
+    if (parts.length && (parts[0].start !== stats.start || parts[parts.length - 1].end !== stats.end)) {
+      errors.push("manifest.json: `start`/`end` passen nicht zu den Partitionen.");
+    }
+
+    const now = Date.now();
+    const endTs = Date.parse(stats.end + "T00:00:00Z");
+    if (endTs > now + 36 * 3600 * 1000) warnings.push(`manifest.json: Letzter Tag liegt in der Zukunft (${stats.end}).`);
+    const ageDays = Math.floor((now - endTs) / 86400000);
+    if (ageDays > 5) warnings.push(`history: Letzter Tag ist ${ageDays} Tage alt (${stats.end}).`);
+
+    return { ok: errors.length === 0, errors, warnings, stats };
+  }
+
   /** Validiert spot.json */
   function validateSpot(obj) {
     const errors = [];
@@ -136,12 +188,14 @@
   async function run() {
     try {
       log("Preflight startet …");
-      const [h, s] = await Promise.all([
-        fetch("data/history.json" + bust()).then(r => r.json()),
+      const [man, s] = await Promise.all([
+        fetch("data/history/manifest.json" + bust()).then(r => r.ok ? r.json() : null).catch(() => null),
         fetch("data/spot.json" + bust()).then(r => r.json())
       ]);
 
-      const vh = validateHistory(h);
+      // Manifest reicht für Zeitraum/Zeilen; nur ohne Manifest die ganze Historie laden
+      const vh = man ? validateManifest(man) : validateHistory(
+        await (window.loadHistory ? window.loadHistory() : fetch("data/history.json" + bust()).then(r => r.json())));
       const vs = validateSpot(s);
 
       const ok = vh.ok && vs.ok;
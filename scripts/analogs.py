@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Historische Analogien ("Historischer Vergleich") vektorisiert
+
+- Delta-Matrix (Zeilen × DRIVER_KEYS) einmal aufbauen, NaN-Maske dazu
+- maskierte Kosinus-Ähnlichkeit aller Zeilen in einem Durchgang
+  (wie cosineOverlap in app.js: nur Treiber, die in beiden Vektoren vorhanden sind)
+- Top-k per argpartition, Vorwärtsrenditen 30/90/180 Goldpunkte über einen Datumsindex
+- Abfrage für jedes vergangene Datum (Backtest): refStats, Kandidaten und
+  Vorwärtsrenditen nur aus Daten bis zu diesem Tag
+
+  python scripts/analogs.py                      # aktueller Stand → data/analogs.json
+  python scripts/analogs.py --date 2020-03-16 --k 5
+"""
+
+from __future__ import annotations
+import argparse, json, sys, time
+from pathlib import Path
+
+import numpy as np
+
+from analytics import DATA_DIR, GOLD_KEY, TINY, History, delta_matrix
+from fred_history import write_json_atomic
+
+HORIZONS = (30, 90, 180)
+THRESHOLD = 0.60
+MIN_ROW = 20  # wie app.js: die ersten Zeilen haben noch keine Deltas
+EXCLUDE_RECENT = 60  # jüngste Zeilen nicht als Analogie (Ergebnis noch offen)
+
+class AnalogIndex:
+    def __init__(self, h: History):
+        self.h = h
+        self.dates = h.dates
+        self.deltas = delta_matrix(h)
+        self.mask = np.isfinite(self.deltas)
+        self.deltas0 = np.where(self.mask, self.deltas, 0.0)
+        # Präfixsummen → refStats bis zu jeder Zeile in O(1) (Backtests ohne Vorgriff)
+        self._n = np.cumsum(self.mask, axis=0, dtype=float)
+        self._s = np.cumsum(self.deltas0, axis=0)
+        self._s2 = np.cumsum(self.deltas0 * self.deltas0, axis=0)
+        # Vorwärtsrenditen je Zeile: erster Goldpunkt am/nach dem Datum, dann +h Punkte
+        gd, gpx = h.series(GOLD_KEY)
+        self.gold_dates = gd
+        self.base = base = np.searchsorted(gd, self.dates, side="left")
+        self.fwd: dict[int, np.ndarray] = {}
+        for hz in HORIZONS:
+            out = np.full(len(self.dates), np.nan)
+            ok = base + hz < len(gpx)
+            out[ok] = (gpx[base[ok] + hz] / gpx[base[ok]] - 1.0) * 100.0
+            self.fwd[hz] = out
+
+    def row_at(self, date: str | None) -> int:
+        if date is None: return len(self.dates) - 1
+        return int(np.searchsorted(self.dates, np.datetime64(date, "D"), side="right")) - 1
+
+    def stats_at(self, qi: int) -> tuple[np.ndarray, np.ndarray]:
+        """refStats (Mittel, Standardabweichung je Treiber) aus den Zeilen 0..qi."""
+        n = self._n[qi]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.where(n > 0, self._s[qi] / n, 0.0)
+            var = np.where(n > 0, self._s2[qi] / n - mean * mean, 1.0)
+        std = np.sqrt(np.maximum(var, 0.0))
+        return mean, np.where(std > 0, std, TINY)
+
+    def similarities(self, qi: int) -> np.ndarray:
+        """Ähnlichkeit der Zeile qi zu allen Zeilen bis qi (−1 = nicht vergleichbar)."""
+        mean, std = self.stats_at(qi)
+        z = (self.deltas[:qi + 1] - mean) / std
+        q = z[qi]
+        qmask = self.mask[qi]
+        q0 = np.where(qmask, q, 0.0)
+        both = self.mask[:qi + 1] & qmask
+        z0 = np.where(both, z, 0.0)
+        num = z0 @ q0
+        na = both.astype(float) @ (q0 * q0)
+        nb = (z0 * z0).sum(axis=1)
+        den = np.sqrt(na) * np.sqrt(nb)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sim = np.where((both.sum(axis=1) > 0) & (den > 0), num / den, -1.0)
+        return sim
+
+    def query(self, date: str | None = None, k: int = 10) -> dict:
+        t0 = time.perf_counter()
+        qi = self.row_at(date)
+        if qi < 0:
+            return {"query_date": date, "hits": [], "scored": 0, "score_ms": 0.0}
+        sim = self.similarities(qi)
+        cand = np.arange(MIN_ROW, max(MIN_ROW, qi + 1 - EXCLUDE_RECENT))
+        cand = cand[sim[cand] > -1]
+        if len(cand) > k:
+            part = np.argpartition(-sim[cand], k - 1)[:k]
+            cand_k = cand[part]
+        else:
+            cand_k = cand
+        # absteigend nach Ähnlichkeit, bei Gleichstand älteres Datum zuerst (wie app.js)
+        top = cand_k[np.lexsort((cand_k, -sim[cand_k]))]
+        # letzter Goldpunkt am/vor dem Stichtag: spätere Kurse kennt ein Backtest noch nicht
+        last_gold = int(np.searchsorted(self.gold_dates, self.dates[qi], side="right")) - 1
+        fwd = lambda hz, i: None if self.base[i] + hz > last_gold or np.isnan(self.fwd[hz][i]) else float(self.fwd[hz][i])
+        ms = (time.perf_counter() - t0) * 1000.0
+        return {
+            "query_date": str(self.dates[qi]),
+            "scored": int(len(cand)),
+            "score_ms": round(ms, 3),
+            "hits": [{
+                "date": str(self.dates[i]),
+                "sim": float(sim[i]),
+                "fwd_pct": {str(hz): fwd(hz, i) for hz in HORIZONS},
+            } for i in top],
+        }
+
+def payload(h: History, k: int = 10) -> dict:
+    return {"generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "threshold": THRESHOLD, "horizons": list(HORIZONS), **AnalogIndex(h).query(None, k)}
+
+def build(data_dir: Path = DATA_DIR, k: int = 10) -> dict:
+    out = payload(History.load(data_dir / "history.json"), k)
+    write_json_atomic(data_dir / "analogs.json", out, indent=1)
+    return out
+
+def main():
+    ap = argparse.ArgumentParser(description="Historische Analogien zur aktuellen (oder einer früheren) Treiberlage")
+    ap.add_argument("--date", help="Stichtag für Backtests (YYYY-MM-DD); ohne → data/analogs.json schreiben")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--json", help="Ergebnis als JSON in diese Datei")
+    args = ap.parse_args()
+
+    if args.date is None and not args.json:
+        res = build(k=args.k)
+    else:
+        res = AnalogIndex(History.load(DATA_DIR / "history.json")).query(args.date, args.k)
+        if args.json:
+            Path(args.json).write_text(json.dumps(res, ensure_ascii=False, indent=1), encoding="utf-8")
+    print(f"[analogs] Stichtag {res['query_date']}: {res['scored']} Zeilen bewertet in {res['score_ms']} ms")
+    for hit in res["hits"]:
+        f = hit["fwd_pct"]
+        fmt = lambda v: "—" if v is None else f"{v:+.1f}%"
+        print(f"  {hit['date']}  sim={hit['sim']:.3f}  30T {fmt(f['30'])}  90T {fmt(f['90'])}  180T {fmt(f['180'])}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
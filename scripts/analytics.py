@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Analytics-Stufe: rechnet aus data/history.json vor, was app.js bisher bei
+jedem Seitenaufruf neu bestimmt hat, und schreibt data/analytics.json
+
+- aktuelle Treiber-Deltas (FREQ: 10 Handelstage bzw. 1 Monat)
+- Delta-Matrix (Zeilen × DRIVER_KEYS) vektorisiert mit NumPy → refStats
+- Treiber-Ampeln, Gesamturteil, Momentum, Empfehlung
+- Prognosebänder 30/90/180 Tage
+Die Formeln entsprechen 1:1 denen in app.js (dort bleibt der Fallback).
+"""
+
+from __future__ import annotations
+import math, sys, time
+from pathlib import Path
+
+import numpy as np
+
+from fred_history import load_history, write_json_atomic
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "data"
+
+GOLD_KEY = "GOLDAMGBD228NLBM"
+DRIVER_KEYS = ("DFII10", "DTWEXBGS", "VIXCLS", "DCOILBRENTEU", "T10YIE",
+               "BAMLH0A0HYM2", "NAPM", "RECPROUSM156N", "T10Y2Y")
+FREQ = {
+    "DFII10": {"type": "daily", "steps": 10, "label": "/10T"},
+    "DTWEXBGS": {"type": "daily", "steps": 10, "label": "/10T"},
+    "VIXCLS": {"type": "daily", "steps": 10, "label": "/10T"},
+    "DCOILBRENTEU": {"type": "daily", "steps": 10, "label": "/10T"},
+    "T10YIE": {"type": "daily", "steps": 10, "label": "/10T"},
+    "BAMLH0A0HYM2": {"type": "daily", "steps": 10, "label": "/10T"},
+    "NAPM": {"type": "monthly", "steps": 1, "label": "/1M"},
+    "RECPROUSM156N": {"type": "monthly", "steps": 1, "label": "/1M"},
+    "T10Y2Y": {"type": "daily", "steps": 10, "label": "/10T"},
+}
+HORIZONS = (30, 90, 180)
+TINY = 1e-9
+
+# ------------------------------ Datenbasis --------------------------------
+
+class History:
+    """history.json spaltenweise: Datumsvektor + je Serie ein float-Array (NaN = fehlt)."""
+    def __init__(self, rows: list[dict]):
+        rows = sorted(rows, key=lambda r: r["timestamp"])
+        self.dates = np.array([r["timestamp"] for r in rows], dtype="datetime64[D]")
+        self.cols = {k: np.array([_num(r.get(k)) for r in rows], dtype=float) for k in (GOLD_KEY, *DRIVER_KEYS)}
+
+    @classmethod
+    def load(cls, path: Path) -> "History":
+        return cls(load_history(path))
+
+    def series(self, key: str) -> tuple[np.ndarray, np.ndarray]:
+        """Nur vorhandene Werte (entspricht buildSeriesMap in app.js)."""
+        v = self.cols[key]
+        ok = np.isfinite(v)
+        return self.dates[ok], v[ok]
+
+def _num(v) -> float:
+    return float(v) if isinstance(v, (int, float)) and math.isfinite(v) else math.nan
+
+def _rel_change(cur: np.ndarray, past: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d = (cur - past) / np.abs(past)
+    return np.where((np.abs(cur) < TINY) | (np.abs(past) < TINY), np.nan, d)
+
+def _steps(key: str) -> int:
+    cfg = FREQ[key]
+    return 1 if cfg["type"] == "monthly" else cfg["steps"]
+
+def latest_deltas(h: History) -> dict[str, float | None]:
+    out = {}
+    for k in DRIVER_KEYS:
+        _, v = h.series(k)
+        s = _steps(k)
+        out[k] = None if len(v) < s + 1 else _opt(_rel_change(v[-1:], v[-1 - s:-s])[0])
+    return out
+
+def delta_matrix(h: History, at: np.ndarray | None = None) -> np.ndarray:
+    """
+    Deltas aller Treiber zu jedem Datum (Standard: alle history-Zeilen) →
+    Matrix len(at) × len(DRIVER_KEYS), NaN = nicht bestimmbar.
+    Je Datum zählt der letzte vorhandene Wert bis einschließlich dieses Tages.
+    """
+    at = h.dates if at is None else at
+    out = np.full((len(at), len(DRIVER_KEYS)), np.nan)
+    for c, k in enumerate(DRIVER_KEYS):
+        d, v = h.series(k)
+        s = _steps(k)
+        if len(v) <= s: continue
+        per_obs = np.full(len(v), np.nan)
+        per_obs[s:] = _rel_change(v[s:], v[:-s])
+        j = np.searchsorted(d, at, side="right") - 1
+        ok = j >= s
+        out[ok, c] = per_obs[j[ok]]
+    return out
+
+def ref_stats(m: np.ndarray) -> dict[str, dict]:
+    out = {}
+    for c, k in enumerate(DRIVER_KEYS):
+        vals = m[:, c][np.isfinite(m[:, c])]
+        if not len(vals):
+            out[k] = {"mean": 0.0, "std": 1.0}
+            continue
+        std = float(vals.std())
+        out[k] = {"mean": float(vals.mean()), "std": std or TINY}
+    return out
+
+def zscore(m: np.ndarray, stats: dict[str, dict]) -> np.ndarray:
+    mean = np.array([stats[k]["mean"] for k in DRIVER_KEYS])
+    std = np.array([stats[k]["std"] or TINY for k in DRIVER_KEYS])
+    return (m - mean) / std
+
+# ----------------------------- Bewertung ----------------------------------
+
+def _assess(val: float | None, better_low: bool) -> dict:
+    if val is None or not math.isfinite(val):
+        return {"status": "neutral", "msg": "Neutral (keine Daten)"}
+    if better_low:
+        if val <= 0: return {"status": "green", "msg": "Gut für deinen Goldpreis"}
+        if val < 1: return {"status": "yellow", "msg": "Eher neutral"}
+        return {"status": "red", "msg": "Schlecht für deinen Goldpreis"}
+    if val >= 0: return {"status": "green", "msg": "Gut für deinen Goldpreis"}
+    if val > -1: return {"status": "yellow", "msg": "Eher neutral"}
+    return {"status": "red", "msg": "Schlecht für deinen Goldpreis"}
+
+def _neg(v: float | None) -> float:
+    # wie in app.js: -null === -0 → fehlende Werte zählen bei negierten Treibern als 0
+    return -(v or 0.0)
+
+def assess_drivers(t: dict) -> dict:
+    return {
+        "DFII10": _assess(t["DFII10"], True),
+        "DTWEXBGS": _assess(t["DTWEXBGS"], True),
+        "VIXCLS": _assess(t["VIXCLS"], False),
+        "DCOILBRENTEU": _assess(_neg(t["DCOILBRENTEU"]), True),
+        "T10YIE": _assess(t["T10YIE"], False),
+        "BAMLH0A0HYM2": _assess(t["BAMLH0A0HYM2"], False),
+        "NAPM": _assess(_neg(t["NAPM"]), True),
+        "RECPROUSM156N": _assess(t["RECPROUSM156N"], False),
+        "T10Y2Y": _assess(_neg(t["T10Y2Y"]), True),
+    }
+
+def summarize(drvs: dict) -> dict:
+    score = {"green": 2, "yellow": 1, "red": -2, "neutral": 0}
+    avg = sum(score[d["status"]] for d in drvs.values()) / max(1, len(drvs))
+    if avg >= 1: return {"overall": "green", "text": "In Summe eher positiv."}
+    if avg <= -1: return {"overall": "red", "text": "In Summe eher negativ."}
+    return {"overall": "yellow", "text": "In Summe eher neutral."}
+
+def recommendation(overall: str, momentum: float) -> dict:
+    score = (2 if overall == "green" else -2 if overall == "red" else 0) + (1 if momentum >= 0 else -1)
+    if score >= 2: return {"status": "green", "text": "Kaufen"}
+    if score <= -2: return {"status": "red", "text": "Nicht kaufen"}
+    return {"status": "yellow", "text": "Abwarten"}
+
+def momentum(px: np.ndarray) -> float:
+    if len(px) <= 10: return 0.0
+    last, prev = px[-1], px[-11]
+    if math.isfinite(last) and math.isfinite(prev) and prev > 0:
+        return float(math.log(last / prev) / 10)
+    return 0.0
+
+def forecast(px: np.ndarray, horizon: int) -> dict:
+    px = px[np.isfinite(px) & (px > 0)]
+    if len(px) < 90: return {"median": None, "lo": None, "hi": None, "medPct": None}
+    tail = np.diff(np.log(px))[-60:]
+    mu = float(tail.mean()); sigma = float(tail.std())
+    last = float(px[-1]); steps = max(1, round(horizon))
+    med = last * math.exp(mu * steps)
+    return {"median": med, "lo": last * math.exp((mu - 1.64 * sigma) * steps),
+            "hi": last * math.exp((mu + 1.64 * sigma) * steps), "medPct": med / last - 1}
+
+def _opt(v) -> float | None:
+    v = float(v)
+    return v if math.isfinite(v) else None
+
+# -------------------------------- Stufe -----------------------------------
+
+def build(h: History) -> dict:
+    gd, gpx = h.series(GOLD_KEY)
+    deltas = latest_deltas(h)
+    m = delta_matrix(h)
+    stats = ref_stats(m)
+    cur = np.array([np.nan if deltas[k] is None else deltas[k] for k in DRIVER_KEYS])
+    cur_z = zscore(cur[None, :], stats)[0]
+    assess = assess_drivers(deltas)
+    summary = summarize(assess)
+    mom = momentum(gpx)
+    return {
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "history_end": str(h.dates[-1]) if len(h.dates) else None,
+        "rows": int(len(h.dates)),
+        "gold": {"date": str(gd[-1]), "price": float(gpx[-1]), "points": int(len(gpx))} if len(gpx) else None,
+        "freq": FREQ,
+        "latestDelta": deltas,
+        "refStats": stats,
+        "currentZ": {k: _opt(v) for k, v in zip(DRIVER_KEYS, cur_z)},
+        "assess": assess,
+        "summary": summary,
+        "momentum": mom,
+        "recommendation": recommendation(summary["overall"], mom),
+        "forecast": {str(hz): forecast(gpx, hz) for hz in HORIZONS},
+    }
+
+def timed_build(h: History) -> dict:
+    t0 = time.perf_counter()
+    out = build(h)
+    out["build_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+    return out
+
+def run(data_dir: Path = DATA_DIR) -> dict:
+    out = timed_build(History.load(data_dir / "history.json"))
+    write_json_atomic(data_dir / "analytics.json", out, indent=1)
+    return out
+
+def main():
+    out = run()
+    rec = out["recommendation"]["text"]
+    print(f"[analytics] rows={out['rows']} end={out['history_end']} Empfehlung={rec} ({out['build_ms']} ms)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+End-to-End-Benchmark des Händler-Crawls (vendors_fetch.crawl) ohne Netz
+
+- Quelle: HTTP-Archiv (vendors_fetch.py --record) oder der Korpus (bench/corpus/)
+- Abspielen in-process (ReplayTransport) oder über den lokalen Mock-Server
+  (--server, echte Sockets/Keep-Alive)
+- Latenz/Jitter und Fehler-Injektion (Timeout, 503, 429) reproduzierbar über --seed
+- je Lauf: Laufzeit, Requests, Requests/s, Seiten, Items, geblockte Seiten;
+  kalt (frisches .cache/) oder --warm (Cache aus dem vorigen Durchlauf)
+Übrige Optionen gehen an vendors_fetch (z. B. --serial, --workers -1, --stream),
+damit Scheduling-Änderungen offline und reproduzierbar verglichen werden können.
+
+  python scripts/bench_crawl.py                                  # Korpus, ohne Latenz
+  python scripts/bench_crawl.py --latency 0.2 --jitter 0.1 --repeat 3
+  python scripts/bench_crawl.py --archive live.jsonl.gz --error-rate 0.1 --error-kind mix --serial
+  python scripts/bench_crawl.py --server --latency 0.05 --json bench_crawl.json
+"""
+
+from __future__ import annotations
+import argparse, asyncio, json, statistics, sys, tempfile, time
+from pathlib import Path
+
+import httpx
+
+import fetch_data as fd
+import http_replay as hr
+import vendors_fetch as vf
+
+async def run_once(vargs: argparse.Namespace, transport: httpx.AsyncBaseTransport, cache_dir: Path,
+                   spot: dict) -> dict:
+    vf.CACHE_DIR = cache_dir
+    vf.DATA_DIR = cache_dir.parent  # --refresh-only liest hier vendors_auto.json
+    vf._robots_cache.clear()
+    out = vf.new_output()
+    t0 = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport) as client:
+        await vf.crawl(out, vargs, client, spot=spot)
+    wall = time.perf_counter() - t0
+    (vf.DATA_DIR / "vendors_auto.json").write_text(json.dumps(out, ensure_ascii=False), encoding="utf-8")
+    tot = out["diagnostics"]["totals"]
+    return {"wall_s": round(wall, 3), "pages": tot["pages"], "items": tot["items"],
+            "pages_blocked": tot["pages_blocked"],
+            "items_by_domain": {v["domain"]: len(v["items"]) for v in out["vendors"]}}
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Offline-Benchmark des Händler-Crawls über ein HTTP-Archiv")
+    ap.add_argument("--archive", default="corpus", help="Archiv (.jsonl.gz) oder 'corpus' (bench/corpus/)")
+    ap.add_argument("--server", action="store_true", help="über den lokalen Mock-Server statt in-process")
+    ap.add_argument("--latency", type=float, default=0.0, help="Antwortverzögerung je Request (s)")
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="Anteil injizierter Fehler (0..1)")
+    ap.add_argument("--error-kind", choices=hr.ERROR_KINDS + ("mix",), default="timeout")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--warm", action="store_true", help=".cache/ zwischen den Durchläufen behalten")
+    ap.add_argument("--spot", type=float, default=3766.715, help="XAUUSD (USD/oz) für die Aufpreise")
+    ap.add_argument("--json", help="Report zusätzlich als JSON schreiben")
+    args, rest = ap.parse_known_args(argv)
+    vargs = vf.parse_args(["--no-history", *rest])
+
+    archive = hr.load_archive(args.archive)
+    spot = fd.spot_payload(args.spot, "2025-09-30")
+    tmp = Path(tempfile.mkdtemp(prefix="bench_crawl_"))
+    srv = None
+    runs = []
+    try:
+        for i in range(args.repeat):
+            inj = hr.Injector(args.latency, args.jitter, args.error_rate, args.error_kind, args.seed + i)
+            if args.server:
+                srv = hr.start_server(archive, injector=inj)
+                transport = hr.LocalServerTransport(f"http://127.0.0.1:{srv.server_address[1]}")
+            else:
+                transport = hr.ReplayTransport(archive, inj)
+            cache_dir = tmp / ("warm" if args.warm else f"run{i}") / ".cache"
+            res = asyncio.run(run_once(vargs, transport, cache_dir, spot))
+            if srv:
+                srv.shutdown(); srv.server_close(); srv = None
+            res.update(inj.stats)
+            res["req_per_s"] = round(res["requests"] / res["wall_s"], 1) if res["wall_s"] > 0 else None
+            runs.append(res)
+            print(f"[bench_crawl] #{i + 1}: {res['wall_s']:.2f} s, {res['requests']} Requests "
+                  f"({res['req_per_s']}/s, {res['injected']} Fehler injiziert), {res['pages']} Seiten, "
+                  f"{res['items']} Items, {res['pages_blocked']} geblockt")
+    finally:
+        if srv:
+            srv.shutdown(); srv.server_close()
+
+    walls = [r["wall_s"] for r in runs]
+    report = {"archive": args.archive, "entries": len(archive.entries), "server": args.server,
+              "latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate,
+              "error_kind": args.error_kind, "crawler_args": rest, "runs": runs,
+              "wall_s_median": round(statistics.median(walls), 3),
+              "req_per_s_median": statistics.median(r["req_per_s"] or 0 for r in runs)}
+    print(f"[bench_crawl] Median {report['wall_s_median']} s, {report['req_per_s_median']} Requests/s")
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
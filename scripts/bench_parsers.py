@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Offline-Benchmark der Extraktions-Hotpath von vendors_fetch.py
+
+Korpus: bench/corpus/ (nachgebaute Produkt-, Listing- und Consent-Seiten im Stil der
+vier Whitelist-Domains, keine Mitschnitte; manifest.json + expected.json)
+
+Je Stufe (Page-Parse, Domain-Profil, jeder Extraktionspfad, looks_blocked, looks_product_detail,
+Angebots-/Gewichts-/Klassen-Logik, komplette Analyse):
+  pages/s, p50/p95 je Seite, Peak-Speicher (tracemalloc, Python-Heap)
+
+Außerdem werden die extrahierten Ergebnisse gegen expected.json geprüft,
+damit Performance-Arbeit die Ergebnisse nicht unbemerkt verändert, und die
+Aufpreis-Rechnung gegen einen Spot im Format von spot.json (USD/oz → EUR/g).
+
+  python scripts/bench_parsers.py                # Benchmark + Prüfung (Exit 1 bei Abweichung)
+  python scripts/bench_parsers.py --update       # expected.json neu schreiben
+  python scripts/bench_parsers.py --repeat 50 --json bench_output.json
+"""
+
+from __future__ import annotations
+import argparse, json, sys, time, tracemalloc
+from pathlib import Path
+
+import vendors_fetch as vf
+
+CORPUS_DIR = vf.ROOT / "bench" / "corpus"
+
+def load_corpus(corpus_dir: Path = CORPUS_DIR) -> list[dict]:
+    manifest = json.loads((corpus_dir / "manifest.json").read_text(encoding="utf-8"))
+    pages = []
+    for p in manifest["pages"]:
+        pages.append({**p, "body": (corpus_dir / p["file"]).read_bytes()})
+    return pages
+
+def extract_result(body: bytes, url: str) -> dict:
+    """Vergleichbares Ergebnis einer Seite (wie im Crawl, ohne Netz/Spot)."""
+    ctx = vf.CrawlCtx(client=None, pacer=None, totals={})
+    blocked = vf.looks_blocked(body)
+    res = vf.analyze_page(body, url)
+    items = vf.items_from_products(ctx, {"offers": 0}, res["products"], res["offers"], res["og_title"], url)
+    return {
+        "blocked": blocked,
+        "product_like": res["product_like"],
+        "hints": res["hints"],
+        "links": res["links"],
+        "items": [{"product": it["product"], "name": it["name"], "weight_g": it["weight_g"],
+                   "price": it["price"]["value"], "availability": it["availability"]} for it in items],
+    }
+
+# ------------------------------- Stufen -----------------------------------
+
+def _fresh(page: dict) -> vf.Page:
+    return vf.Page(page["body"], page["url"])
+
+def _path_stage(extractor):
+    def setup(page): return _fresh(page)
+    def run(p): extractor(p, {"products": [], "hints": {n: 0 for n, _ in vf.EXTRACTION_PATHS}})
+    return setup, run
+
+def _offers_stage():
+    def setup(page):
+        return vf.parse_structured(_fresh(page))["products"]
+    def run(products):
+        for prod in products:
+            w = vf.extract_weight_g(prod)
+            vf.classify_product(str(prod.get("name") or ""), w)
+            vf.best_offer(prod) or vf.normalize_offer(prod.get("offers") or {})
+    return setup, run
+
+def _profile_stage():
+    def setup(page):
+        return vf.profile_for(vf.urlparse(page["url"]).netloc), _fresh(page).doc
+    return setup
+
+def _detail_stage():
+    def setup(page):
+        p = _fresh(page)
+        return p, vf.parse_structured(p)["hints"]
+    def run(arg): vf.looks_product_detail(*arg)
+    return setup, run
+
+def stages() -> list[tuple[str, object, object]]:
+    out = [("page_parse", lambda page: page, lambda page: vf.Page(page["body"], page["url"]))]
+    out.append(("profile", _profile_stage(), lambda arg: arg[0] and vf.extract_profile(*arg)))
+    for name, extractor in vf.EXTRACTION_PATHS:
+        out.append((name, *_path_stage(extractor)))
+    out.append(("looks_blocked", lambda page: page["body"], vf.looks_blocked))
+    out.append(("looks_product_detail", *_detail_stage()))
+    out.append(("offers_weight_class", *_offers_stage()))
+    out.append(("analyze_page", lambda page: page, lambda page: vf.analyze_page(page["body"], page["url"])))
+    return out
+
+def _pct(values: list[float], q: float) -> float:
+    if not values: return 0.0
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(q * (len(s) - 1))))]
+
+def bench_stage(pages: list[dict], setup, run, repeat: int) -> dict:
+    lat = []
+    for _ in range(repeat):
+        for page in pages:
+            arg = setup(page)
+            t0 = time.perf_counter()
+            run(arg)
+            lat.append(time.perf_counter() - t0)
+    # Speicher separat messen (tracemalloc verfälscht die Zeiten)
+    peak = 0
+    tracemalloc.start()
+    for page in pages:
+        arg = setup(page)
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        run(arg)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    total = sum(lat)
+    return {
+        "pages": len(lat),
+        "pages_per_s": round(len(lat) / total, 1) if total > 0 else None,
+        "p50_ms": round(_pct(lat, 0.50) * 1000, 3),
+        "p95_ms": round(_pct(lat, 0.95) * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+# -------------------------------- Main ------------------------------------
+
+def check(pages: list[dict], expected: dict) -> list[str]:
+    errors = []
+    for page in pages:
+        got = extract_result(page["body"], page["url"])
+        want = expected.get(page["file"])
+        if want is None:
+            errors.append(f"{page['file']}: kein Eintrag in expected.json")
+        elif got != want:
+            for k in sorted(set(got) | set(want)):
+                if got.get(k) != want.get(k):
+                    errors.append(f"{page['file']}: {k}: erwartet {want.get(k)!r}, erhalten {got.get(k)!r}")
+    return errors
+
+def check_premium(xau_usd_per_oz: float = 3766.715, eurusd: float = 1.17) -> list[str]:
+    """100-g-Barren 3 % über Spot → Aufpreis 0–10 % (spot_payload wie fetch_data/pipeline)."""
+    import fetch_data as fd
+    ctx = vf.CrawlCtx(client=None, pacer=None, totals={})
+    ctx.spot_eur_per_g = vf.spot_eur_per_g_from(fd.spot_payload(xau_usd_per_oz, "2025-09-30"), eurusd)
+    fair = xau_usd_per_oz / fd.OZ_IN_GRAM / eurusd * 100.0
+    prod = {"@type": "Product", "name": "Goldbarren 100g",
+            "offers": {"@type": "Offer", "price": round(fair * 1.03, 2), "priceCurrency": "EUR"}}
+    items = vf.items_from_products(ctx, {"offers": 0}, [prod], [vf.best_offer(prod)], "", "https://example.org/goldbarren-100g")
+    prem = items[0].get("premium") if items else None
+    if prem is None or not 0.0 <= prem <= 0.10:
+        return [f"premium: 100 g bei {fair * 1.03:.2f} EUR (Spot {fair:.2f} EUR) → {prem!r}, erwartet 0–10 %"]
+    return []
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20, help="Durchläufe je Stufe über den ganzen Korpus")
+    ap.add_argument("--update", action="store_true", help="expected.json aus dem aktuellen Stand neu schreiben")
+    ap.add_argument("--no-bench", action="store_true", help="nur Ergebnisse prüfen")
+    ap.add_argument("--json", help="Report zusätzlich als JSON schreiben")
+    args = ap.parse_args()
+
+    pages = load_corpus()
+    exp_path = CORPUS_DIR / "expected.json"
+    if args.update:
+        expected = {p["file"]: extract_result(p["body"], p["url"]) for p in pages}
+        exp_path.write_text(json.dumps(expected, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        print(f"[bench] expected.json geschrieben ({len(expected)} Seiten)")
+        return 0
+
+    expected = json.loads(exp_path.read_text(encoding="utf-8")) if exp_path.exists() else {}
+    errors = check(pages, expected) + check_premium()
+    report = {"corpus_pages": len(pages), "extruct": vf.HAS_EXSTRUCT, "errors": errors, "stages": {}}
+
+    if not args.no_bench:
+        print(f"{'stage':<22}{'pages/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'peak KiB':>11}")
+        for name, setup, run in stages():
+            r = bench_stage(pages, setup, run, args.repeat)
+            report["stages"][name] = r
+            print(f"{name:<22}{r['pages_per_s'] or 0:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['peak_kib']:>11}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    for e in errors:
+        print("[bench] MISMATCH", e, file=sys.stderr)
+    print(f"[bench] {len(pages)} Seiten, {len(errors)} Abweichungen")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
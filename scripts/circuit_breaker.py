@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Circuit Breaker je Händler-Domain für vendors_fetch.py (Zustand in SQLite)
+
+- closed: normal; nach `threshold` Fehlschlägen in Folge (Timeout/Verbindungsfehler,
+  5xx/429, Consent-/Bot-Wall) → open, der Rest der Frontier wird übersprungen
+- open: spätere Läufe lassen die Domain ganz aus, bis `cooldown` abgelaufen ist
+- half_open: danach genau eine Probe-Seite; Erfolg → closed, Fehlschlag → wieder open
+- 4xx außer 429 ist neutral (tote URL, kein Domain-Problem)
+- eingesparte Zeit = übersprungene Requests × mittlere Dauer eines Fehlschlags
+  (aus diesem Lauf, sonst aus dem gespeicherten Mittel)
+"""
+
+from __future__ import annotations
+import sqlite3, time
+from pathlib import Path
+
+DEFAULT_THRESHOLD = 5
+DEFAULT_COOLDOWN = 30 * 60  # s; die 15-min-Refresh-Läufe proben höchstens jeden zweiten Lauf
+
+class Breaker:
+    def __init__(self, domain: str, threshold: int = DEFAULT_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN,
+                 saved: dict | None = None):
+        saved = saved or {}
+        self.domain = domain
+        self.threshold = threshold
+        self.state = saved.get("state") or "closed"
+        self.opened_at: float | None = saved.get("opened_at")
+        self.reason: str | None = saved.get("reason")
+        self.avg_fail_s: float = saved.get("avg_fail_s") or 0.0
+        self.last_urls: int = saved.get("last_urls") or 0
+        self.failures = saved.get("failures") or 0  # in Folge, auch über Läufe hinweg
+        if self.state == "open" and time.time() - (self.opened_at or 0) >= cooldown:
+            self.state = "half_open"
+        self.start_state = self.state
+        self.probing = False
+        self.skipped = 0
+        self.fail_count = 0
+        self.fail_s = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == "open"
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        self.skipped += 1
+        return False
+
+    def failure(self, reason: str, seconds: float):
+        self.fail_count += 1
+        self.fail_s += seconds
+        self.failures += 1
+        self.reason = reason
+        if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+            self.state = "open"
+            self.opened_at = time.time()
+
+    def success(self):
+        self.failures = 0
+        if self.state == "half_open":
+            self.state = "closed"
+            self.opened_at = self.reason = None
+
+    def neutral(self):
+        self.probing = False  # half_open: nächste Seite ist wieder eine Probe
+
+    def mean_fail_s(self) -> float:
+        return self.fail_s / self.fail_count if self.fail_count else self.avg_fail_s
+
+    def summary(self) -> dict:
+        return {
+            "state_start": self.start_state, "state": self.state,
+            "consecutive_failures": self.failures, "reason": self.reason,
+            "opened_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.opened_at)) if self.opened_at else None,
+            "failures_run": self.fail_count, "skipped": self.skipped,
+            "saved_s_est": round(self.skipped * self.mean_fail_s(), 1),
+        }
+
+class BreakerStore:
+    def __init__(self, path: Path, threshold: int = DEFAULT_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS breakers (
+                domain TEXT PRIMARY KEY, state TEXT NOT NULL, failures INTEGER NOT NULL,
+                opened_at REAL, reason TEXT, avg_fail_s REAL, last_urls INTEGER, updated_at REAL NOT NULL
+            )""")
+        self.threshold = threshold
+        self.cooldown = cooldown
+
+    def load(self, domain: str) -> Breaker:
+        row = self.db.execute(
+            "SELECT state, failures, opened_at, reason, avg_fail_s, last_urls FROM breakers WHERE domain=?", (domain,)
+        ).fetchone()
+        saved = dict(zip(("state", "failures", "opened_at", "reason", "avg_fail_s", "last_urls"), row)) if row else None
+        return Breaker(domain, self.threshold, self.cooldown, saved)
+
+    def save(self, b: Breaker):
+        # half_open ohne Probe (keine Seite geholt) bleibt fällig → als open mit altem Zeitstempel speichern
+        state = "open" if b.state == "half_open" else b.state
+        self.db.execute("INSERT OR REPLACE INTO breakers VALUES (?,?,?,?,?,?,?,?)",
+                        (b.domain, state, b.failures, b.opened_at, b.reason, b.mean_fail_s(), b.last_urls, time.time()))
+        self.db.commit()
+
+    def close(self):
+        try:
+            self.db.commit(); self.db.close()
+        except Exception:
+            pass
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistenter Discovery-Metadaten-Speicher (SQLite) für vendors_fetch.py
+
+- robots.txt (Rohtext + HTTP-Status, beim Laden neu geparst)
+- Sitemap-Kandidatenlisten je Domain (loc/lastmod/priority)
+- Linklisten von Seed-/Startseiten
+- TTL je Art; abgelaufene Einträge gelten als nicht vorhanden
+Warme Läufe können so ohne robots-/Sitemap-Runde direkt Produktseiten holen.
+"""
+
+from __future__ import annotations
+import json, sqlite3, time
+from pathlib import Path
+
+DEFAULT_TTLS: dict[str, int] = {
+    "robots": 24 * 3600,
+    "sitemap": 12 * 3600,
+    "links": 6 * 3600,
+}
+
+class DiscoveryStore:
+    def __init__(self, path: Path, ttls: dict[str, int] | None = None):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS meta (
+                kind TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, stored_at REAL NOT NULL,
+                PRIMARY KEY (kind, key)
+            )""")
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.stats = {kind: {"hits": 0, "misses": 0, "stored": 0} for kind in self.ttls}
+
+    def get(self, kind: str, key: str):
+        row = self.db.execute("SELECT value, stored_at FROM meta WHERE kind=? AND key=?", (kind, key)).fetchone()
+        st = self.stats.setdefault(kind, {"hits": 0, "misses": 0, "stored": 0})
+        if not row or (time.time() - row[1]) >= self.ttls.get(kind, 0):
+            st["misses"] += 1
+            return None
+        st["hits"] += 1
+        return json.loads(row[0])
+
+    def put(self, kind: str, key: str, value):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?,?,?,?)",
+                        (kind, key, json.dumps(value, ensure_ascii=False), time.time()))
+        self.db.commit()
+        self.stats.setdefault(kind, {"hits": 0, "misses": 0, "stored": 0})["stored"] += 1
+
+    def purge(self):
+        """Abgelaufene Einträge entfernen (Datei bleibt klein)."""
+        now = time.time()
+        for kind, ttl in self.ttls.items():
+            self.db.execute("DELETE FROM meta WHERE kind=? AND stored_at<?", (kind, now - ttl))
+        self.db.commit()
+
+    def summary(self) -> dict:
+        return {k: dict(v) for k, v in self.stats.items()}
+
+    def close(self):
+        try:
+            self.purge(); self.db.close()
+        except Exception:
+            pass
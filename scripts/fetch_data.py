@@ -1,44 +1,117 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import json, sys
+import json, os, signal, sys, time
 from pathlib import Path
 from datetime import datetime, timezone
 import urllib.request
 
+from fred_history import merge_column, update_history, write_json_atomic
+
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-# stooq: XAUUSD = USD pro Unze (daily close)
-STOOQ_XAUUSD_D = "https://stooq.com/q/d/l/?s=xauusd&i=d"
+# stooq: XAUUSD = USD pro Unze (daily close); STOOQ_BASE_URL zeigt für Offline-Tests auf fred_standin.py
+STOOQ_BASE_URL = "https://stooq.com"
+STOOQ_XAUUSD_D = STOOQ_BASE_URL + "/q/d/l/?s=xauusd&i=d"
+WATCH_INTERVAL = 60.0  # s zwischen zwei Abfragen im --watch-Modus
 OZ_IN_GRAM = 31.1034768
+# vollständige Tagesschlusskurse (date,close); nur beim ersten Lauf komplett geladen
+SPOT_SERIES_FILE = "xauusd_daily.csv"
+GOLD_COLUMN = "GOLDAMGBD228NLBM"  # history.json-Spalte, die app.js als Goldpreis liest
 
 def _download(url: str) -> str:
     with urllib.request.urlopen(url, timeout=30) as r:
         return r.read().decode("utf-8", "ignore")
 
+def _parse_stooq_rows(csv_text: str) -> list[tuple[str, float]]:
+    # Format: date,open,high,low,close,volume ("No data", wenn das Fenster leer ist)
+    out = []
+    for line in csv_text.splitlines():
+        parts = line.strip().split(",")
+        if len(parts) < 5 or not parts[0][:1].isdigit():
+            continue
+        try:
+            out.append((parts[0], float(parts[4])))
+        except ValueError:
+            continue
+    return out
+
 def _parse_stooq_csv(csv_text: str):
-    # Format: date,open,high,low,close,volume
-    lines = [l.strip() for l in csv_text.splitlines() if l.strip()]
-    if len(lines) < 2:
-        return None
-    last = lines[-1].split(",")
-    if len(last) < 5:
-        return None
-    date_iso = last[0]
-    close = last[4]
-    try:
-        price_oz = float(close)
-    except Exception:
-        return None
-    return date_iso, price_oz
+    rows = _parse_stooq_rows(csv_text)
+    return rows[-1] if rows else None
+
+def load_spot_series() -> dict[str, float]:
+    p = DATA_DIR / SPOT_SERIES_FILE
+    if not p.exists():
+        return {}
+    series = {}
+    for line in p.read_text(encoding="utf-8").splitlines()[1:]:
+        d, _, close = line.partition(",")
+        try:
+            series[d] = float(close)
+        except ValueError:
+            continue
+    return series
+
+def spot_series_text(series: dict[str, float]) -> str:
+    return "\n".join(["date,close"] + [f"{d},{series[d]!r}" for d in sorted(series)]) + "\n"
+
+def save_spot_series(series: dict[str, float]):
+    p = DATA_DIR / SPOT_SERIES_FILE
+    tmp = p.with_name(p.name + ".tmp")
+    tmp.write_text(spot_series_text(series), encoding="utf-8")
+    os.replace(tmp, p)
+
+def stooq_daily_url() -> str:
+    base = os.environ.get("STOOQ_BASE_URL")
+    return base.rstrip("/") + "/q/d/l/?s=xauusd&i=d" if base else STOOQ_XAUUSD_D
+
+def stooq_window_url(since: str) -> str:
+    """Nur das Fenster ab dem letzten gespeicherten Schlusskurs (d1/d2 = YYYYMMDD)."""
+    today = datetime.now(timezone.utc).strftime("%Y%m%d")
+    return f"{stooq_daily_url()}&d1={since.replace('-', '')}&d2={today}"
 
-def write_spot_json(xau_usd_per_oz: float, spot_date: str):
+def spot_url(series: dict[str, float]) -> str:
+    return stooq_window_url(max(series)) if series else stooq_daily_url()
+
+def apply_spot_csv(series: dict[str, float], url: str, csv_text: str) -> dict:
+    """
+    Fenster-CSV in die gespeicherten Schlusskurse übernehmen (in place). Der letzte
+    gespeicherte Tag wird erneut geholt, weil stooq den laufenden Tag fortschreibt.
+    """
+    since = max(series) if series else None
+    rows = _parse_stooq_rows(csv_text)
+    updated = 0
+    for d, close in rows:
+        if since and d < since: continue  # falls das Fenster ignoriert wird
+        if series.get(d) != close:
+            series[d] = close; updated += 1
+    return {"url": url, "bytes": len(csv_text.encode("utf-8")), "received": len(rows),
+            "updated": updated, "since": since, "closes": len(series)}
+
+def update_spot_series() -> tuple[dict[str, float], dict]:
+    """Gespeicherte Schlusskurse inkrementell ergänzen (urllib, Einzelaufruf)."""
+    series = load_spot_series()
+    url = spot_url(series)
+    stats = apply_spot_csv(series, url, _download(url))
+    if stats["updated"]:
+        save_spot_series(series)
+    return series, stats
+
+async def aupdate_spot_series(client, series: dict[str, float]) -> dict:
+    """Wie update_spot_series, aber über einen gemeinsamen httpx-Client und ohne Dateizugriff."""
+    url = spot_url(series)
+    r = await client.get(url, timeout=30, follow_redirects=True)
+    r.raise_for_status()
+    return apply_spot_csv(series, url, r.text)
+
+def spot_payload(xau_usd_per_oz: float, spot_date: str) -> dict:
     ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
     usd_per_g = xau_usd_per_oz / OZ_IN_GRAM
     usd_per_kg = usd_per_g * 1000.0
-    payload = {
+    return {
         # Legacy-Feld beibehalten (USD pro Unze):
         "timestamp": ts,
         "XAUUSD": round(xau_usd_per_oz, 4),
@@ -50,29 +123,183 @@ def write_spot_json(xau_usd_per_oz: float, spot_date: str):
         "usd_per_gram": round(usd_per_g, 6),
         "usd_per_kg": round(usd_per_kg, 2)
     }
-    (DATA_DIR / "spot.json").write_text(
-        json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8"
-    )
 
-def main():
+def spot_fallback_payload() -> dict:
+    ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return {
+        "timestamp": ts, "XAUUSD": None, "source": "stooq.com", "spot_date": None,
+        "usd_per_ounce": None, "usd_per_gram": None, "usd_per_kg": None
+    }
+
+def spot_changed(payload: dict, path: Path | None = None) -> bool:
+    """Weicht Kurs oder Datum von der gespeicherten spot.json ab? (timestamp zählt nicht)"""
     try:
-        csv_text = _download(STOOQ_XAUUSD_D)
-        parsed = _parse_stooq_csv(csv_text)
-        if not parsed:
+        cur = json.loads((path or DATA_DIR / "spot.json").read_text(encoding="utf-8"))
+    except Exception:
+        return True
+    return (cur.get("XAUUSD"), cur.get("spot_date")) != (payload["XAUUSD"], payload["spot_date"])
+
+def write_spot_json(xau_usd_per_oz: float, spot_date: str) -> bool:
+    """Nur bei geändertem Kurs/Datum schreiben (atomar), sonst bleibt die Datei samt timestamp."""
+    payload = spot_payload(xau_usd_per_oz, spot_date)
+    if not spot_changed(payload):
+        return False
+    write_json_atomic(DATA_DIR / "spot.json", payload, indent=2)
+    return True
+
+def update_diag(updates: dict):
+    """diag.json fortschreiben; Felder aus früheren Läufen bleiben erhalten."""
+    p = DATA_DIR / "diag.json"
+    try:
+        diag = json.loads(p.read_text(encoding="utf-8"))
+    except Exception:
+        diag = {}
+    diag.update(updates)
+    write_json_atomic(p, diag)
+
+def run_fred(diag: dict):
+    try:
+        d = update_history(DATA_DIR, os.environ.get("FRED_API_KEY"))
+        diag.update(d)
+        diag["gold_valid"] = d["series_counts"].get(GOLD_COLUMN, 0)
+        got = {sid: s["received"] for sid, s in d["fred"].items()}
+        print(f"[fetch_data] history OK: rows={d['rows']} new={got} notes={d['notes']}")
+    except Exception as e:
+        print(f"[fetch_data] history failed: {e}", file=sys.stderr)
+
+def run_spot(diag: dict):
+    try:
+        series, stats = update_spot_series()
+        if not series:
             raise RuntimeError("stooq XAUUSD parse failed")
-        spot_date, xau_oz = parsed
-        write_spot_json(xau_oz, spot_date)
-        print(f"[fetch_data] spot OK: {xau_oz:.2f} USD/oz (date={spot_date})")
+        diag["spot"] = stats
+        # Schlusskurse als Gold-Spalte in history.json (Prognose/Analogien in app.js)
+        gold = merge_column(DATA_DIR, GOLD_COLUMN, series)
+        diag["gold_valid"] = gold["valid"]
+        diag["gold_backfill"] = len(series)
+        diag["rows"] = gold["rows"]
+        diag.setdefault("series_counts", {})[GOLD_COLUMN] = gold["valid"]
+        spot_date = max(series)
+        xau_oz = series[spot_date]
+        written = write_spot_json(xau_oz, spot_date)
+        print(f"[fetch_data] spot OK: {xau_oz:.2f} USD/oz (date={spot_date}, "
+              f"{stats['bytes']} bytes, {stats['updated']} neue/geänderte Schlusskurse"
+              f"{'' if written else ', spot.json unverändert'})")
     except Exception as e:
         print(f"[fetch_data] spot failed: {e}", file=sys.stderr)
-        ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
-        fallback = {
-            "timestamp": ts, "XAUUSD": None, "source": "stooq.com", "spot_date": None,
-            "usd_per_ounce": None, "usd_per_gram": None, "usd_per_kg": None
+        # letzter guter Spot bleibt stehen; Platzhalter nur, wenn es noch keinen gibt
+        if not (DATA_DIR / "spot.json").exists():
+            write_json_atomic(DATA_DIR / "spot.json", spot_fallback_payload(), indent=2)
+
+# ------------------------------ Watch-Modus -------------------------------
+
+class SpotWatch:
+    """
+    stooq-Spot in festem Takt abfragen (--watch):
+    - ein httpx-Client für alle Abfragen (Keep-Alive, keine neue Verbindung je Poll)
+    - If-None-Match/If-Modified-Since aus der letzten Antwort derselben URL; 304 → nichts zu tun
+    - spot.json/xauusd_daily.csv nur bei geändertem Kurs oder Datum, jeweils atomar
+    - Statistik: Poll-Latenz (Mittel/p50/p95/max), 304-Quote, Änderungen je Stunde
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.series = load_spot_series()
+        # ein Validator-Paar je Watcher: die URL trägt das d1/d2-Fenster und ändert sich
+        # täglich bzw. nach jedem gespeicherten Update, die Ressource bleibt dieselbe
+        self.validators: dict[str, str] = {}
+        self.latencies: list[float] = []
+        self.polls = self.not_modified = self.unchanged = self.errors = self.bytes = 0
+        self.changes: list[float] = []
+        self.started = time.time()
+
+    def poll(self) -> bool:
+        url = spot_url(self.series)
+        t0 = time.perf_counter()
+        try:
+            r = self.client.get(url, headers=self.validators)
+            if r.status_code != 304:
+                r.raise_for_status()
+        except Exception as e:
+            self.errors += 1
+            print(f"[watch] Fehler: {type(e).__name__}: {e}", file=sys.stderr)
+            return False
+        finally:
+            self.polls += 1
+            self.latencies.append(time.perf_counter() - t0)
+        self.bytes += len(r.content)
+        if r.status_code == 304:
+            self.not_modified += 1
+            return False
+        self.validators = {h: r.headers[k] for k, h in (("etag", "If-None-Match"), ("last-modified", "If-Modified-Since"))
+                           if k in r.headers}
+        stats = apply_spot_csv(self.series, url, r.text)
+        if not stats["updated"]:
+            self.unchanged += 1
+            return False
+        save_spot_series(self.series)
+        spot_date = max(self.series)
+        if not write_spot_json(self.series[spot_date], spot_date):
+            self.unchanged += 1  # nur ältere Tage korrigiert
+            return False
+        self.changes.append(time.time())
+        print(f"[watch] spot.json: {self.series[spot_date]:.2f} USD/oz (date={spot_date}, "
+              f"{self.latencies[-1] * 1000:.1f} ms)")
+        return True
+
+    def summary(self) -> dict:
+        lat = sorted(self.latencies)
+        q = lambda p: round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 1) if lat else None
+        hours = max(time.time() - self.started, 1e-9) / 3600.0
+        gaps = [b - a for a, b in zip(self.changes, self.changes[1:])]
+        return {
+            "polls": self.polls, "not_modified": self.not_modified, "unchanged": self.unchanged,
+            "changes": len(self.changes), "errors": self.errors, "bytes": self.bytes,
+            "latency_ms": {"mean": round(sum(lat) * 1000 / len(lat), 1) if lat else None,
+                           "p50": q(0.5), "p95": q(0.95), "max": q(1.0)},
+            "changes_per_hour": round(len(self.changes) / hours, 2),
+            "mean_s_between_changes": round(sum(gaps) / len(gaps), 1) if gaps else None,
+            "runtime_s": round(time.time() - self.started, 1),
         }
-        (DATA_DIR / "spot.json").write_text(
-            json.dumps(fallback, ensure_ascii=False, indent=2), encoding="utf-8"
-        )
+
+def watch(interval: float = WATCH_INTERVAL, max_polls: int | None = None) -> dict:
+    """Bis Ctrl-C/SIGTERM oder max_polls abfragen; Statistik am Ende in diag.json unter spot_watch."""
+    import httpx
+    def stop(*_):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, stop)
+    print(f"[watch] {spot_url(load_spot_series())} alle {interval:g} s", file=sys.stderr)
+    with httpx.Client(timeout=30, follow_redirects=True, limits=httpx.Limits(max_keepalive_connections=1)) as client:
+        w = SpotWatch(client)
+        try:
+            while max_polls is None or w.polls < max_polls:
+                t0 = time.monotonic()
+                w.poll()
+                if max_polls is not None and w.polls >= max_polls: break
+                time.sleep(max(0.0, interval - (time.monotonic() - t0)))
+        except KeyboardInterrupt:
+            pass
+    summary = w.summary()
+    update_diag({"spot_watch": summary})
+    print("[watch]", json.dumps(summary, ensure_ascii=False))
+    return summary
+
+def main(argv: list[str] | None = None):
+    import argparse, run_metrics
+    ap = argparse.ArgumentParser(description="FRED-Serien und stooq-Spot aktualisieren")
+    ap.add_argument("--watch", action="store_true", help="nur den Spot fortlaufend abfragen (spot.json bei Änderung)")
+    ap.add_argument("--interval", type=float, default=WATCH_INTERVAL, help="Sekunden zwischen zwei Abfragen")
+    ap.add_argument("--max-polls", type=int, help="nach so vielen Abfragen beenden (Tests)")
+    args = ap.parse_args(argv)
+    if args.watch:
+        watch(args.interval, args.max_polls)
+        return
+    t0 = time.perf_counter()
+    diag: dict = {}
+    run_fred(diag)
+    run_spot(diag)
+    update_diag(diag)
+    run_metrics.log_run(run_metrics.market_record(diag, time.perf_counter() - t0))
 
 if __name__ == "__main__":
     main()
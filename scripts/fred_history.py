@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+FRED-Stufe für fetch_data.py: pflegt data/history.json inkrementell
+
+- alle zehn Serien gleichzeitig über einen gemeinsamen httpx-Client
+  (HTTP/2: eine Verbindung, mehrere Streams)
+- erster Lauf: Backfill ab HISTORY_START; danach je Serie nur Beobachtungen
+  nach dem letzten gespeicherten Wert (observation_start)
+- Merge in die datumsausgerichteten Zeilen von history.json; fehlende Werte
+  (".") überschreiben nie vorhandene
+- FRED_BASE_URL zeigt für Offline-Tests auf fred_standin.py
+"""
+
+from __future__ import annotations
+import asyncio, json, os
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+SERIES = (
+    "GOLDAMGBD228NLBM", "DFII10", "DTWEXBGS", "VIXCLS", "DCOILBRENTEU",
+    "T10YIE", "BAMLH0A0HYM2", "NAPM", "RECPROUSM156N", "T10Y2Y",
+)
+FRED_BASE_URL = "https://api.stlouisfed.org/fred"
+HISTORY_START = "2005-08-23"
+HTTP_TIMEOUT = 30.0
+RETRIES = 3
+
+def write_json_atomic(path: Path, obj, **dump_kw):
+    """Erst in eine Nachbardatei schreiben, dann umbenennen → nie halbe Dateien."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(obj, ensure_ascii=False, **dump_kw), encoding="utf-8")
+    os.replace(tmp, path)
+
+def load_history(path: Path) -> list[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("history") or []
+    except Exception:
+        return []
+
+def last_dates(rows: list[dict]) -> dict[str, str | None]:
+    """Datum des letzten vorhandenen Werts je Serie."""
+    out: dict[str, str | None] = {sid: None for sid in SERIES}
+    for r in rows:
+        for sid in SERIES:
+            if r.get(sid) is not None and (out[sid] is None or r["timestamp"] > out[sid]):
+                out[sid] = r["timestamp"]
+    return out
+
+def _next_day(iso: str) -> str:
+    return (date.fromisoformat(iso) + timedelta(days=1)).isoformat()
+
+async def fetch_series(client: httpx.AsyncClient, base_url: str, api_key: str, sid: str, start: str) -> dict:
+    params = {"series_id": sid, "api_key": api_key, "file_type": "json", "observation_start": start}
+    err = None
+    for attempt in range(RETRIES):
+        try:
+            r = await client.get(f"{base_url}/series/observations", params=params, timeout=HTTP_TIMEOUT)
+        except httpx.HTTPError as e:
+            err = f"{type(e).__name__}"
+        else:
+            if r.status_code == 200:
+                obs = r.json().get("observations") or []
+                return {"sid": sid, "start": start, "ok": True, "bytes": len(r.content),
+                        "observations": [(o["date"], o.get("value")) for o in obs if o.get("date")]}
+            err = f"HTTP {r.status_code}"
+            if r.status_code not in (429, 500, 502, 503, 504):
+                break  # z. B. 400 "series does not exist" → kein Retry
+        if attempt + 1 < RETRIES:
+            await asyncio.sleep(1.5 * (attempt + 1))
+    return {"sid": sid, "start": start, "ok": False, "error": err, "observations": []}
+
+def _value(v) -> float | None:
+    if v is None or v == ".": return None
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
+
+def merge(rows: list[dict], results: list[dict]) -> tuple[list[dict], dict[str, int]]:
+    by_date = {r["timestamp"]: r for r in rows}
+    added = {}
+    for res in results:
+        n = 0
+        for d, raw in res["observations"]:
+            v = _value(raw)
+            if v is None: continue
+            row = by_date.get(d)
+            if row is None:
+                row = by_date[d] = {"timestamp": d, **{sid: None for sid in SERIES}}
+            if row.get(res["sid"]) != v:
+                row[res["sid"]] = v; n += 1
+        added[res["sid"]] = n
+    return [by_date[d] for d in sorted(by_date)], added
+
+def merge_column_rows(rows: list[dict], sid: str, values: dict[str, float]) -> tuple[list[dict], dict]:
+    """Fremdserie (z. B. stooq-Gold) in die Zeilen übernehmen; Zeilen werden bei Bedarf angelegt."""
+    rows, added = merge(rows, [{"sid": sid, "observations": sorted(values.items())}])
+    return rows, {"updated": added[sid], "valid": sum(1 for r in rows if r.get(sid) is not None), "rows": len(rows)}
+
+def merge_column(data_dir: Path, sid: str, values: dict[str, float]) -> dict:
+    """merge_column_rows direkt auf history.json."""
+    hist_path = data_dir / "history.json"
+    rows, info = merge_column_rows(load_history(hist_path), sid, values)
+    if info["updated"]:
+        write_json_atomic(hist_path, {"history": rows})
+    return info
+
+async def fetch_all(api_key: str, last: dict[str, str | None], base_url: str,
+                    client: httpx.AsyncClient | None = None) -> list[dict]:
+    if client is None:
+        async with httpx.AsyncClient(http2=True, limits=httpx.Limits(max_connections=1)) as client:
+            return await fetch_all(api_key, last, base_url, client)
+    jobs = [fetch_series(client, base_url, api_key, sid, _next_day(last[sid]) if last[sid] else HISTORY_START)
+            for sid in SERIES]
+    return await asyncio.gather(*jobs)
+
+async def update_rows(rows: list[dict], api_key: str | None, base_url: str | None = None,
+                      client: httpx.AsyncClient | None = None) -> tuple[list[dict], bool, dict]:
+    """Zeilen aktualisieren, ohne Dateien anzufassen → (Zeilen, geändert?, diag.json-Felder)."""
+    notes = []
+    results: list[dict] = []
+    changed = False
+    if not api_key:
+        notes.append("FRED_API_KEY fehlt – history.json unverändert")
+    else:
+        base_url = (base_url or os.environ.get("FRED_BASE_URL") or FRED_BASE_URL).rstrip("/")
+        results = await fetch_all(api_key, last_dates(rows), base_url, client)
+        rows, added = merge(rows, results)
+        changed = any(added.values())
+        for res in results:
+            if not res["ok"]: notes.append(f"{res['sid']}: {res['error']}")
+    return rows, changed, {
+        "start": rows[0]["timestamp"] if rows else HISTORY_START,
+        "series_counts": {sid: sum(1 for r in rows if r.get(sid) is not None) for sid in SERIES},
+        "rows": len(rows),
+        "fred": {res["sid"]: {"since": res["start"], "ok": res["ok"], "bytes": res.get("bytes", 0),
+                              "received": len(res["observations"])} for res in results},
+        "notes": notes,
+    }
+
+def update_history(data_dir: Path, api_key: str | None, base_url: str | None = None) -> dict:
+    """history.json aktualisieren und diag.json-Felder zurückgeben."""
+    hist_path = data_dir / "history.json"
+    rows, changed, diag = asyncio.run(update_rows(load_history(hist_path), api_key, base_url))
+    if api_key and (changed or not hist_path.exists()):
+        write_json_atomic(hist_path, {"history": rows})
+    return diag
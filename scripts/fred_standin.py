@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lokaler Ersatz für den FRED-Endpunkt /fred/series/observations und den
+stooq-XAUUSD-Download /q/d/l/ (Offline-Tests)
+
+- Daten: synthetische Random-Walks je Serie (deterministisch) oder die Werte
+  einer vorhandenen history.json (--from-history), optional bis --until gekappt
+- beachtet series_id, observation_start, observation_end, file_type=json
+- unbekannte Serien → 400 wie bei FRED; jeder Request wird auf stderr geloggt
+- stooq: CSV wie das Original (d1/d2-Fenster, "No data" bei leerem Fenster), Kurse
+  synthetisch oder aus einer xauusd_daily.csv (--spot-csv); mit --spot-tick S ändert
+  sich der letzte Schlusskurs alle S Sekunden (laufender Handelstag); ETag und
+  Last-Modified, If-None-Match/If-Modified-Since → 304
+
+  python scripts/fred_standin.py --port 8765 &
+  FRED_BASE_URL=http://127.0.0.1:8765/fred FRED_API_KEY=test python scripts/fetch_data.py
+  STOOQ_BASE_URL=http://127.0.0.1:8765 python scripts/fetch_data.py --watch --interval 2
+"""
+
+from __future__ import annotations
+import argparse, hashlib, json, random, sys, time
+from datetime import date, timedelta
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from fred_history import HISTORY_START, SERIES
+
+# Serien, die FRED nicht mehr ausliefert
+DISCONTINUED = ("GOLDAMGBD228NLBM", "NAPM")
+
+def synthetic(until: str) -> dict[str, list[tuple[str, str]]]:
+    rnd = random.Random(42)
+    d, end = date.fromisoformat(HISTORY_START), date.fromisoformat(until)
+    out: dict[str, list[tuple[str, str]]] = {sid: [] for sid in SERIES if sid not in DISCONTINUED}
+    level = {sid: 10.0 + i for i, sid in enumerate(out)}
+    while d <= end:
+        for sid in out:
+            if sid == "RECPROUSM156N" and d.day != 1: continue
+            if sid != "RECPROUSM156N" and d.weekday() >= 5: continue
+            level[sid] = max(0.01, level[sid] + rnd.gauss(0, 0.05))
+            # wie FRED: gelegentlich "." für Feiertage
+            out[sid].append((d.isoformat(), "." if rnd.random() < 0.02 else f"{level[sid]:.2f}"))
+        d += timedelta(days=1)
+    return out
+
+def from_history(path: Path, until: str) -> dict[str, list[tuple[str, str]]]:
+    rows = json.loads(path.read_text(encoding="utf-8")).get("history") or []
+    out: dict[str, list[tuple[str, str]]] = {sid: [] for sid in SERIES if sid not in DISCONTINUED}
+    for r in rows:
+        if r["timestamp"] > until: continue
+        for sid in out:
+            if r.get(sid) is not None: out[sid].append((r["timestamp"], repr(r[sid])))
+    return out
+
+def synthetic_spot(until: str) -> list[tuple[str, float]]:
+    rnd = random.Random(7)
+    d, end, level = date.fromisoformat(HISTORY_START), date.fromisoformat(until), 440.0
+    out = []
+    while d <= end:
+        if d.weekday() < 5:
+            level = max(100.0, level * (1 + rnd.gauss(0.0003, 0.01)))
+            out.append((d.isoformat(), round(level, 2)))
+        d += timedelta(days=1)
+    return out
+
+def spot_from_csv(path: Path, until: str) -> list[tuple[str, float]]:
+    out = []
+    for line in path.read_text(encoding="utf-8").splitlines()[1:]:
+        d, _, close = line.partition(",")
+        if d <= until: out.append((d, float(close)))
+    return out
+
+class SpotTicker:
+    """Letzter Schlusskurs wandert alle `tick` Sekunden (deterministisch je Tick-Nummer)."""
+
+    def __init__(self, rows: list[tuple[str, float]], tick: float = 0.0):
+        self.rows, self.tick, self.started = rows, tick, time.time()
+
+    def current(self) -> tuple[list[tuple[str, float]], float]:
+        """(Zeilen, Zeitpunkt der letzten Änderung)"""
+        if not self.tick or not self.rows:
+            return self.rows, self.started
+        n = int((time.time() - self.started) // self.tick)
+        d, close = self.rows[-1]
+        moved = round(close * (1 + random.Random(n).gauss(0, 0.002)), 2) if n else close
+        return self.rows[:-1] + [(d, moved)], self.started + n * self.tick
+
+def make_handler(data: dict[str, list[tuple[str, str]]], spot: SpotTicker | None = None):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            u = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(u.query).items()}
+            if spot and u.path.rstrip("/") == "/q/d/l":
+                return self._stooq(q)
+            if not u.path.rstrip("/").endswith("/series/observations"):
+                return self._send(404, {"error_message": "not found"})
+            sid = q.get("series_id")
+            if sid not in data:
+                return self._send(400, {"error_code": 400, "error_message": "Bad Request.  The series does not exist."})
+            start = q.get("observation_start", "0000-00-00"); end = q.get("observation_end", "9999-12-31")
+            obs = [{"date": d, "value": v} for d, v in data[sid] if start <= d <= end]
+            self._send(200, {"observation_start": start, "observation_end": end, "count": len(obs), "observations": obs})
+
+        def _stooq(self, q: dict):
+            rows, changed_at = spot.current()
+            d1, d2 = q.get("d1", "00000000"), q.get("d2", "99999999")
+            lines = [f"{d},{c},{c},{c},{c}," for d, c in rows if d1 <= d.replace("-", "") <= d2]
+            body = ("Date,Open,High,Low,Close,Volume\n" + "\n".join(lines) + "\n" if lines else "No data").encode("utf-8")
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            last_mod = formatdate(int(changed_at), usegmt=True)
+            ims = self.headers.get("If-Modified-Since")
+            try:
+                fresh = bool(ims) and parsedate_to_datetime(ims).timestamp() >= int(changed_at)
+            except (TypeError, ValueError):
+                fresh = False
+            inm = self.headers.get("If-None-Match")
+            if inm == etag or (not inm and fresh):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_mod)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send(self, status: int, obj: dict):
+            body = json.dumps(obj).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            sys.stderr.write("[fred-standin] " + (fmt % args) + "\n")
+    return Handler
+
+def serve(port: int, data: dict, host: str = "127.0.0.1", spot: SpotTicker | None = None) -> ThreadingHTTPServer:
+    """Server erzeugen (Aufrufer startet serve_forever, z. B. in einem Thread)."""
+    return ThreadingHTTPServer((host, port), make_handler(data, spot))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--from-history", help="Werte aus dieser history.json ausliefern")
+    ap.add_argument("--until", default=date.today().isoformat(), help="letztes ausgeliefertes Datum")
+    ap.add_argument("--spot-csv", help="stooq-Kurse aus dieser xauusd_daily.csv statt synthetisch")
+    ap.add_argument("--spot-tick", type=float, default=0.0, help="letzten Schlusskurs alle S Sekunden ändern")
+    args = ap.parse_args()
+    data = from_history(Path(args.from_history), args.until) if args.from_history else synthetic(args.until)
+    rows = spot_from_csv(Path(args.spot_csv), args.until) if args.spot_csv else synthetic_spot(args.until)
+    srv = serve(args.port, data, spot=SpotTicker(rows, args.spot_tick))
+    print(f"[fred-standin] http://127.0.0.1:{args.port}/fred/series/observations, "
+          f"http://127.0.0.1:{args.port}/q/d/l/?s=xauusd&i=d", file=sys.stderr)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Priorisierte URL-Frontier für vendors_fetch.py
+
+- Kandidaten aus Seeds, Sitemaps, Startseite und URL-Historie
+- Score = Pfad-Heuristik + Sitemap-priority/lastmod + Ertrag früherer Läufe
+  (Angebot gefunden ↑, 404/410 ↓↓, Bot-Wall ↓, leer geholt ↓)
+- Historie je URL in einem kleinen SQLite-Index (.cache/frontier.sqlite3)
+"""
+
+from __future__ import annotations
+import sqlite3, time
+from datetime import datetime, timezone
+from pathlib import Path
+
+DEAD_STATUS = (404, 410)
+COMMIT_EVERY = 50  # Zeilen; dazu commit() je Domain → Abbruch verliert höchstens ein paar Seiten
+
+class UrlIndex:
+    def __init__(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY, domain TEXT NOT NULL,
+                fetches INTEGER NOT NULL DEFAULT 0, offers INTEGER NOT NULL DEFAULT 0,
+                hits INTEGER NOT NULL DEFAULT 0, blocked INTEGER NOT NULL DEFAULT 0,
+                dead INTEGER NOT NULL DEFAULT 0, errors INTEGER NOT NULL DEFAULT 0,
+                last_status INTEGER, last_seen REAL, last_hit REAL
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS ix_domain ON urls(domain)")
+        self.pending = 0
+
+    def history(self, domain: str) -> dict[str, dict]:
+        cur = self.db.execute(
+            "SELECT url, fetches, offers, hits, blocked, dead, errors, last_status, last_seen, last_hit"
+            " FROM urls WHERE domain=?", (domain,))
+        cols = ("fetches", "offers", "hits", "blocked", "dead", "errors", "last_status", "last_seen", "last_hit")
+        return {row[0]: dict(zip(cols, row[1:])) for row in cur}
+
+    def known_good(self, domain: str, limit: int) -> list[str]:
+        """URLs, die schon Angebote geliefert haben und nicht tot sind (jüngster Treffer zuerst)."""
+        cur = self.db.execute(
+            "SELECT url FROM urls WHERE domain=? AND hits>0 AND dead=0 ORDER BY last_hit DESC, url LIMIT ?",
+            (domain, limit))
+        return [row[0] for row in cur]
+
+    def record(self, domain: str, url: str, status: int | None, blocked: bool = False, offers: int = 0):
+        now = time.time()
+        hit = 1 if offers > 0 else 0
+        dead = 1 if status in DEAD_STATUS else 0
+        err = 1 if (status is None or (status >= 500)) else 0
+        self.db.execute("""
+            INSERT INTO urls (url, domain, fetches, offers, hits, blocked, dead, errors, last_status, last_seen, last_hit)
+            VALUES (?,?,1,?,?,?,?,?,?,?,?)
+            ON CONFLICT(url) DO UPDATE SET
+                fetches=fetches+1, offers=offers+excluded.offers, hits=hits+excluded.hits,
+                blocked=blocked+excluded.blocked,
+                dead=CASE WHEN excluded.dead=1 THEN dead+1 ELSE 0 END,
+                errors=errors+excluded.errors, last_status=excluded.last_status,
+                last_seen=excluded.last_seen, last_hit=COALESCE(excluded.last_hit, last_hit)
+            """, (url, domain, offers, hit, int(blocked), dead, err, status, now, now if hit else None))
+        self.pending += 1
+        if self.pending >= COMMIT_EVERY:
+            self.commit()
+
+    def commit(self):
+        self.db.commit()
+        self.pending = 0
+
+    def close(self):
+        try:
+            self.db.commit(); self.db.close()
+        except Exception:
+            pass
+
+def parse_lastmod(lastmod: str | None) -> float | None:
+    """W3C-Datetime aus <lastmod> → Unix-Zeit (None, wenn unlesbar)."""
+    if not lastmod: return None
+    try:
+        s = lastmod.strip().replace("Z", "+00:00")
+        dt = datetime.fromisoformat(s) if "T" in s else datetime.fromisoformat(s[:10])
+        if dt.tzinfo is None: dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
+    except Exception:
+        return None
+
+def _lastmod_age_days(lastmod: str | None, now: float) -> float | None:
+    ts = parse_lastmod(lastmod)
+    return None if ts is None else max(0.0, (now - ts) / 86400.0)
+
+def unchanged_since_crawl(lastmod: str | None, hist: dict | None) -> bool:
+    """Sitemap meldet keine Änderung seit unserem letzten Abruf dieser URL."""
+    ts = parse_lastmod(lastmod)
+    return bool(ts is not None and hist and hist.get("last_seen") and ts < hist["last_seen"])
+
+def score_candidate(meta: dict, hist: dict | None, now: float) -> float:
+    s = meta.get("path_score", 1.0)
+    if meta.get("source") == "seed": s += 0.3
+
+    pr = meta.get("priority")
+    if pr is not None: s += 0.5 * max(0.0, min(1.0, pr))
+    age = _lastmod_age_days(meta.get("lastmod"), now)
+    if age is not None: s += 0.5 / (1.0 + age / 30.0)
+
+    if hist:
+        n = max(1, hist["fetches"])
+        s += 3.0 * hist["hits"] / n
+        s -= 1.5 * hist["blocked"] / n
+        if hist["dead"]: s -= 3.0 * min(hist["dead"], 3)
+        if not hist["hits"] and not hist["dead"]:
+            # schon (mehrfach) ohne Ertrag geholt
+            s -= 0.25 * min(hist["fetches"], 4)
+    return s
+
+class Frontier:
+    """Sammelt Kandidaten einer Domain und liefert sie nach Score sortiert."""
+    def __init__(self, domain: str, history: dict[str, dict] | None = None):
+        self.domain = domain
+        self.history = history or {}
+        self.cands: dict[str, dict] = {}
+
+    def __len__(self):
+        return len(self.cands)
+
+    def add(self, url: str, source: str, path_score: float = 1.0,
+            lastmod: str | None = None, priority: float | None = None):
+        meta = self.cands.get(url)
+        if meta is None:
+            self.cands[url] = {"source": source, "path_score": path_score, "lastmod": lastmod, "priority": priority}
+            return
+        # Mehrfachfund: beste Metadaten behalten
+        meta["path_score"] = max(meta["path_score"], path_score)
+        if source == "seed": meta["source"] = "seed"
+        if lastmod and (not meta["lastmod"] or lastmod > meta["lastmod"]): meta["lastmod"] = lastmod
+        if priority is not None: meta["priority"] = max(meta["priority"] or 0.0, priority)
+
+    def add_known_good(self, path_score_fn):
+        """URLs mit Angeboten aus früheren Läufen, auch wenn sie diesmal nicht gefunden wurden."""
+        for url, h in self.history.items():
+            if h["hits"] and not h["dead"]:
+                self.add(url, "history", path_score_fn(url))
+
+    def ranked(self, limit: int) -> list[str]:
+        now = time.time()
+        scored = [(-score_candidate(m, self.history.get(u), now), u) for u, m in self.cands.items()]
+        scored.sort()
+        return [u for _, u in scored[:limit]]
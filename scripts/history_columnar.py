@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Spaltenformat für data/history.json (zusätzlich, history.json bleibt Quelle)
+
+- je Jahr eine Partition data/history/history-<Jahr>.<hash>.json:
+  Datumsvektor + je Serie ein Zahlen-Array statt Zeilen-Dicts
+- Delta-Kodierung: Datum als Tagesabstände, Werte als ganzzahlige Differenzen
+  (Skalierung 10^Nachkommastellen je Serie/Jahr), fehlende Werte = null
+- Dateiname enthält den Inhalts-Hash → abgeschlossene Jahre ändern sich nie und
+  sind dauerhaft cachebar; alle 2 h ändert sich nur die laufende Partition
+- vorkomprimiert: .json.gz (immer), .json.br (wenn das Modul brotli installiert ist)
+- manifest.json listet die Partitionen (einzige Datei, die mit Cache-Busting geladen wird)
+Dekodierung im Browser: js/history_loader.js
+"""
+
+from __future__ import annotations
+import gzip, hashlib, json, os, sys
+from datetime import date
+from pathlib import Path
+
+from fred_history import SERIES, load_history, write_json_atomic
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except Exception:
+    HAS_BROTLI = False
+
+ROOT = Path(__file__).resolve().parents[1]
+DATA_DIR = ROOT / "data"
+OUT_SUBDIR = "history"
+FORMAT_VERSION = 1
+MAX_DECIMALS = 6
+
+def _decimals(v: float) -> int:
+    r = repr(float(v))
+    if "e" in r or "E" in r: return MAX_DECIMALS
+    return min(MAX_DECIMALS, len(r.split(".")[1].rstrip("0")) if "." in r else 0)
+
+def encode_values(values: list[float | None]) -> dict:
+    """Werte → {"scale": 10^d, "d": [erster Wert, Differenzen …]} (null bleibt null)."""
+    present = [v for v in values if v is not None]
+    dec = max((_decimals(v) for v in present), default=0)
+    scale = 10 ** dec
+    out, prev = [], None
+    for v in values:
+        if v is None:
+            out.append(None); continue
+        iv = round(v * scale)
+        out.append(iv if prev is None else iv - prev)
+        prev = iv
+    return {"scale": scale, "d": out}
+
+def decode_values(enc: dict) -> list[float | None]:
+    out, prev = [], None
+    for x in enc["d"]:
+        if x is None:
+            out.append(None); continue
+        prev = x if prev is None else prev + x
+        out.append(prev / enc["scale"])
+    return out
+
+def encode_partition(year: int, rows: list[dict]) -> dict:
+    days = [date.fromisoformat(r["timestamp"]).toordinal() for r in rows]
+    return {
+        "v": FORMAT_VERSION,
+        "year": year,
+        "start": rows[0]["timestamp"],
+        "dd": [0] + [b - a for a, b in zip(days, days[1:])],
+        "series": {sid: encode_values([r.get(sid) for r in rows]) for sid in SERIES},
+    }
+
+def decode_partition(part: dict) -> list[dict]:
+    d0 = date.fromisoformat(part["start"]).toordinal()
+    dates, acc = [], d0
+    for i, dd in enumerate(part["dd"]):
+        acc = d0 if i == 0 else acc + dd
+        dates.append(date.fromordinal(acc).isoformat())
+    cols = {sid: decode_values(enc) for sid, enc in part["series"].items()}
+    return [{"timestamp": d, **{sid: cols[sid][i] if sid in cols else None for sid in SERIES}}
+            for i, d in enumerate(dates)]
+
+def encode(rows: list[dict]) -> tuple[dict[str, bytes], dict]:
+    """Zeilen → ({Dateiname: Inhalt} aller Partitionen samt Varianten, Manifest)."""
+    rows = sorted(rows, key=lambda r: r["timestamp"])
+    by_year: dict[int, list[dict]] = {}
+    for r in rows:
+        by_year.setdefault(int(r["timestamp"][:4]), []).append(r)
+
+    files, parts = {}, []
+    for year in sorted(by_year):
+        body = json.dumps(encode_partition(year, by_year[year]), separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()[:12]
+        name = f"history-{year}.{digest}.json"
+        files[name] = body
+        files[name + ".gz"] = gzip.compress(body, compresslevel=9, mtime=0)
+        if HAS_BROTLI:
+            files[name + ".br"] = brotli.compress(body, quality=11)
+        parts.append({"year": year, "file": name, "rows": len(by_year[year]),
+                      "start": by_year[year][0]["timestamp"], "end": by_year[year][-1]["timestamp"],
+                      "bytes": {ext: len(files[name + sfx]) for ext, sfx in (("json", ""), ("gz", ".gz"), ("br", ".br"))
+                                if name + sfx in files}})
+
+    manifest = {"v": FORMAT_VERSION, "series": list(SERIES), "rows": len(rows),
+                "start": rows[0]["timestamp"] if rows else None, "end": rows[-1]["timestamp"] if rows else None,
+                "partitions": parts}
+    return files, manifest
+
+def write_once(path: Path, data: bytes) -> bool:
+    """Inhaltsadressiert: existiert die Datei, ist sie identisch → nicht neu schreiben."""
+    if path.exists():
+        return False
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+def prune(out_dir: Path, keep) -> int:
+    """Nicht mehr referenzierte Partitionen entfernen."""
+    keep = set(keep) | {"manifest.json"}
+    stale = [p for p in out_dir.iterdir() if p.name not in keep]
+    for p in stale: p.unlink()
+    return len(stale)
+
+def build(data_dir: Path = DATA_DIR) -> dict:
+    files, manifest = encode(load_history(data_dir / "history.json"))
+    out_dir = data_dir / OUT_SUBDIR
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, data in files.items():
+        write_once(out_dir / name, data)
+    prune(out_dir, files)
+    write_json_atomic(out_dir / "manifest.json", manifest, indent=1)
+    return manifest
+
+def verify(data_dir: Path = DATA_DIR) -> bool:
+    """Rundreise Spaltenformat → Zeilen gegen history.json prüfen."""
+    rows = sorted(load_history(data_dir / "history.json"), key=lambda r: r["timestamp"])
+    man = json.loads((data_dir / OUT_SUBDIR / "manifest.json").read_text(encoding="utf-8"))
+    back = []
+    for p in man["partitions"]:
+        back += decode_partition(json.loads((data_dir / OUT_SUBDIR / p["file"]).read_text(encoding="utf-8")))
+    norm = lambda rs: [{"timestamp": r["timestamp"], **{s: r.get(s) for s in SERIES}} for r in rs]
+    return norm(rows) == back
+
+def main():
+    man = build()
+    ok = verify()
+    total = {k: sum(p["bytes"].get(k, 0) for p in man["partitions"]) for k in ("json", "gz", "br")}
+    src = (DATA_DIR / "history.json").stat().st_size
+    print(f"[history_columnar] {len(man['partitions'])} Partitionen, {man['rows']} Zeilen; "
+          f"history.json {src} B → json {total['json']} B, gz {total['gz']} B"
+          + (f", br {total['br']} B" if HAS_BROTLI else "") + f"; Rundreise {'OK' if ok else 'FEHLER'}")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistenter HTTP-Revalidierungs-Cache (SQLite) für vendors_fetch.py
+
+- speichert Body + Validatoren (ETag / Last-Modified) je URL
+- innerhalb der URL-TTL: Antwort direkt aus dem Cache (kein Request)
+- danach: bedingter Request (If-None-Match / If-Modified-Since), 304 = Treffer
+- größenbegrenzte LRU-Verdrängung über last_access; Zugriffszeiten von Treffern
+  werden gesammelt und mit dem nächsten store()/close() geschrieben (kein
+  SQLite-Commit je Treffer in der Event-Loop)
+- Zähler (hits, revalidated, misses, bytes_saved, …) für diagnostics
+"""
+
+from __future__ import annotations
+import re, sqlite3, time
+from pathlib import Path
+
+import httpx
+
+# (Muster, TTL in Sekunden) – erstes passendes Muster gewinnt.
+# TTL 0 = immer bedingt revalidieren (Preise ändern sich laufend).
+DEFAULT_TTLS: tuple[tuple[str, int], ...] = (
+    (r"/robots\.txt$", 24 * 3600),
+    (r"sitemap[^/]*\.xml(\.gz)?$", 12 * 3600),
+    (r"\.xml(\.gz)?$", 6 * 3600),
+    (r".*", 0),
+)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+class HttpCache:
+    def __init__(self, path: Path, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttls: tuple[tuple[str, int], ...] = DEFAULT_TTLS):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL,
+                etag TEXT, last_modified TEXT, content_type TEXT,
+                stored_at REAL NOT NULL, last_access REAL NOT NULL
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS ix_access ON responses(last_access)")
+        self.max_bytes = max_bytes
+        self.ttls = [(re.compile(p, re.I), t) for p, t in ttls]
+        self.total = self.db.execute("SELECT COALESCE(SUM(size),0) FROM responses").fetchone()[0]
+        self.touched: dict[str, tuple[float, bool]] = {}  # url → (Zeit, revalidiert)
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0,
+                      "evicted": 0, "bytes_saved": 0, "bytes_fetched": 0}
+
+    def ttl_for(self, url: str) -> int:
+        for rx, ttl in self.ttls:
+            if rx.search(url): return ttl
+        return 0
+
+    def lookup(self, url: str) -> dict | None:
+        row = self.db.execute(
+            "SELECT body, etag, last_modified, content_type, stored_at FROM responses WHERE url=?", (url,)
+        ).fetchone()
+        if not row: return None
+        t = self.touched.get(url)
+        return {"url": url, "body": row[0], "etag": row[1], "last_modified": row[2],
+                "content_type": row[3], "stored_at": t[0] if t and t[1] else row[4]}
+
+    def fresh(self, entry: dict | None) -> bool:
+        if not entry: return False
+        ttl = self.ttl_for(entry["url"])
+        return ttl > 0 and (time.time() - entry["stored_at"]) < ttl
+
+    def validators(self, entry: dict | None) -> dict:
+        h = {}
+        if entry and entry.get("etag"): h["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"): h["If-Modified-Since"] = entry["last_modified"]
+        return h
+
+    def hit(self, entry: dict, revalidated: bool = False) -> httpx.Response:
+        self.stats["revalidated" if revalidated else "hits"] += 1
+        self.stats["bytes_saved"] += len(entry["body"])
+        # 304 bestätigt den Inhalt → TTL neu starten (ein früherer 304 im selben Lauf bleibt gültig)
+        prev = self.touched.get(entry["url"])
+        self.touched[entry["url"]] = (time.time(), revalidated or bool(prev and prev[1]))
+        headers = {"content-type": entry.get("content_type") or "text/html"}
+        r = httpx.Response(200, content=entry["body"], headers=headers,
+                           request=httpx.Request("GET", entry["url"]))
+        r.extensions["from_cache"] = True
+        return r
+
+    def resolve(self, url: str, entry: dict | None, r: httpx.Response) -> httpx.Response:
+        """Antwort eines (bedingten) Requests verbuchen; 304 → gecachte Antwort."""
+        if r.status_code == 304 and entry:
+            return self.hit(entry, revalidated=True)
+        self.miss(len(r.content or b""))
+        if r.status_code == 200 and r.content and self.storable(url, r.headers):
+            self.store(url, r.content, r.headers)
+        return r
+
+    def miss(self, nbytes: int):
+        self.stats["misses"] += 1
+        self.stats["bytes_fetched"] += nbytes
+
+    def storable(self, url: str, headers: httpx.Headers) -> bool:
+        # ohne Validatoren und ohne TTL wäre der Eintrag nie wieder nutzbar
+        return bool(headers.get("etag") or headers.get("last-modified") or self.ttl_for(url) > 0)
+
+    def store(self, url: str, body: bytes, headers: httpx.Headers):
+        if len(body) > self.max_bytes // 10:
+            return
+        old = self.db.execute("SELECT size FROM responses WHERE url=?", (url,)).fetchone()
+        now = time.time()
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?,?,?,?,?,?,?,?)",
+            (url, body, len(body), headers.get("etag"), headers.get("last-modified"),
+             headers.get("content-type"), now, now))
+        self.total += len(body) - (old[0] if old else 0)
+        self.stats["stored"] += 1
+        self.touched.pop(url, None)
+        self.flush_access()  # LRU-Verdrängung braucht aktuelle last_access-Werte
+        self.evict()
+        self.db.commit()
+
+    def flush_access(self):
+        """Gesammelte Zugriffszeiten schreiben (ohne Commit; der folgt mit store()/close())."""
+        if not self.touched: return
+        self.db.executemany("UPDATE responses SET stored_at=?, last_access=? WHERE url=?",
+                            [(t, t, u) for u, (t, reval) in self.touched.items() if reval])
+        self.db.executemany("UPDATE responses SET last_access=? WHERE url=?",
+                            [(t, u) for u, (t, reval) in self.touched.items() if not reval])
+        self.touched.clear()
+
+    def evict(self):
+        while self.total > self.max_bytes:
+            rows = self.db.execute(
+                "SELECT url, size FROM responses ORDER BY last_access LIMIT 32").fetchall()
+            if not rows: break
+            for url, size in rows:
+                self.db.execute("DELETE FROM responses WHERE url=?", (url,))
+                self.total -= size
+                self.stats["evicted"] += 1
+                if self.total <= self.max_bytes: break
+
+    def summary(self) -> dict:
+        s = dict(self.stats)
+        lookups = s["hits"] + s["revalidated"] + s["misses"]
+        s["hit_rate"] = round((s["hits"] + s["revalidated"]) / lookups, 4) if lookups else None
+        s["size_bytes"] = self.total
+        return s
+
+    def close(self):
+        try:
+            self.flush_access()
+            self.db.commit(); self.db.close()
+        except Exception:
+            pass
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Aufzeichnen und Abspielen von HTTP-Verkehr für Offline-Läufe von vendors_fetch.py
+
+- Archiv: gzip-JSONL, je Zeile Methode, URL, Status, Header, Body (base64);
+  Schlüssel = Methode + URL ohne Geheimnisse (api_key & Co. werden entfernt)
+- RecordingTransport: reicht an den echten Transport durch und schreibt jede
+  Antwort ins Archiv (robots, Sitemaps, Seeds, Produktseiten, ECB-XML)
+- ReplayTransport: beantwortet Requests aus dem Archiv, mit Latenz/Jitter und
+  Fehler-Injektion (Timeout, 503, 429); If-None-Match/If-Modified-Since → 304
+- lokaler Mock-Server (serve): dasselbe über echtes HTTP, Auswahl per Host-Header;
+  LocalServerTransport leitet https://<shop>/… dorthin um
+- from-corpus: Archiv aus bench/corpus/ (+ robots.txt, Sitemap, Startseite, ECB)
+
+  python scripts/vendors_fetch.py --record bench/replay/live.jsonl.gz
+  python scripts/vendors_fetch.py --replay bench/replay/live.jsonl.gz --replay-latency 0.05
+  python scripts/http_replay.py from-corpus /tmp/corpus.jsonl.gz
+  python scripts/http_replay.py serve /tmp/corpus.jsonl.gz --port 8765 --latency 0.1 --error-rate 0.05
+  python scripts/vendors_fetch.py --replay http://127.0.0.1:8765
+"""
+
+from __future__ import annotations
+import argparse, asyncio, base64, gzip, json, random, sys, threading, time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+ROOT = Path(__file__).resolve().parents[1]
+CORPUS_DIR = ROOT / "bench" / "corpus"
+REDACT_PARAMS = frozenset({"api_key", "apikey", "key", "token", "access_token"})
+ERROR_KINDS = ("timeout", "503", "429")
+# Header, die nach dem Dekodieren des Bodys nicht mehr stimmen
+DROP_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"})
+
+def archive_key(method: str, url: str) -> str:
+    parts = urlsplit(str(url))
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k.lower() not in REDACT_PARAMS])
+    return f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc.lower(), parts.path or '/', query, ''))}"
+
+class Archive:
+    def __init__(self, entries: dict[str, dict] | None = None):
+        self.entries: dict[str, dict] = entries or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "Archive":
+        entries = {}
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    e = json.loads(line)
+                    entries[archive_key(e["method"], e["url"])] = e
+        return cls(entries)
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+            for key in sorted(self.entries):
+                f.write(json.dumps(self.entries[key], ensure_ascii=False, separators=(",", ":")) + "\n")
+        tmp.replace(path)
+
+    def add(self, method: str, url: str, status: int, headers: list[tuple[str, str]], body: bytes):
+        key = archive_key(method, url)
+        self.entries[key] = {"method": method.upper(), "url": key.split(" ", 1)[1], "status": status,
+                             "headers": [[k, v] for k, v in headers if k.lower() not in DROP_HEADERS],
+                             "body": base64.b64encode(body).decode("ascii"), "recorded": time.time()}
+
+    def get(self, method: str, url: str) -> dict | None:
+        return self.entries.get(archive_key(method, url))
+
+    def summary(self) -> dict:
+        hosts: dict[str, int] = {}
+        for e in self.entries.values():
+            h = urlsplit(e["url"]).netloc
+            hosts[h] = hosts.get(h, 0) + 1
+        return {"entries": len(self.entries), "hosts": hosts,
+                "bytes": sum(len(e["body"]) * 3 // 4 for e in self.entries.values())}
+
+def entry_response(entry: dict | None, req_headers) -> tuple[int, list, bytes]:
+    """Archiv-Eintrag → (Status, Header, Body); bedingte Requests wie ein echter Server."""
+    if entry is None:
+        return 404, [("content-type", "text/plain")], b"not in archive"
+    headers = [tuple(h) for h in entry["headers"]]
+    hmap = {k.lower(): v for k, v in headers}
+    etag, lm = hmap.get("etag"), hmap.get("last-modified")
+    if entry["status"] == 200 and ((etag and req_headers.get("if-none-match") == etag)
+                                   or (lm and req_headers.get("if-modified-since") == lm)):
+        return 304, headers, b""
+    return entry["status"], headers, base64.b64decode(entry["body"])
+
+class Injector:
+    """Latenz + Fehler, reproduzierbar über den Seed."""
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_kind: str = "timeout", seed: int = 0):
+        self.latency, self.jitter, self.error_rate = latency, jitter, error_rate
+        self.kinds = ERROR_KINDS if error_kind == "mix" else (error_kind,)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "served": 0, "missing": 0, "injected": 0}
+
+    def delay(self) -> float:
+        with self.lock:
+            return max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter))
+
+    def error(self) -> str | None:
+        with self.lock:
+            if self.error_rate > 0 and self.rng.random() < self.error_rate:
+                self.stats["injected"] += 1
+                return self.rng.choice(self.kinds)
+        return None
+
+    def count(self, status: int | None):
+        """status None = injizierter Timeout (schon unter "injected")."""
+        with self.lock:
+            self.stats["requests"] += 1
+            if status is not None:
+                self.stats["missing" if status == 404 else "served"] += 1
+
+def _injected(kind: str) -> tuple[int, list, bytes]:
+    if kind == "429":
+        return 429, [("retry-after", "1"), ("content-type", "text/plain")], b"too many requests"
+    return 503, [("content-type", "text/plain")], b"service unavailable"
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    def __init__(self, archive: Archive, injector: Injector | None = None):
+        self.archive = archive
+        self.injector = injector or Injector()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(self.injector.delay())
+        kind = self.injector.error()
+        if kind == "timeout":
+            self.injector.count(None)
+            raise httpx.ReadTimeout("injected timeout", request=request)
+        if kind:
+            status, headers, body = _injected(kind)
+        else:
+            status, headers, body = entry_response(self.archive.get(request.method, str(request.url)), request.headers)
+        self.injector.count(status)
+        return httpx.Response(status, headers=headers, content=body, request=request)
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Echter Transport + Mitschnitt; das Archiv wird beim Schließen des Clients geschrieben."""
+    def __init__(self, path: Path, inner: httpx.AsyncBaseTransport | None = None):
+        self.path = path
+        self.inner = inner or httpx.AsyncHTTPTransport(http2=True)
+        self.archive = Archive.load(path) if path.exists() else Archive()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        r = await self.inner.handle_async_request(request)
+        body = await r.aread()  # gestreamte Abrufe werden dabei vollständig gelesen
+        await r.aclose()
+        if r.status_code != 304:  # 304 hat keinen Body → den gespeicherten 200er behalten
+            self.archive.add(request.method, str(request.url), r.status_code, r.headers.multi_items(), body)
+        headers = [(k, v) for k, v in r.headers.multi_items() if k.lower() not in DROP_HEADERS]
+        return httpx.Response(r.status_code, headers=headers, content=body, request=request,
+                              extensions={k: v for k, v in r.extensions.items() if k == "http_version"})
+
+    async def aclose(self):
+        await self.inner.aclose()
+        self.archive.save(self.path)
+
+class LocalServerTransport(httpx.AsyncBaseTransport):
+    """https://<shop>/pfad → <base>/pfad mit Host: <shop> (lokaler Mock-Server)."""
+    def __init__(self, base: str):
+        self.base = httpx.URL(base)
+        self.inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.netloc.decode("ascii")
+        url = request.url.copy_with(scheme=self.base.scheme, host=self.base.host, port=self.base.port)
+        headers = [(k, v) for k, v in request.headers.multi_items() if k.lower() != "host"] + [("host", host)]
+        fwd = httpx.Request(request.method, url, headers=headers, content=request.content,
+                            extensions=request.extensions)
+        r = await self.inner.handle_async_request(fwd)
+        r.request = request
+        return r
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+# ------------------------------ Mock-Server --------------------------------
+
+def make_server(archive: Archive, host: str = "127.0.0.1", port: int = 8765,
+                injector: Injector | None = None) -> ThreadingHTTPServer:
+    inj = injector or Injector()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive wie bei echten Shops
+
+        def do_GET(self):
+            time.sleep(inj.delay())
+            kind = inj.error()
+            if kind == "timeout":
+                inj.count(None)
+                time.sleep(60)  # Client läuft in seinen Timeout
+                self.close_connection = True
+                return
+            url = f"https://{self.headers.get('Host', '')}{self.path}"
+            if kind:
+                status, headers, body = _injected(kind)
+            else:
+                status, headers, body = entry_response(archive.get("GET", url), {k.lower(): v for k, v in self.headers.items()})
+            inj.count(status)
+            self.send_response(status)
+            for k, v in headers:
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    srv = ThreadingHTTPServer((host, port), Handler)
+    srv.daemon_threads = True
+    srv.injector = inj
+    return srv
+
+def start_server(archive: Archive, port: int = 0, injector: Injector | None = None) -> ThreadingHTTPServer:
+    """Server im Hintergrund-Thread (port 0 = freier Port, siehe srv.server_address)."""
+    srv = make_server(archive, port=port, injector=injector)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+# ------------------------------ Korpus-Archiv ------------------------------
+
+ECB_XML = ('<?xml version="1.0" encoding="UTF-8"?><gesmes:Envelope xmlns:gesmes="http://www.gesmes.org/xml/2002-08-01" '
+           'xmlns="http://www.ecb.int/vocabulary/2002-08-01/eurofxref"><Cube><Cube time="2025-09-30">'
+           '<Cube currency="USD" rate="1.1707"/></Cube></Cube></gesmes:Envelope>')
+
+def archive_from_corpus(corpus_dir: Path = CORPUS_DIR) -> Archive:
+    """
+    Korpusseiten unter ihren URLs, dazu je Domain robots.txt, sitemap.xml (alle
+    Korpus-URLs) und eine Startseite mit Links; ECB-Kurs fest. Nicht enthaltene
+    URLs liefern beim Abspielen 404.
+    """
+    from vendors_fetch import ECB_URL, WHITELIST
+    manifest = json.loads((corpus_dir / "manifest.json").read_text(encoding="utf-8"))
+    arc = Archive()
+    lm = formatdate(1727654400, usegmt=True)
+    html = [("content-type", "text/html; charset=utf-8"), ("last-modified", lm)]
+    by_domain: dict[str, list[str]] = {d: [] for d in WHITELIST}
+    for p in manifest["pages"]:
+        arc.add("GET", p["url"], 200, html, (corpus_dir / p["file"]).read_bytes())
+        by_domain.setdefault(urlsplit(p["url"]).netloc, []).append(p["url"])
+    for domain, urls in by_domain.items():
+        arc.add("GET", f"https://{domain}/robots.txt", 200, [("content-type", "text/plain")],
+                f"User-agent: *\nDisallow: /cart\nSitemap: https://{domain}/sitemap.xml\n".encode())
+        locs = "".join(f"<url><loc>{u}</loc><lastmod>2025-09-30</lastmod></url>" for u in urls)
+        arc.add("GET", f"https://{domain}/sitemap.xml", 200, [("content-type", "application/xml"), ("etag", f'"{domain}-sm"')],
+                f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{locs}</urlset>'.encode())
+        links = "".join(f'<a href="{u}">{u}</a>' for u in urls)
+        arc.add("GET", f"https://{domain}/", 200, html, f"<html><body><h1>{domain}</h1>{links}</body></html>".encode())
+    arc.add("GET", ECB_URL, 200, [("content-type", "text/xml")], ECB_XML.encode())
+    return arc
+
+def load_archive(source: str | None) -> Archive:
+    """Pfad zu einem Archiv oder None/"corpus" → Archiv aus bench/corpus/."""
+    if not source or source == "corpus":
+        return archive_from_corpus()
+    return Archive.load(Path(source))
+
+# --------------------------------- Main -----------------------------------
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="HTTP-Archive für Offline-Crawls")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="Archiv als lokalen Mock-Server ausliefern")
+    s.add_argument("archive", nargs="?", default="corpus", help="Archiv-Datei oder 'corpus'")
+    s.add_argument("--port", type=int, default=8765)
+    s.add_argument("--latency", type=float, default=0.0, help="Antwortverzögerung (s)")
+    s.add_argument("--jitter", type=float, default=0.0)
+    s.add_argument("--error-rate", type=float, default=0.0, help="Anteil injizierter Fehler (0..1)")
+    s.add_argument("--error-kind", choices=ERROR_KINDS + ("mix",), default="timeout")
+    s.add_argument("--seed", type=int, default=0)
+    c = sub.add_parser("from-corpus", help="Archiv aus bench/corpus/ schreiben")
+    c.add_argument("out")
+    i = sub.add_parser("info", help="Einträge je Host")
+    i.add_argument("archive")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "from-corpus":
+        arc = archive_from_corpus()
+        arc.save(Path(args.out))
+        print(f"[replay] {args.out}: {arc.summary()}")
+    elif args.cmd == "info":
+        print(json.dumps(Archive.load(Path(args.archive)).summary(), indent=1))
+    else:
+        inj = Injector(args.latency, args.jitter, args.error_rate, args.error_kind, args.seed)
+        srv = make_server(load_archive(args.archive), port=args.port, injector=inj)
+        print(f"[replay] Mock-Server auf http://127.0.0.1:{args.port} "
+              f"(vendors_fetch.py --replay http://127.0.0.1:{args.port})")
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            print(f"[replay] {inj.stats}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Persistenter Cache der Seitenanalyse (SQLite) für vendors_fetch.py
+
+- Schlüssel: SHA-256 über URL + Body, vorher flüchtige Tokens entfernt
+  (CSRF-/Nonce-Attribute, Formular-Tokens, Cache-Buster) → byte-gleiche Seiten
+  ohne ETag treffen trotzdem
+- Wert: Ergebnis von analyze_page (parse_structured + looks_product_detail +
+  Angebote) als zlib-JSON, ohne Laufzeiten
+- Versionsschlüssel aus dem Quelltext der Extraktoren und den Parser-Versionen:
+  ändert sich der Code, werden alte Einträge beim Öffnen verworfen
+- größenbegrenzte LRU-Verdrängung über last_access (wie http_cache.py)
+- put/get schreiben ohne Commit; commit() je Domain bzw. close() am Ende des Crawls
+- Zähler (hits, misses, stored, evicted, invalidated) für diagnostics
+"""
+
+from __future__ import annotations
+import hashlib, json, re, sqlite3, time, zlib
+from pathlib import Path
+
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+# nur für den Hash; geparst wird immer der Original-Body
+RE_VOLATILE = re.compile(
+    rb'\b(?:nonce|integrity)\s*=\s*"[^"]*"'
+    rb'|<meta[^>]+name\s*=\s*"(?:csrf-token|csrf-param|_token)"[^>]*>'
+    rb'|<input[^>]+name\s*=\s*"(?:csrf[\w-]*|_csrf[\w-]*|_token|form_key|__RequestVerificationToken|authenticity_token)"[^>]*>'
+    rb'|"(?:csrfToken|csrf_token|formKey|nonce)"\s*:\s*"[^"]*"'
+    rb'|([?&](?:v|ver|_|t|cb)=)[\w.-]+',
+    re.I)
+
+def normalize_body(body: bytes) -> bytes:
+    return RE_VOLATILE.sub(lambda m: m.group(1) or b"", body)
+
+def code_version(*paths: Path, extra: str = "") -> str:
+    """Hash über Quelldateien + Zusatzangaben (Optionen, Bibliotheksversionen)."""
+    h = hashlib.sha256(extra.encode("utf-8"))
+    for p in paths:
+        h.update(Path(p).read_bytes())
+    return h.hexdigest()[:16]
+
+class ParseCache:
+    def __init__(self, path: Path, version: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                key BLOB PRIMARY KEY, version TEXT NOT NULL, data BLOB NOT NULL,
+                size INTEGER NOT NULL, stored_at REAL NOT NULL, last_access REAL NOT NULL
+            )""")
+        self.db.execute("CREATE INDEX IF NOT EXISTS ix_presult_access ON results(last_access)")
+        self.version = version
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0, "invalidated": 0,
+                      "bytes_parsed_saved": 0}
+        self.stats["invalidated"] = self.db.execute("DELETE FROM results WHERE version<>?", (version,)).rowcount
+        self.db.commit()
+        self.total = self.db.execute("SELECT COALESCE(SUM(size),0) FROM results").fetchone()[0]
+
+    @staticmethod
+    def key(url: str, body: bytes, variant: str = "") -> bytes:
+        h = hashlib.sha256(f"{url}\0{variant}\0".encode("utf-8"))
+        h.update(normalize_body(body))
+        return h.digest()
+
+    def get(self, key: bytes, nbytes: int = 0) -> dict | None:
+        row = self.db.execute("SELECT data FROM results WHERE key=?", (key,)).fetchone()
+        if not row:
+            self.stats["misses"] += 1
+            return None
+        self.db.execute("UPDATE results SET last_access=? WHERE key=?", (time.time(), key))
+        self.stats["hits"] += 1
+        self.stats["bytes_parsed_saved"] += nbytes
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: bytes, result: dict):
+        try:
+            data = zlib.compress(json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 6)
+        except (TypeError, ValueError):
+            return  # nicht serialisierbar (exotische extruct-Werte) → nicht cachen
+        if len(data) > self.max_bytes // 10:
+            return
+        old = self.db.execute("SELECT size FROM results WHERE key=?", (key,)).fetchone()
+        now = time.time()
+        self.db.execute("INSERT OR REPLACE INTO results VALUES (?,?,?,?,?,?)",
+                        (key, self.version, data, len(data), now, now))
+        self.total += len(data) - (old[0] if old else 0)
+        self.stats["stored"] += 1
+        self.evict()
+
+    def commit(self):
+        self.db.commit()
+
+    def evict(self):
+        while self.total > self.max_bytes:
+            rows = self.db.execute("SELECT key, size FROM results ORDER BY last_access LIMIT 32").fetchall()
+            if not rows: break
+            for key, size in rows:
+                self.db.execute("DELETE FROM results WHERE key=?", (key,))
+                self.total -= size
+                self.stats["evicted"] += 1
+                if self.total <= self.max_bytes: break
+
+    def summary(self) -> dict:
+        s = dict(self.stats)
+        lookups = s["hits"] + s["misses"]
+        s["hit_rate"] = round(s["hits"] / lookups, 4) if lookups else None
+        s["size_bytes"] = self.total
+        s["version"] = self.version
+        return s
+
+    def close(self):
+        try:
+            self.db.commit(); self.db.close()
+        except Exception:
+            pass
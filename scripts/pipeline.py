@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gesamtlauf als DAG: ECB-Kurs, stooq-Spot, FRED, Händler-Crawl, Analytics
+
+- unabhängige Stufen laufen gleichzeitig über einen gemeinsamen httpx-Client
+  (ein Verbindungspool, HTTP/2 je Host)
+- abhängige Stufen bekommen die Ergebnisse im Speicher statt spot.json/history.json
+  zurückzulesen → Aufpreise immer gegen den Spot aus demselben Lauf
+- Ausgaben werden gesammelt und am Ende in einem Schritt geschrieben: erst alle
+  .tmp-Dateien, dann os.replace je Datei (kein Lauf hinterlässt halbe Stände)
+- Start/Dauer/Status je Stufe in diag.json unter "pipeline"
+
+  fx ──────────┐
+  spot ──┬─────┴─ vendors
+  fred ──┴─ history ── analytics
+
+  python scripts/pipeline.py                      # alles
+  python scripts/pipeline.py --skip vendors       # nur Marktdaten + Analytics
+  python scripts/pipeline.py --workers -1         # übrige Optionen gehen an vendors_fetch
+"""
+
+from __future__ import annotations
+import argparse, asyncio, json, os, sys, time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+import fetch_data as fd
+import vendors_fetch as vf
+from fred_history import load_history, merge_column_rows, update_rows
+from stage_timing import RunProfiler
+
+MAX_CONNECTIONS = 20
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable[..., Awaitable]  # bekommt die Ergebnisse der deps als Keyword-Argumente
+    deps: tuple[str, ...] = ()
+
+async def run_dag(stages: list[Stage], skip: set[str] = frozenset()) -> tuple[dict, dict]:
+    """
+    Jede Stufe startet, sobald ihre deps fertig sind. Fehler und übersprungene Stufen
+    liefern None; die abhängigen Stufen entscheiden selbst, ob sie damit weiterkommen.
+    """
+    t0 = time.perf_counter()
+    tasks: dict[str, asyncio.Task] = {}
+    report: dict[str, dict] = {}
+
+    async def run(st: Stage):
+        inputs = {d: await tasks[d] for d in st.deps}
+        rep = report[st.name] = {"deps": list(st.deps), "start_ms": round((time.perf_counter() - t0) * 1000, 1)}
+        if st.name in skip:
+            rep.update(status="skipped", ms=0.0)
+            return None
+        t1 = time.perf_counter()
+        try:
+            res = await st.fn(**inputs)
+            rep["status"] = "ok"
+        except Exception as e:
+            res = None
+            first_line = (str(e).splitlines() or [""])[0]
+            rep.update(status="failed", error=f"{type(e).__name__}: {first_line}")
+        rep["ms"] = round((time.perf_counter() - t1) * 1000, 1)
+        return res
+
+    for st in stages:
+        missing = [d for d in st.deps if d not in tasks]
+        if missing:
+            raise ValueError(f"Stufe {st.name}: unbekannte/spätere deps {missing}")
+        tasks[st.name] = asyncio.create_task(run(st))
+    results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+    return results, {"wall_ms": round((time.perf_counter() - t0) * 1000, 1), "stages": report}
+
+# -------------------------------- Stufen ----------------------------------
+
+def build_stages(client: httpx.AsyncClient, vargs: argparse.Namespace, rows: list[dict]) -> list[Stage]:
+    async def fx():
+        r = await client.get(vf.ECB_URL, headers=vf.HEADERS, timeout=vf.HTTP_TIMEOUT, follow_redirects=True)
+        rate = vf.parse_ecb_eurusd(r.content) if r.status_code == 200 else None
+        return rate or vf.USD_PER_EUR_DEFAULT
+
+    async def spot():
+        series = fd.load_spot_series()
+        stats = await fd.aupdate_spot_series(client, series)
+        if not series:
+            raise RuntimeError("stooq XAUUSD parse failed")
+        spot_date = max(series)
+        return {"series": series, "stats": stats, "payload": fd.spot_payload(series[spot_date], spot_date)}
+
+    async def fred():
+        new_rows, changed, diag = await update_rows(rows, os.environ.get("FRED_API_KEY"), client=client)
+        return {"rows": new_rows, "changed": changed, "diag": diag}
+
+    async def history(fred, spot):
+        out_rows = fred["rows"] if fred else rows
+        changed = bool(fred and fred["changed"])
+        gold = None
+        if spot:
+            # Schlusskurse als Gold-Spalte (Prognose/Analogien)
+            out_rows, gold = merge_column_rows(out_rows, fd.GOLD_COLUMN, spot["series"])
+            changed = changed or bool(gold["updated"])
+        return {"rows": out_rows, "changed": changed, "gold": gold}
+
+    async def vendors(fx, spot):
+        out = vf.new_output()
+        # Spot-Stufe fehlgeschlagen → None: crawl liest den letzten guten Spot aus spot.json
+        # (collect_outputs lässt die Datei stehen; diagnostics.spot.source = "spot.json")
+        payload = spot["payload"] if spot else None
+        await vf.crawl(out, vargs, client, spot=payload, eurusd=fx)
+        return out
+
+    async def analytics(history):
+        import analogs, history_columnar
+        from analytics import History, timed_build
+        # unveränderte Historie → gleiche Kennzahlen; nicht neu schreiben (sonst nur neues
+        # "generated"/build_ms und alle 15 min ein Daten-Commit)
+        outputs = [fd.DATA_DIR / n for n in ("analytics.json", "analogs.json", "history/manifest.json")]
+        if history and not history["changed"] and all(p.exists() for p in outputs):
+            return {"unchanged": True}
+
+        def work():
+            h = History(history["rows"])
+            files, manifest = history_columnar.encode(history["rows"])
+            return {"analytics": timed_build(h), "analogs": analogs.payload(h),
+                    "columnar": files, "manifest": manifest}
+        return await asyncio.to_thread(work)  # NumPy/gzip, während der Crawl weiterläuft
+
+    return [
+        Stage("fx", fx),
+        Stage("spot", spot),
+        Stage("fred", fred),
+        Stage("history", history, ("fred", "spot")),
+        Stage("vendors", vendors, ("fx", "spot")),
+        Stage("analytics", analytics, ("history",)),
+    ]
+
+# ------------------------------ Ausgaben ----------------------------------
+
+def _json(obj, **kw) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, **kw).encode("utf-8")
+
+def collect_outputs(res: dict, report: dict, data_dir: Path) -> tuple[dict[Path, bytes], dict]:
+    """Alle Dateien dieses Laufs (Pfad → Inhalt) und die diag.json-Felder."""
+    out: dict[Path, bytes] = {}
+    diag: dict = {}
+    spot, fred, hist = res.get("spot"), res.get("fred"), res.get("history")
+
+    if fred:
+        diag.update(fred["diag"])
+        diag["gold_valid"] = fred["diag"]["series_counts"].get(fd.GOLD_COLUMN, 0)
+    if report["stages"]["spot"]["status"] != "skipped":
+        if spot:
+            diag["spot"] = spot["stats"]
+            if spot["stats"]["updated"]:
+                out[data_dir / fd.SPOT_SERIES_FILE] = fd.spot_series_text(spot["series"]).encode("utf-8")
+            if fd.spot_changed(spot["payload"], data_dir / "spot.json"):  # sonst nur neuer timestamp
+                out[data_dir / "spot.json"] = _json(spot["payload"], indent=2)
+        elif not (data_dir / "spot.json").exists():  # sonst bleibt der letzte gute Spot stehen
+            out[data_dir / "spot.json"] = _json(fd.spot_fallback_payload(), indent=2)
+    if hist:
+        if hist["gold"]:
+            diag["gold_valid"] = hist["gold"]["valid"]
+            diag["gold_backfill"] = len(spot["series"])
+            diag["rows"] = hist["gold"]["rows"]
+            diag.setdefault("series_counts", {})[fd.GOLD_COLUMN] = hist["gold"]["valid"]
+        if hist["changed"] or not (data_dir / "history.json").exists():
+            out[data_dir / "history.json"] = _json({"history": hist["rows"]})
+    if res.get("vendors") and vf.vendors_changed(res["vendors"], data_dir / "vendors_auto.json"):
+        out[data_dir / "vendors_auto.json"] = _json(res["vendors"], indent=2)
+    if res.get("analytics") and not res["analytics"].get("unchanged"):
+        a = res["analytics"]
+        out[data_dir / "analytics.json"] = _json(a["analytics"], indent=1)
+        out[data_dir / "analogs.json"] = _json(a["analogs"], indent=1)
+        out[data_dir / "history" / "manifest.json"] = _json(a["manifest"], indent=1)
+
+    diag["pipeline"] = report
+    return out, diag
+
+def commit(files: dict[Path, bytes], columnar: dict[str, bytes] | None, data_dir: Path) -> dict:
+    """
+    Erst alles als .tmp schreiben, dann umbenennen. Die Jahrespartitionen sind
+    inhaltsadressiert und kommen vor manifest.json an, das auf sie zeigt.
+    """
+    import history_columnar
+    t0 = time.perf_counter()
+    written = partitions = pruned = 0
+    if columnar:
+        col_dir = data_dir / history_columnar.OUT_SUBDIR
+        col_dir.mkdir(parents=True, exist_ok=True)
+        partitions = sum(history_columnar.write_once(col_dir / name, data) for name, data in columnar.items())
+    staged = []
+    for path, data in files.items():
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        staged.append((tmp, path))
+    for tmp, path in staged:
+        os.replace(tmp, path); written += 1
+    if columnar:
+        pruned = history_columnar.prune(col_dir, columnar)
+    return {"files": written, "partitions_new": partitions, "partitions_pruned": pruned,
+            "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+def log_metrics(res: dict, report: dict, diag: dict):
+    """Kennzahlen dieses Laufs an .cache/metrics.jsonl anhängen (Stufenzeiten als Wandzeit je Art)."""
+    import run_metrics
+    st = report["stages"]
+    recs = []
+    if res.get("vendors"):
+        recs.append(run_metrics.vendors_record(res["vendors"], st["vendors"]["ms"] / 1000.0))
+    if "fred" in diag or "spot" in diag:
+        ms = max(st[k]["ms"] for k in ("spot", "fred") if st[k]["status"] != "skipped")
+        recs.append(run_metrics.market_record(diag, ms / 1000.0))
+    recs.append(run_metrics.pipeline_record(report))
+    run_metrics.log_run(*recs, path=vf.CACHE_DIR / run_metrics.METRICS_FILE.name)
+
+def update_diag_bytes(data_dir: Path, updates: dict) -> bytes:
+    """Wie fetch_data.update_diag: Felder aus früheren Läufen bleiben erhalten."""
+    try:
+        diag = json.loads((data_dir / "diag.json").read_text(encoding="utf-8"))
+    except Exception:
+        diag = {}
+    diag.update(updates)
+    return _json(diag)
+
+# --------------------------------- Main -----------------------------------
+
+async def run_pipeline(vargs: argparse.Namespace, skip: set[str]) -> dict:
+    data_dir = fd.DATA_DIR
+    rows = load_history(data_dir / "history.json")
+    limits = httpx.Limits(max_connections=MAX_CONNECTIONS)
+    # --record/--replay gelten für alle Stufen (ECB, stooq, FRED, Händler)
+    async with httpx.AsyncClient(http2=True, limits=limits, transport=vf.http_transport(vargs)) as client:
+        res, report = await run_dag(build_stages(client, vargs, rows), skip)
+    files, diag = collect_outputs(res, report, data_dir)
+    files[data_dir / "diag.json"] = update_diag_bytes(data_dir, diag)
+    report["commit"] = commit(files, (res.get("analytics") or {}).get("columnar"), data_dir)
+    log_metrics(res, report, diag)
+    return report
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Spot, FRED, Händler-Crawl und Analytics in einem Lauf")
+    ap.add_argument("--skip", action="append", default=[], choices=["fx", "spot", "fred", "vendors", "analytics"],
+                    help="Stufe auslassen (mehrfach möglich)")
+    args, rest = ap.parse_known_args(argv)
+    vargs = vf.parse_args(rest)
+
+    if vargs.profile:
+        with RunProfiler(Path(vargs.profile)):
+            report = asyncio.run(run_pipeline(vargs, set(args.skip)))
+    else:
+        report = asyncio.run(run_pipeline(vargs, set(args.skip)))
+
+    for name, st in report["stages"].items():
+        extra = f" ({st['error']})" if st.get("error") else ""
+        print(f"[pipeline] {name:9s} {st['status']:7s} start={st['start_ms']:8.1f} ms  dauer={st['ms']:8.1f} ms{extra}")
+    c = report["commit"]
+    print(f"[pipeline] gesamt {report['wall_ms']} ms; {c['files']} Dateien geschrieben, "
+          f"{c['partitions_new']} neue Partitionen, {c['partitions_pruned']} entfernt")
+    # wie fetch_data.py: fehlgeschlagene Stufen nur melden, der Commit-Schritt läuft trotzdem
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Append-only Zeitreihe aller Händler-Beobachtungen (SQLite) für vendors_fetch.py
+
+- je Lauf jedes Item (nicht nur das beste je Produkt): Zeit, Lauf, Domain, Produktklasse,
+  Preis, Gewicht, Premium, Verfügbarkeit, URL
+- run = ein Zeitstempel je Lauf (Start), damit Verläufe je Lauf statt je Seitenabruf gruppieren
+- kompakt: Ganzzahlen statt Fließkomma/Text (Cent, mg, Basispunkte, Unix-Sekunden),
+  Domain/Produkt/Verfügbarkeit/URL über Lookup-Tabellen
+- Index (product, domain, ts) → Bereichsabfragen bleiben auch nach Jahren schnell
+
+CLI:
+  python scripts/price_store.py premium bar-100g --days 30 [--domain philoro.de] [--json]
+  python scripts/price_store.py ingest data/vendors_auto.json
+  python scripts/price_store.py stats
+  python scripts/price_store.py backup /tmp/prices.sqlite3   # konsistente Kopie (VACUUM INTO)
+"""
+
+from __future__ import annotations
+import argparse, calendar, json, sqlite3, sys, time
+from pathlib import Path
+
+DEFAULT_PATH = Path(__file__).resolve().parents[1] / ".cache" / "prices.sqlite3"
+
+def _ts(checked_at: str | None) -> int:
+    if checked_at:
+        try:
+            return calendar.timegm(time.strptime(checked_at, "%Y-%m-%dT%H:%M:%SZ"))
+        except ValueError:
+            pass
+    return int(time.time())
+
+def _iso(ts: int) -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(ts))
+
+def _scaled(v, factor: int) -> int | None:
+    return None if v is None else int(round(float(v) * factor))
+
+class PriceStore:
+    LOOKUPS = ("domain", "product", "availability", "url")
+
+    def __init__(self, path: Path = DEFAULT_PATH, run_ts: int | None = None):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        for name in self.LOOKUPS:
+            self.db.execute(f"CREATE TABLE IF NOT EXISTS {name} (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS obs (
+                ts INTEGER NOT NULL, domain INTEGER NOT NULL, product INTEGER NOT NULL,
+                price_cents INTEGER NOT NULL, weight_mg INTEGER, premium_bp INTEGER,
+                availability INTEGER, url INTEGER, run INTEGER
+            )""")
+        if "run" not in [r[1] for r in self.db.execute("PRAGMA table_info(obs)")]:
+            self.db.execute("ALTER TABLE obs ADD COLUMN run INTEGER")  # ältere Stores: run = NULL → ts
+        self.db.execute("CREATE INDEX IF NOT EXISTS ix_obs ON obs(product, domain, ts)")
+        self._ids: dict[tuple[str, str], int] = {}
+        self.run = run_ts if run_ts is not None else int(time.time())
+        self.appended = 0
+
+    def _id(self, table: str, name: str | None) -> int | None:
+        if name is None: return None
+        key = (table, name)
+        if key not in self._ids:
+            self.db.execute(f"INSERT OR IGNORE INTO {table}(name) VALUES (?)", (name,))
+            self._ids[key] = self.db.execute(f"SELECT id FROM {table} WHERE name=?", (name,)).fetchone()[0]
+        return self._ids[key]
+
+    def append(self, domain: str, items: list[dict]) -> int:
+        """Items im vendors_auto.json-Format anhängen; Preise in EUR."""
+        rows = []
+        for it in items:
+            price = (it.get("price") or {}).get("value")
+            if price is None or not it.get("product"): continue
+            rows.append((_ts(it.get("checked_at")), self._id("domain", domain), self._id("product", it["product"]),
+                         _scaled(price, 100), _scaled(it.get("weight_g"), 1000), _scaled(it.get("premium"), 10000),
+                         self._id("availability", it.get("availability")), self._id("url", it.get("url")), self.run))
+        self.db.executemany("INSERT INTO obs VALUES (?,?,?,?,?,?,?,?,?)", rows)
+        self.db.commit()
+        self.appended += len(rows)
+        return len(rows)
+
+    def query(self, product: str, days: float | None = None, domains: list[str] | None = None,
+              since: int | None = None, until: int | None = None) -> list[dict]:
+        if days is not None:
+            since = int(time.time() - days * 86400)
+        sql = """
+            SELECT o.ts, COALESCE(o.run, o.ts), d.name, o.price_cents, o.weight_mg, o.premium_bp, a.name, u.name
+            FROM obs o JOIN product p ON p.id=o.product JOIN domain d ON d.id=o.domain
+            LEFT JOIN availability a ON a.id=o.availability LEFT JOIN url u ON u.id=o.url
+            WHERE p.name=?"""
+        args: list = [product]
+        if domains:
+            sql += f" AND d.name IN ({','.join('?' * len(domains))})"; args += domains
+        if since is not None:
+            sql += " AND o.ts>=?"; args.append(since)
+        if until is not None:
+            sql += " AND o.ts<?"; args.append(until)
+        sql += " ORDER BY o.ts, d.name"
+        return [{
+            "ts": _iso(ts), "run": _iso(run), "domain": dom, "price": cents / 100.0,
+            "weight_g": None if mg is None else mg / 1000.0,
+            "premium": None if bp is None else bp / 10000.0,
+            "availability": avail, "url": url,
+        } for ts, run, dom, cents, mg, bp, avail, url in self.db.execute(sql, args)]
+
+    def premium_history(self, product: str, days: float = 30, domains: list[str] | None = None) -> dict[str, list]:
+        """{domain: [(run, premium), …]} – je Lauf das kleinste Premium der Domain."""
+        out: dict[str, dict[str, float]] = {}
+        for r in self.query(product, days=days, domains=domains):
+            if r["premium"] is None: continue
+            series = out.setdefault(r["domain"], {})
+            series[r["run"]] = min(series.get(r["run"], r["premium"]), r["premium"])
+        return {d: sorted(s.items()) for d, s in out.items()}
+
+    def stats(self) -> dict:
+        n, t0, t1 = self.db.execute("SELECT COUNT(*), MIN(ts), MAX(ts) FROM obs").fetchone()
+        return {"rows": n, "first": _iso(t0) if t0 else None, "last": _iso(t1) if t1 else None,
+                "products": [r[0] for r in self.db.execute("SELECT name FROM product ORDER BY name")],
+                "domains": [r[0] for r in self.db.execute("SELECT name FROM domain ORDER BY name")]}
+
+    def backup(self, dest: Path):
+        """Konsistente, kompakte Kopie (auch während ein Lauf noch schreibt)."""
+        self.db.commit()
+        dest.unlink(missing_ok=True)
+        self.db.execute("VACUUM INTO ?", (str(dest),))
+
+    def close(self):
+        try:
+            self.db.commit(); self.db.close()
+        except Exception:
+            pass
+
+# --------------------------------- CLI ------------------------------------
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Händler-Preis-/Premium-Historie")
+    ap.add_argument("--db", default=str(DEFAULT_PATH))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    q = sub.add_parser("premium", help="Premium-Verlauf eines Produkts je Händler")
+    q.add_argument("product")
+    q.add_argument("--days", type=float, default=30)
+    q.add_argument("--domain", action="append")
+    q.add_argument("--json", action="store_true")
+    i = sub.add_parser("ingest", help="Items aus einer vendors_auto.json anhängen")
+    i.add_argument("file")
+    sub.add_parser("stats")
+    b = sub.add_parser("backup", help="konsistente Kopie der Datenbank schreiben")
+    b.add_argument("dest")
+    args = ap.parse_args(argv)
+
+    store = PriceStore(Path(args.db))
+    try:
+        if args.cmd == "ingest":
+            j = json.loads(Path(args.file).read_text(encoding="utf-8"))
+            store.run = _ts(j.get("generated"))
+            n = sum(store.append(v["domain"], v.get("items") or []) for v in j.get("vendors") or [])
+            print(f"appended {n} observations")
+        elif args.cmd == "backup":
+            store.backup(Path(args.dest))
+            print(f"wrote {args.dest}")
+        elif args.cmd == "stats":
+            print(json.dumps(store.stats(), ensure_ascii=False, indent=2))
+        else:
+            hist = store.premium_history(args.product, args.days, args.domain)
+            if args.json:
+                print(json.dumps(hist, ensure_ascii=False, indent=2))
+            else:
+                for dom, series in sorted(hist.items()):
+                    print(f"# {dom} ({len(series)} Punkte)")
+                    for ts, prem in series:
+                        print(f"{ts}  {prem * 100:6.2f} %")
+    finally:
+        store.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
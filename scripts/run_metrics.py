@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kennzahlen-Historie über Läufe hinweg + Regressionsprüfung
+
+- jeder Lauf (fetch_data.py, vendors_fetch.py, pipeline.py) hängt einen kompakten
+  Datensatz an .cache/metrics.jsonl an (rollierend, höchstens MAX_RECORDS Zeilen)
+- Händler-Crawl: Wandzeit, Requests, Bytes, Seiten/s, Items je Seite, Block-Quote,
+  je Domain Seiten/Items/Latenz (Mittel, p95 aus dem Histogramm)
+- Marktdaten: Wandzeit, Requests, Bytes, FRED-Erfolgsquote, Gold-Punkte
+- check: letzter Lauf gegen den Median der vorigen Läufe derselben Art
+  (vendors:full, vendors:refresh-only, market, market:spot-only, pipeline); Ausgabe als OpenMetrics-Text
+
+  python scripts/run_metrics.py check                      # alle Arten, Exit 0
+  python scripts/run_metrics.py check --fail --out metrics.prom
+  python scripts/run_metrics.py show --kind vendors:full --last 5
+"""
+
+from __future__ import annotations
+import argparse, calendar, json, statistics, sys, time
+from pathlib import Path
+
+from stage_timing import HIST_BUCKETS_MS
+
+ROOT = Path(__file__).resolve().parents[1]
+METRICS_FILE = ROOT / ".cache" / "metrics.jsonl"
+MAX_RECORDS = 2000
+WINDOW = 20
+MIN_BASELINE = 3
+TOLERANCE = 0.30
+
+# Kennzahl: (Richtung +1 = höher ist besser / −1 = niedriger ist besser, Mindestabstand absolut)
+CHECKS: dict[str, tuple[int, float]] = {
+    "wall_s": (-1, 5.0),
+    "pages_per_s": (+1, 0.05),
+    "items": (+1, 1.0),
+    "items_per_page": (+1, 0.02),
+    "block_rate": (-1, 0.05),
+    "fred_ok_rate": (+1, 0.05),
+    "gold_valid": (+1, 1.0),
+    "failed_stages": (-1, 0.5),
+}
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+def hist_quantile(hist: dict, q: float) -> float | None:
+    """Obere Bucket-Grenze (ms), in der das q-Quantil liegt (Histogramm aus stage_timing)."""
+    labels = [f"<={b}ms" for b in HIST_BUCKETS_MS] + ["+inf"]
+    total = sum(hist.values())
+    if not total: return None
+    acc = 0
+    for lbl, edge in zip(labels, list(HIST_BUCKETS_MS) + [None]):
+        acc += hist.get(lbl, 0)
+        if acc >= q * total:
+            return float(edge) if edge is not None else float(HIST_BUCKETS_MS[-1])
+    return None
+
+def _ratio(a: float, b: float, nd: int = 4) -> float | None:
+    return round(a / b, nd) if b else None
+
+# ------------------------------ Datensätze --------------------------------
+
+def vendors_record(out: dict, wall_s: float) -> dict:
+    """Aus vendors_auto.json-Struktur (diagnostics) eines Crawls."""
+    diag = out.get("diagnostics") or {}
+    tot = diag.get("totals") or {}
+    domains, requests, nbytes = {}, 0, 0
+    for d in diag.get("domains") or []:
+        t = d.get("timing") or {}
+        fetch, err = t.get("fetch") or {}, t.get("fetch_error") or {}
+        req = fetch.get("count", 0) + err.get("count", 0)
+        requests += req
+        nbytes += fetch.get("bytes", 0) + (t.get("sitemaps") or {}).get("bytes", 0)
+        domains[d["domain"]] = {"pages": d.get("pages", 0), "items": d.get("items", 0), "requests": req,
+                                "errors": err.get("count", 0), "latency_ms_mean": fetch.get("mean_ms"),
+                                "latency_ms_p95": hist_quantile(fetch.get("hist") or {}, 0.95)}
+    pages = tot.get("pages", 0)
+    blocked = sum(d.get("pages_blocked", 0) for d in diag.get("domains") or [])
+    return {"ts": _now(), "kind": f"vendors:{diag.get('mode') or 'full'}", "wall_s": round(wall_s, 3),
+            "requests": requests, "bytes": nbytes, "pages": pages, "items": tot.get("items", 0),
+            "pages_per_s": _ratio(pages, wall_s, 3), "items_per_page": _ratio(tot.get("items", 0), pages),
+            "block_rate": _ratio(blocked, pages + blocked), "domains": domains}
+
+def market_record(diag: dict, wall_s: float) -> dict:
+    """Aus den diag.json-Feldern von fetch_data.py bzw. der fred-/spot-Stufe."""
+    fred = diag.get("fred") or {}
+    spot = diag.get("spot") or {}
+    ok = sum(1 for s in fred.values() if s.get("ok"))
+    # ohne FRED (Spot-only-Läufe) eigene Art, sonst passt die Wandzeit-Baseline nicht
+    return {"ts": _now(), "kind": "market" if fred else "market:spot-only", "wall_s": round(wall_s, 3),
+            "requests": len(fred) + (1 if spot else 0),
+            "bytes": sum(s.get("bytes", 0) for s in fred.values()) + spot.get("bytes", 0),
+            "fred_series": len(fred), "fred_ok_rate": _ratio(ok, len(fred)),
+            "spot_ok": bool(spot), "gold_valid": diag.get("gold_valid", 0)}
+
+def pipeline_record(report: dict) -> dict:
+    stages = report.get("stages") or {}
+    return {"ts": _now(), "kind": "pipeline", "wall_s": round(report.get("wall_ms", 0) / 1000.0, 3),
+            "failed_stages": sum(1 for s in stages.values() if s.get("status") == "failed"),
+            "stages_ms": {k: s.get("ms") for k, s in stages.items()}}
+
+def append(records: list[dict] | dict, path: Path = METRICS_FILE, keep: int = MAX_RECORDS):
+    """Anhängen, bei Überlänge auf die letzten keep Zeilen kürzen (atomar ersetzt)."""
+    records = [records] if isinstance(records, dict) else records
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for r in records:
+            f.write(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n")
+    lines = path.read_text(encoding="utf-8").splitlines()
+    if len(lines) > keep:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text("\n".join(lines[-keep:]) + "\n", encoding="utf-8")
+        tmp.replace(path)
+
+def log_run(*records: dict, path: Path | None = None):
+    """Für die Datenläufe: Historie fortschreiben, Fehler nur melden (der Lauf selbst zählt)."""
+    try:
+        append(list(records), path or METRICS_FILE)
+    except Exception as e:
+        print(f"[metrics] konnte {path or METRICS_FILE} nicht schreiben: {e}", file=sys.stderr)
+
+def load(path: Path = METRICS_FILE) -> list[dict]:
+    if not path.exists(): return []
+    out = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            out.append(json.loads(line))
+        except ValueError:
+            continue  # abgebrochene Zeile
+    return out
+
+# -------------------------------- Prüfung ---------------------------------
+
+def check(records: list[dict], kind: str, window: int = WINDOW, tolerance: float = TOLERANCE) -> dict:
+    """Letzter Datensatz der Art gegen den Median der window vorigen."""
+    runs = [r for r in records if r.get("kind") == kind]
+    if not runs:
+        return {"kind": kind, "runs": 0, "latest": None, "baseline": {}, "regressions": []}
+    latest, prev = runs[-1], runs[-1 - window:-1]
+    baseline, regressions = {}, []
+    for metric, (direction, min_delta) in CHECKS.items():
+        vals = [r[metric] for r in prev if isinstance(r.get(metric), (int, float))]
+        cur = latest.get(metric)
+        if len(vals) < MIN_BASELINE or not isinstance(cur, (int, float)):
+            continue
+        base = round(statistics.median(vals), 4)
+        baseline[metric] = base
+        delta = (cur - base) * direction  # negativ = schlechter
+        if -delta >= min_delta and -delta > tolerance * abs(base):
+            regressions.append({"metric": metric, "latest": cur, "baseline": base,
+                                "change": round((cur - base) / base, 4) if base else None})
+    return {"kind": kind, "runs": len(runs), "baseline_runs": len(prev), "latest": latest,
+            "baseline": baseline, "regressions": regressions}
+
+def _labels(**kw) -> str:
+    return "{" + ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                          for k, v in kw.items()) + "}"
+
+def openmetrics(results: list[dict]) -> str:
+    """OpenMetrics-Text (Gauges) für Scraper/Pushgateway; endet mit # EOF."""
+    fam = {
+        "goldsignal_run_value": "Kennzahl des letzten Laufs",
+        "goldsignal_run_baseline": "Median der vorigen Läufe derselben Art",
+        "goldsignal_run_regression": "1 = Regression gegenüber der Baseline",
+        "goldsignal_run_timestamp_seconds": "Zeitpunkt des letzten Laufs",
+        "goldsignal_domain_pages": "Seiten je Domain im letzten Crawl",
+        "goldsignal_domain_items": "Items je Domain im letzten Crawl",
+        "goldsignal_domain_latency_seconds": "Fetch-Latenz je Domain (Mittel bzw. p95)",
+    }
+    samples: dict[str, list[str]] = {k: [] for k in fam}
+    for res in results:
+        latest, kind = res["latest"], res["kind"]
+        if not latest: continue
+        ts = calendar.timegm(time.strptime(latest["ts"], "%Y-%m-%dT%H:%M:%SZ"))
+        samples["goldsignal_run_timestamp_seconds"].append(f"{_labels(kind=kind)} {ts:.0f}")
+        bad = {r["metric"] for r in res["regressions"]}
+        for metric in ("wall_s", "requests", "bytes", "pages", "items", *CHECKS):
+            v = latest.get(metric)
+            if isinstance(v, bool) or not isinstance(v, (int, float)): continue
+            if any(s.startswith(_labels(kind=kind, metric=metric)) for s in samples["goldsignal_run_value"]): continue
+            samples["goldsignal_run_value"].append(f"{_labels(kind=kind, metric=metric)} {v}")
+        for metric, base in res["baseline"].items():
+            samples["goldsignal_run_baseline"].append(f"{_labels(kind=kind, metric=metric)} {base}")
+            samples["goldsignal_run_regression"].append(f"{_labels(kind=kind, metric=metric)} {int(metric in bad)}")
+        for dom, d in (latest.get("domains") or {}).items():
+            samples["goldsignal_domain_pages"].append(f"{_labels(kind=kind, domain=dom)} {d.get('pages', 0)}")
+            samples["goldsignal_domain_items"].append(f"{_labels(kind=kind, domain=dom)} {d.get('items', 0)}")
+            for stat, key in (("mean", "latency_ms_mean"), ("p95", "latency_ms_p95")):
+                if d.get(key) is not None:
+                    samples["goldsignal_domain_latency_seconds"].append(
+                        f"{_labels(kind=kind, domain=dom, stat=stat)} {d[key] / 1000.0:.4f}")
+    lines = []
+    for name, help_text in fam.items():
+        if not samples[name]: continue
+        lines += [f"# TYPE {name} gauge", f"# HELP {name} {help_text}"]
+        lines += [name + s for s in samples[name]]
+    return "\n".join(lines + ["# EOF"]) + "\n"
+
+# --------------------------------- Main -----------------------------------
+
+def main(argv: list[str] | None = None):
+    ap = argparse.ArgumentParser(description="Kennzahlen-Historie der Datenläufe")
+    ap.add_argument("--file", default=str(METRICS_FILE))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("check", help="letzten Lauf gegen die Baseline prüfen (OpenMetrics auf stdout)")
+    c.add_argument("--kind", action="append", help="nur diese Art(en), Standard: alle")
+    c.add_argument("--window", type=int, default=WINDOW)
+    c.add_argument("--tolerance", type=float, default=TOLERANCE, help="relative Verschlechterung ab der gemeldet wird")
+    c.add_argument("--out", help="OpenMetrics-Text zusätzlich in diese Datei")
+    c.add_argument("--fail", action="store_true", help="Exit 1 bei Regression")
+    s = sub.add_parser("show", help="letzte Datensätze anzeigen")
+    s.add_argument("--kind")
+    s.add_argument("--last", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    records = load(Path(args.file))
+    if args.cmd == "show":
+        for r in [r for r in records if not args.kind or r.get("kind") == args.kind][-args.last:]:
+            print(json.dumps(r, ensure_ascii=False))
+        return 0
+
+    kinds = args.kind or sorted({r.get("kind") for r in records if r.get("kind")})
+    results = [check(records, k, args.window, args.tolerance) for k in kinds]
+    text = openmetrics(results)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    sys.stdout.write(text)
+    n = 0
+    for res in results:
+        for reg in res["regressions"]:
+            n += 1
+            print(f"[metrics] REGRESSION {res['kind']} {reg['metric']}: {reg['latest']} "
+                  f"(Baseline {reg['baseline']}, {res['baseline_runs']} Läufe)", file=sys.stderr)
+    print(f"[metrics] {len(results)} Arten geprüft, {n} Regressionen", file=sys.stderr)
+    return 1 if (n and args.fail) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
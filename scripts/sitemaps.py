@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Streaming-Sitemap-Leser für vendors_fetch.py
+
+- inkrementell (lxml XMLPullParser): Bytes rein, Einträge raus; bereits
+  gelesene Elemente werden sofort verworfen → Speicher unabhängig von der
+  Sitemap-Größe
+- .xml.gz wird anhand der gzip-Magic-Bytes erkannt und on-the-fly entpackt
+- liefert <url>- und <sitemap>-Einträge inkl. <lastmod>/<priority>
+"""
+
+from __future__ import annotations
+import zlib
+
+from lxml import etree
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+def _localname(tag) -> str:
+    if not isinstance(tag, str): return ""
+    return tag.rsplit("}", 1)[-1].lower()
+
+class SitemapReader:
+    def __init__(self):
+        self._head = b""
+        self._gz = None
+        self._started = False
+        self.bytes_in = 0
+        self.parser = etree.XMLPullParser(events=("end",), tag=("{*}url", "{*}sitemap"), recover=True,
+                                          huge_tree=True, resolve_entities=False, no_network=True)
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        self.bytes_in += len(chunk)
+        if not self._started:
+            # Magic-Bytes abwarten, dann Modus festlegen
+            self._head += chunk
+            if len(self._head) < 2: return []
+            chunk, self._head, self._started = self._head, b"", True
+            if chunk[:2] == GZIP_MAGIC:
+                self._gz = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._gz is not None:
+            chunk = self._gz.decompress(chunk)
+        if chunk:
+            self.parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> list[dict]:
+        if not self._started and self._head:
+            self._started = True
+            self.parser.feed(self._head)
+        if self._gz is not None:
+            rest = self._gz.flush()
+            if rest: self.parser.feed(rest)
+        try:
+            self.parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        return self._drain()
+
+    def _drain(self) -> list[dict]:
+        out = []
+        for _, el in self.parser.read_events():
+            kind = _localname(el.tag)
+            entry = {"kind": kind, "loc": None, "lastmod": None, "priority": None}
+            for child in el:
+                name = _localname(child.tag)
+                text = (child.text or "").strip()
+                if name == "loc": entry["loc"] = text or None
+                elif name == "lastmod": entry["lastmod"] = text or None
+                elif name == "priority":
+                    try: entry["priority"] = float(text)
+                    except ValueError: pass
+            if entry["loc"]:
+                out.append(entry)
+            # verarbeitete Knoten freigeben
+            el.clear()
+            parent = el.getparent()
+            if parent is not None:
+                while el.getprevious() is not None:
+                    del parent[0]
+        return out
+
+def iter_sitemap_bytes(body: bytes, chunk_size: int = 64 * 1024):
+    """Bereits vorliegende Sitemap (z. B. aus dem Cache) stückweise lesen."""
+    reader = SitemapReader()
+    for i in range(0, len(body), chunk_size):
+        yield from reader.feed(body[i:i + chunk_size])
+    yield from reader.close()
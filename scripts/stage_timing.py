@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stufen-Zeitmessung für vendors_fetch.py
+
+- Wandzeit, Anzahl, Bytes und Latenz-Histogramm je Stufe und je Domain
+  (fetch, pacer_wait, robots, sitemaps, page_parse, je Extraktionspfad, items, …)
+- optional: cProfile + tracemalloc für den ganzen Lauf (--profile), Reports
+  als Textdateien, z. B. als CI-Artefakt
+"""
+
+from __future__ import annotations
+import cProfile, io, pstats, time, tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+
+# obere Bucket-Grenzen in ms; alles darüber landet in "+inf"
+HIST_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+def _new_stat() -> dict:
+    return {"count": 0, "total_s": 0.0, "max_s": 0.0, "bytes": 0, "hist": [0] * (len(HIST_BUCKETS_MS) + 1)}
+
+def _add(st: dict, seconds: float, nbytes: int):
+    st["count"] += 1
+    st["total_s"] += seconds
+    st["max_s"] = max(st["max_s"], seconds)
+    st["bytes"] += nbytes
+    ms = seconds * 1000.0
+    for i, edge in enumerate(HIST_BUCKETS_MS):
+        if ms <= edge:
+            st["hist"][i] += 1
+            break
+    else:
+        st["hist"][-1] += 1
+
+def _export(st: dict) -> dict:
+    labels = [f"<={b}ms" for b in HIST_BUCKETS_MS] + ["+inf"]
+    return {
+        "count": st["count"],
+        "total_s": round(st["total_s"], 4),
+        "mean_ms": round(st["total_s"] * 1000.0 / st["count"], 3) if st["count"] else None,
+        "max_ms": round(st["max_s"] * 1000.0, 3),
+        "bytes": st["bytes"],
+        "hist": {lbl: n for lbl, n in zip(labels, st["hist"]) if n},
+    }
+
+class StageTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: dict[str, dict] = {}
+        self.domains: dict[str, dict[str, dict]] = {}
+
+    def record(self, stage: str, domain: str | None, seconds: float, nbytes: int = 0):
+        _add(self.stages.setdefault(stage, _new_stat()), seconds, nbytes)
+        if domain:
+            _add(self.domains.setdefault(domain, {}).setdefault(stage, _new_stat()), seconds, nbytes)
+
+    def record_many(self, domain: str | None, timings: dict[str, float]):
+        """Zeiten aus analyze_page (ggf. im Pool-Prozess gemessen) übernehmen."""
+        for stage, seconds in timings.items():
+            self.record(stage, domain, seconds)
+
+    @contextmanager
+    def span(self, stage: str, domain: str | None = None):
+        """Misst den Block; Bytes können über das gelieferte dict nachgetragen werden."""
+        info = {"bytes": 0}
+        t0 = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.record(stage, domain, time.perf_counter() - t0, info["bytes"])
+
+    def domain_summary(self, domain: str) -> dict:
+        return {k: _export(v) for k, v in self.domains.get(domain, {}).items()}
+
+    def summary(self) -> dict:
+        return {
+            "wall_s": round(time.perf_counter() - self.started, 3),
+            "stages": {k: _export(v) for k, v in self.stages.items()},
+        }
+
+class RunProfiler:
+    """cProfile + tracemalloc über den ganzen Lauf; schreibt Reports nach out_dir."""
+    def __init__(self, out_dir: Path, top: int = 40):
+        self.out_dir = out_dir
+        self.top = top
+        self.prof = cProfile.Profile()
+
+    def __enter__(self):
+        tracemalloc.start(10)
+        self.prof.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.prof.disable()
+        snap = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+
+        self.prof.dump_stats(str(self.out_dir / "profile.pstats"))
+        buf = io.StringIO()
+        st = pstats.Stats(self.prof, stream=buf).strip_dirs()
+        for key in ("cumulative", "tottime"):
+            buf.write(f"==== sort: {key} ====\n")
+            st.sort_stats(key).print_stats(self.top)
+        (self.out_dir / "profile.txt").write_text(buf.getvalue(), encoding="utf-8")
+
+        lines = [f"current={current / 1024:.1f} KiB peak={peak / 1024:.1f} KiB", ""]
+        for s in snap.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),)).statistics("lineno")[:self.top]:
+            lines.append(str(s))
+        (self.out_dir / "tracemalloc.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return False
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extraktionsprofile je Händler-Domain für vendors_fetch.py
+
+- je Feld (Preis, Währung, Name, Gewicht) eine kurze Liste vorkompilierter
+  lxml.etree.XPath-Ausdrücke, der erste nicht-leere Treffer gewinnt
+- Selektoren nach dem Markup der nachgebauten Korpus-Seiten (bench/corpus/, keine
+  Mitschnitte der echten Shops – gegen Live-Seiten noch nicht geprüft):
+  philoro .pdp-price, proaurum Microdata-Offer + Spezifikationstabelle,
+  degussa product:price-Meta / .product-price, heubach RDFa / .artikel-preis
+- Treffer = Preis + Name. Schnellpfad in vendors_fetch: die strukturierten Pfade
+  (JSON-LD, Microdata/RDFa, og, itemprop) laufen weiter, nur die Text-Fallbacks
+  entfallen; merge() legt den Treffer auf das strukturierte Produkt, dessen
+  Verfügbarkeit, Gewicht und Währung Vorrang haben
+- Gewicht nur als Feingewicht ("31,10 g fein") und nur für Seiten ohne strukturiertes
+  Produkt; sonst bleibt es bei den Angaben der Kaskade
+"""
+
+from __future__ import annotations
+import re
+from dataclasses import dataclass
+
+from lxml import etree
+
+RE_PRICE_DE = re.compile(r"\d{1,3}(?:\.\d{3})+,\d{2}|\d+,\d{2}")
+RE_PRICE_DOT = re.compile(r"^\s*(\d+\.\d{1,2})\s*$")
+RE_FINE_G = re.compile(r"(\d{1,4}(?:,\d+)?)\s*g\s*fein", re.I)
+
+def _xp(*exprs: str) -> tuple[etree.XPath, ...]:
+    return tuple(etree.XPath(e) for e in exprs)
+
+def _has_class(cls: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')"
+
+@dataclass(frozen=True)
+class Profile:
+    key: str
+    price: tuple[etree.XPath, ...]
+    currency: tuple[etree.XPath, ...] = ()
+    name: tuple[etree.XPath, ...] = _xp("normalize-space((//h1)[1])")
+    weight: tuple[etree.XPath, ...] = ()
+
+PROFILES: dict[str, Profile] = {
+    "philoro.de": Profile(
+        key="philoro-pdp",
+        price=_xp(f"//*[{_has_class('pdp-price')}]//*[{_has_class('price-value')}]/text()"),
+    ),
+    "proaurum.de": Profile(
+        key="proaurum-microdata",
+        price=_xp("//*[@itemprop='offers']//*[@itemprop='price']/@content",
+                  f"//*[{_has_class('product-price')}]/text()"),
+        currency=_xp("//*[@itemprop='offers']//*[@itemprop='priceCurrency']/@content"),
+        name=_xp("normalize-space((//h1[@itemprop='name'])[1])", "normalize-space((//h1)[1])"),
+        weight=_xp(f"//table[{_has_class('specs')}]//tr[th[normalize-space()='Gewicht']]/td/text()"),
+    ),
+    "degussa-goldhandel.de": Profile(
+        key="degussa-meta",
+        price=_xp("//meta[@property='product:price:amount']/@content",
+                  f"//*[{_has_class('product-price')}]/text()",
+                  f"//*[{_has_class('prices')}]/span/text()"),
+        currency=_xp("//meta[@property='product:price:currency']/@content"),
+    ),
+    "heubach-edelmetalle.de": Profile(
+        key="heubach-rdfa",
+        price=_xp("//*[@property='price']/@content",
+                  f"//*[{_has_class('artikel-preis')}]/text()"),
+        currency=_xp("//*[@property='priceCurrency']/@content"),
+        name=_xp("normalize-space((//h1[@property='name'])[1])", "normalize-space((//h1)[1])"),
+    ),
+}
+
+def profile_for(domain: str) -> Profile | None:
+    """Profil zur Domain (auch www./Subdomains)."""
+    for d, prof in PROFILES.items():
+        if domain == d or domain.endswith("." + d):
+            return prof
+    return None
+
+def _first(exprs: tuple[etree.XPath, ...], doc) -> str:
+    for xp in exprs:
+        try:
+            v = xp(doc)
+        except Exception:
+            continue
+        if isinstance(v, list):
+            v = next((s for s in v if isinstance(s, str) and s.strip()), "")
+        if isinstance(v, str) and v.strip():
+            return v.strip()
+    return ""
+
+def parse_price(text: str) -> float | None:
+    """'7.485,60 €', 'ab 7.431,00 €', '2412.30' → float."""
+    m = RE_PRICE_DOT.match(text)
+    if m: return float(m.group(1))
+    m = RE_PRICE_DE.search(text)
+    if m: return float(m.group(0).replace(".", "").replace(",", "."))
+    return None
+
+def extract(profile: Profile, doc) -> dict | None:
+    """Produkt im Format der Kaskade (offers.price als float) oder None (kein Treffer)."""
+    if doc is None: return None
+    price = parse_price(_first(profile.price, doc))
+    name = _first(profile.name, doc)
+    if price is None or not name:
+        return None
+    prod = {"@type": "Product", "name": name,
+            "offers": {"@type": "Offer", "price": price,
+                       "priceCurrency": (_first(profile.currency, doc) or "EUR").upper()}}
+    m = RE_FINE_G.search(_first(profile.weight, doc)) if profile.weight else None
+    if m:
+        prod["weight"] = {"value": float(m.group(1).replace(",", ".")), "unitCode": "GRM"}
+    return prod
+
+def _structured_price(v) -> float | None:
+    if isinstance(v, (int, float)) and not isinstance(v, bool): return float(v)
+    return parse_price(str(v)) if v not in (None, "") else None
+
+def merge(hit: dict, prod: dict) -> dict:
+    """
+    Profil-Treffer auf ein Produkt der Kaskade legen. Verfügbarkeit, Gewicht, Währung,
+    Name und Preis bleiben aus den strukturierten Daten (Gewicht notfalls aus
+    Name/Beschreibung); der Preis wird nur als float normalisiert ("7485.60" ist kein
+    748560). Das Profil füllt nur Lücken, v. a. einen fehlenden oder unlesbaren Preis.
+    """
+    out = dict(prod)
+    if not out.get("name"):
+        out["name"] = hit["name"]
+    offers, ho = out.get("offers"), hit["offers"]
+    first = offers[0] if isinstance(offers, list) and offers else offers
+    if not isinstance(first, dict):
+        out["offers"] = dict(ho)
+        return out
+    if first.get("@type") == "AggregateOffer":
+        out["offers"] = {**first, "lowPrice": _structured_price(first.get("lowPrice")) or ho["price"]}
+        return out
+    spec = first.get("priceSpecification") if isinstance(first.get("priceSpecification"), dict) else {}
+    o = {**first, "price": _structured_price(first.get("price") or spec.get("price")) or ho["price"]}
+    if not o.get("priceCurrency") and not spec.get("priceCurrency"):
+        o["priceCurrency"] = ho["priceCurrency"]
+    out["offers"] = [o, *offers[1:]] if isinstance(offers, list) else o
+    return out
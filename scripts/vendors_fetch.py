@@ -5,27 +5,57 @@ Vendors-Autofetch – robuste Produkt-/Preis-Extraktion mit breiten Fallbacks
 Domains: philoro.de, degussa-goldhandel.de, heubach-edelmetalle.de, proaurum.de
 
 Hauptpunkte:
-- Discovery: Sitemaps + Seeds + Pfad-Heuristik (inkl. /produkt/ bei philoro)
-- Parsing: JSON-LD (@graph/Offer.itemOffered), Microdata/RDFa, OpenGraph-Product
+- Discovery: Sitemaps + Seeds + Pfad-Heuristik (inkl. /produkt/ bei philoro);
+  robots.txt, Sitemap-Kandidaten und Seed-Links im Discovery-Store (.cache/, TTL)
+- Parsing: zuerst das Domain-Profil (vendor_profiles.py, vorkompilierte XPaths),
+           sonst JSON-LD (@graph/Offer.itemOffered), Microdata/RDFa, OpenGraph-Product
            + HTML-Fallback (Preistext in DOM, "price"-Klassen, €-Regex)
 - Produkt-Detail-Erkennung: H1 + Preisindikator oder strukturierte Daten
-- Diagnostik: differenzierte Zähler + Beispiel-URLs je Extraktionspfad
-- Output: data/vendors_auto.json (kompatibel zur UI)
+- --refresh-only: nur bekannte Produktseiten (URL-Index) neu holen und gegen den
+  aktuellen Spot bewerten; volle Discovery läuft seltener
+- --stream: Seiten gestreamt und begrenzt lesen; Abbruch bei Wall oder wenn der
+  <head> schon ein Angebot liefert (afetch_stream)
+- Diagnostik: differenzierte Zähler + Beispiel-URLs je Extraktionspfad,
+  Zeit/Bytes/Latenz-Histogramm je Stufe und Domain (diagnostics.timing)
+- Circuit Breaker je Domain: nach mehreren Timeouts/5xx/Walls in Folge wird der
+  Rest der Domain übersprungen, spätere Läufe proben einzeln (circuit_breaker.py)
+- Analyse-Cache: unveränderte Seiten (Hash über den Body ohne CSRF-/Nonce-Tokens)
+  werden nicht neu geparst (parse_cache.py, .cache/parse_cache.sqlite3)
+- --record/--replay: HTTP-Verkehr mitschneiden bzw. offline abspielen (http_replay.py)
+- Output: data/vendors_auto.json (kompatibel zur UI); alle Items zusätzlich
+  append-only in .cache/prices.sqlite3 (price_store.py)
 """
 
 from __future__ import annotations
-import json, re, time, sys, argparse, textwrap
+import json, re, time, sys, argparse, textwrap, asyncio, os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import aclosing, asynccontextmanager
+from email.utils import parsedate_to_datetime
+from dataclasses import dataclass, field
 from pathlib import Path
 from urllib.parse import urlparse
 import urllib.robotparser as robotparser
 
 import httpx
-from lxml import html
+from lxml import etree, html
+
+from circuit_breaker import DEFAULT_COOLDOWN, DEFAULT_THRESHOLD, Breaker, BreakerStore
+from discovery_store import DiscoveryStore
+from frontier import Frontier, UrlIndex, unchanged_since_crawl
+from http_cache import HttpCache
+from parse_cache import ParseCache, code_version
+from price_store import PriceStore
+from sitemaps import SitemapReader, iter_sitemap_bytes
+from stage_timing import RunProfiler, StageTimer
+import vendor_profiles
+from vendor_profiles import Profile, extract as extract_profile, profile_for
 
 # Optional: extruct für strukturierte Daten
 try:
     import extruct
     from extruct.jsonld import JsonLdExtractor
+    from extruct.utils import parse_xmldom_html
     HAS_EXSTRUCT = True
 except Exception:
     HAS_EXSTRUCT = False
@@ -33,6 +63,7 @@ except Exception:
 ROOT = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
+CACHE_DIR = ROOT / ".cache"  # nicht versioniert; in CI via actions/cache persistiert
 
 WHITELIST = [
     "proaurum.de",
@@ -67,55 +98,353 @@ USD_PER_EUR_DEFAULT = 1.08
 HTTP_TIMEOUT = 25.0
 
 MAX_URLS_PER_DOMAIN = 220
+MAX_CANDIDATES_PER_DOMAIN = 2000  # gesammelt und bewertet; geholt werden die besten MAX_URLS_PER_DOMAIN
 MAX_SITEMAPS = 10
-REQ_DELAY = 0.9  # höflich
+SITEMAP_CACHE_MAX_BYTES = 20 * 1024 * 1024  # größere Sitemaps nur streamen, nicht cachen
+REQ_DELAY = 0.9  # höflich; Startintervall je Domain, danach adaptiv (Pacer)
+MIN_REQ_DELAY = 0.3  # schneller wird auch ein flotter Shop nicht abgefragt
+MAX_REQ_DELAY = 30.0
+MAX_RETRY_AFTER = 120.0  # längere Retry-After-Werte werden gekappt
+FAST_LATENCY = 0.5  # Antwortzeit (s), unter der das Intervall sinkt
+SLOW_LATENCY = 3.0  # … über der es steigt
+MAX_INFLIGHT = 8  # globale Obergrenze gleichzeitiger Requests (Async-Crawl)
+PIPELINE_DEPTH = 8  # so viele Seiten je Domain darf der Fetcher der Auswertung vorauslaufen
+MAX_BODY_BYTES = 2 * 1024 * 1024  # --stream: mehr wird von keiner Seite gelesen
+BLOCK_SNIFF_BYTES = 20000  # so viel prüft looks_blocked; vorher wird nie abgebrochen
 
 # ----------------------------- Helpers ------------------------------------
 
-def fetch(client: httpx.Client, url: str) -> httpx.Response | None:
+def fetch(client: httpx.Client, url: str, cache: HttpCache | None = None) -> httpx.Response | None:
+    entry = cache.lookup(url) if cache else None
+    if cache and cache.fresh(entry):
+        return cache.hit(entry)
     try:
-        return client.get(url, timeout=HTTP_TIMEOUT, headers=HEADERS, follow_redirects=True)
+        r = client.get(url, timeout=HTTP_TIMEOUT, headers={**HEADERS, **(cache.validators(entry) if cache else {})},
+                       follow_redirects=True)
     except Exception:
         return None
+    return cache.resolve(url, entry, r) if cache else r
 
-def ecb_eurusd(client: httpx.Client) -> float:
-    url = "https://www.ecb.europa.eu/stats/eurofxref/eurofxref-daily.xml"
-    r = fetch(client, url)
-    if not r or r.status_code != 200:
-        return USD_PER_EUR_DEFAULT
+def parse_retry_after(value: str | None) -> float | None:
+    """Retry-After (Sekunden oder HTTP-Datum) → Wartezeit in s."""
+    if not value: return None
+    value = value.strip()
+    if value.isdigit(): return float(value)
     try:
-        doc = html.fromstring(r.content)
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+class Pacer:
+    """
+    Höflichkeit im Async-Crawl: globale In-flight-Grenze (Semaphore) plus
+    adaptiver Token-Bucket je Domain (je Domain höchstens ein Request gleichzeitig).
+
+    - Startintervall REQ_DELAY; ein Crawl-delay aus robots.txt ist Untergrenze
+    - schnelle Antworten → Intervall sinkt schrittweise bis min_interval
+    - langsame Antworten / 5xx → Intervall steigt
+    - 429/503/Timeout → Intervall verdoppelt, Retry-After wird abgewartet
+    Gewartet wird nur, wenn der Bucket leer ist (keine Pause nach jedem Request).
+    """
+    def __init__(self, max_inflight: int = MAX_INFLIGHT, start_interval: float = REQ_DELAY,
+                 min_interval: float = MIN_REQ_DELAY, max_interval: float = MAX_REQ_DELAY, burst: float = 1.0):
+        self.sem = asyncio.Semaphore(max(1, max_inflight))
+        self.start_interval = max(start_interval, min_interval)
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, self.start_interval)
+        self.burst = max(1.0, burst)
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._buckets: dict[str, dict] = {}
+
+    def _bucket(self, domain: str) -> dict:
+        b = self._buckets.get(domain)
+        if b is None:
+            b = self._buckets[domain] = {
+                "interval": self.start_interval, "floor": self.min_interval, "crawl_delay": None,
+                "tokens": self.burst, "updated": time.monotonic(), "not_before": 0.0,
+                "requests": 0, "speedups": 0, "slowdowns": 0, "backoffs": 0, "retry_after_s": 0.0,
+            }
+        return b
+
+    def set_crawl_delay(self, domain: str, delay: float | None):
+        if not delay or delay <= 0: return
+        b = self._bucket(domain)
+        b["crawl_delay"] = float(delay)
+        b["floor"] = min(max(self.min_interval, float(delay)), self.max_interval)
+        b["interval"] = max(b["interval"], b["floor"])
+
+    @asynccontextmanager
+    async def slot(self, domain: str):
+        b = self._bucket(domain)
+        lock = self._locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            while True:
+                now = time.monotonic()
+                b["tokens"] = min(self.burst, b["tokens"] + (now - b["updated"]) / b["interval"])
+                b["updated"] = now
+                wait = max(b["not_before"] - now, (1.0 - b["tokens"]) * b["interval"])
+                if wait <= 0: break
+                await asyncio.sleep(wait)
+            b["tokens"] -= 1.0
+            b["requests"] += 1
+            async with self.sem:
+                yield
+
+    def observe(self, domain: str, status: int | None, latency: float, retry_after: str | None = None):
+        """Rückmeldung nach jedem Request (status None = Timeout/Verbindungsfehler)."""
+        b = self._bucket(domain)
+        if status is None or status in (429, 503):
+            b["interval"] = min(self.max_interval, b["interval"] * 2.0)
+            b["tokens"] = min(b["tokens"], 0.0)
+            b["backoffs"] += 1
+            wait = parse_retry_after(retry_after)
+            if wait:
+                wait = min(wait, MAX_RETRY_AFTER)
+                b["not_before"] = max(b["not_before"], time.monotonic() + wait)
+                b["retry_after_s"] += wait
+        elif status >= 500 or latency >= SLOW_LATENCY:
+            b["interval"] = min(self.max_interval, b["interval"] * 1.25)
+            b["slowdowns"] += 1
+        elif latency <= FAST_LATENCY and b["interval"] > b["floor"]:
+            b["interval"] = max(b["floor"], b["interval"] * 0.85)
+            b["speedups"] += 1
+
+    def summary(self, domain: str) -> dict:
+        b = self._bucket(domain)
+        out = {k: b[k] for k in ("requests", "speedups", "slowdowns", "backoffs", "crawl_delay")}
+        out["interval_s"] = round(b["interval"], 3)
+        out["retry_after_s"] = round(b["retry_after_s"], 1)
+        return out
+
+@dataclass
+class CrawlCtx:
+    client: httpx.AsyncClient
+    pacer: Pacer
+    totals: dict
+    eurusd: float = USD_PER_EUR_DEFAULT
+    spot_eur_per_g: float | None = None
+    first_hit: bool = False
+    profiles: bool = True  # Domain-Profile vor der generischen Kaskade (vendor_profiles.py)
+    cache: HttpCache | None = None
+    parse_cache: ParseCache | None = None
+    url_index: UrlIndex | None = None
+    discovery: DiscoveryStore | None = None
+    prices: PriceStore | None = None
+    pool: ProcessPoolExecutor | None = None
+    timer: StageTimer = field(default_factory=StageTimer)
+    max_body: int | None = None  # gesetzt = gestreamter Abruf (afetch_stream)
+    refresh_only: bool = False
+    previous: dict = field(default_factory=dict)  # --refresh-only: Items des letzten Laufs je Domain
+    stream_stats: dict = field(default_factory=dict)
+    breakers: dict = field(default_factory=dict)  # Domain → Breaker (leer = aus)
+
+async def afetch(ctx: CrawlCtx, domain: str, url: str) -> httpx.Response | None:
+    cache = ctx.cache
+    entry = cache.lookup(url) if cache else None
+    if cache and cache.fresh(entry):
+        ctx.timer.record("cache_fresh", domain, 0.0, len(entry["body"]))
+        return cache.hit(entry)  # innerhalb der TTL: kein Request, keine Wartezeit
+    t0 = time.perf_counter()
+    async with ctx.pacer.slot(domain):
+        t1 = time.perf_counter()
+        ctx.timer.record("pacer_wait", domain, t1 - t0)
+        try:
+            r = await ctx.client.get(url, timeout=HTTP_TIMEOUT, follow_redirects=True,
+                                     headers={**HEADERS, **(cache.validators(entry) if cache else {})})
+        except Exception:
+            ctx.timer.record("fetch_error", domain, time.perf_counter() - t1)
+            ctx.pacer.observe(domain, None, time.perf_counter() - t1)
+            return None
+        latency = time.perf_counter() - t1
+        ctx.timer.record("fetch", domain, latency, len(r.content or b""))
+        ctx.pacer.observe(domain, r.status_code, latency, r.headers.get("retry-after"))
+    return cache.resolve(url, entry, r) if cache else r
+
+RE_HEAD_END = re.compile(rb"</head\s*>", re.I)
+# nur dann lohnt die Auswertung des <head> allein
+RE_HEAD_PRICE = re.compile(rb'application/ld\+json|product:price|og:price|itemprop=["\']?price', re.I)
+
+def _bounded_response(r: httpx.Response, body: bytes, reason: str | None) -> httpx.Response:
+    # Body ist bereits dekodiert → Kodierungs-/Längen-Header nicht übernehmen
+    headers = [(k, v) for k, v in r.headers.multi_items()
+               if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+    out = httpx.Response(r.status_code, headers=headers, content=body, request=r.request)
+    if reason: out.extensions["truncated"] = reason
+    return out
+
+def new_stream_stats() -> dict:
+    return {"pages": 0, "full": 0, "head": 0, "blocked": 0, "capped": 0,
+            "bytes_read": 0, "bytes_skipped": 0}
+
+async def afetch_stream(ctx: CrawlCtx, domain: str, url: str) -> tuple[httpx.Response | None, dict | None]:
+    """
+    Gestreamter Abruf einer Seite mit Obergrenze ctx.max_body. Abbruch nach den
+    ersten BLOCK_SNIFF_BYTES, sobald
+      - looks_blocked anschlägt (Consent-/Bot-Wall),
+      - der <head> allein schon ein Produkt mit Preis liefert (JSON-LD, og:/product:price),
+      - oder ctx.max_body erreicht ist.
+    Sonst wird der Body vollständig gelesen. Rückgabe (Antwort, Analyse des <head>
+    oder None); abgebrochene Bodies landen nicht im HTTP-Cache.
+    """
+    cache = ctx.cache
+    entry = cache.lookup(url) if cache else None
+    if cache and cache.fresh(entry):
+        ctx.timer.record("cache_fresh", domain, 0.0, len(entry["body"]))
+        return cache.hit(entry), None
+    st = ctx.stream_stats.setdefault(domain, new_stream_stats())
+    t0 = time.perf_counter()
+    async with ctx.pacer.slot(domain):
+        t1 = time.perf_counter()
+        ctx.timer.record("pacer_wait", domain, t1 - t0)
+        observed = False
+        try:
+            async with ctx.client.stream("GET", url, timeout=HTTP_TIMEOUT, follow_redirects=True,
+                                         headers={**HEADERS, **(cache.validators(entry) if cache else {})}) as r:
+                ctx.pacer.observe(domain, r.status_code, time.perf_counter() - t1, r.headers.get("retry-after"))
+                observed = True
+                if r.status_code == 304 and entry:
+                    ctx.timer.record("fetch", domain, time.perf_counter() - t1, 0)
+                    return cache.hit(entry, revalidated=True), None
+                buf, reason, early = bytearray(), None, None
+                head_end, sniffed, head_tried = None, False, False
+                if r.status_code == 200:
+                    async for chunk in r.aiter_bytes():
+                        buf += chunk
+                        if head_end is None and (m := RE_HEAD_END.search(buf, max(0, len(buf) - len(chunk) - 8))):
+                            head_end = m.end()
+                        if len(buf) < BLOCK_SNIFF_BYTES: continue
+                        if not sniffed:
+                            sniffed = True
+                            if looks_blocked(buf):
+                                reason = "blocked"; break
+                        if head_end and not head_tried:
+                            head_tried = True
+                            if RE_HEAD_PRICE.search(buf, 0, head_end):
+                                res = await analyze(ctx, bytes(buf[:head_end]), url)
+                                if any(res["offers"]):
+                                    reason, early = "head", res; break
+                        if len(buf) >= ctx.max_body:
+                            reason = "capped"; break
+                    if reason and (total := r.headers.get("content-length", "")).isdigit():
+                        st["bytes_skipped"] += max(0, int(total) - r.num_bytes_downloaded)
+                ctx.timer.record("fetch", domain, time.perf_counter() - t1, len(buf))
+        except (httpx.HTTPError, OSError):
+            ctx.timer.record("fetch_error", domain, time.perf_counter() - t1)
+            if not observed: ctx.pacer.observe(domain, None, time.perf_counter() - t1)
+            return None, None
+    body = bytes(buf)
+    if r.status_code == 200:
+        st["pages"] += 1; st[reason or "full"] += 1; st["bytes_read"] += len(body)
+    if cache:
+        cache.miss(len(body))
+        if r.status_code == 200 and not reason and body and cache.storable(url, r.headers):
+            cache.store(url, body, r.headers)
+    return _bounded_response(r, body, reason), early
+
+async def fetch_page(ctx: CrawlCtx, domain: str, url: str,
+                     prefetched: httpx.Response | None = None) -> tuple[httpx.Response | None, dict | None]:
+    """
+    Produktseite holen. r.extensions["blocked"] = looks_blocked (einmal je Antwort);
+    mit Circuit Breaker: bei offener Domain kein Request, Ergebnis wird verbucht.
+    prefetched: schon in der Discovery geholte Antwort (kein zweiter Request).
+    """
+    br = ctx.breakers.get(domain)
+    if br and not br.allow():
+        return None, None
+    t0 = time.perf_counter()
+    if prefetched is not None:
+        r, early = prefetched, None
+    elif ctx.max_body:
+        r, early = await afetch_stream(ctx, domain, url)
+    else:
+        r, early = await afetch(ctx, domain, url), None
+    if r is not None and r.status_code == 200 and r.content:
+        r.extensions["blocked"] = r.extensions.get("truncated") == "blocked" or looks_blocked(r.content)
+    if br:
+        if r is None or r.status_code >= 500 or r.status_code == 429:
+            br.failure("timeout/Verbindung" if r is None else f"HTTP {r.status_code}", time.perf_counter() - t0)
+        elif r.extensions.get("blocked"):
+            br.failure("Consent-/Bot-Wall", time.perf_counter() - t0)
+        elif r.status_code == 200 and r.content:
+            br.success()
+        else:
+            br.neutral()
+    return r, early
+
+ECB_URL = "https://www.ecb.europa.eu/stats/eurofxref/eurofxref-daily.xml"
+
+def parse_ecb_eurusd(content: bytes) -> float | None:
+    try:
+        doc = html.fromstring(content)
         rate = doc.xpath("//Cube[@currency='USD']/@rate")
         if rate:
             return float(rate[0])
     except Exception:
         pass
-    return USD_PER_EUR_DEFAULT
+    return None
 
-def get_spot_usd_per_kg() -> float | None:
-    p = DATA_DIR / "spot.json"
-    if not p.exists():
-        return None
+async def ecb_eurusd(ctx: CrawlCtx) -> float:
+    r = await afetch(ctx, "ecb.europa.eu", ECB_URL)
+    if not r or r.status_code != 200:
+        return USD_PER_EUR_DEFAULT
+    return parse_ecb_eurusd(r.content) or USD_PER_EUR_DEFAULT
+
+def spot_usd_per_kg_from(spot: dict) -> float | None:
+    """spot.json/spot_payload → USD/kg. XAUUSD ist USD je Unze (usd_per_kg ist vorberechnet)."""
+    v = spot.get("usd_per_kg")
+    if isinstance(v, (int, float)) and v > 0: return float(v)
+    v = spot.get("XAUUSD")
+    return float(v) * 1000.0 / OZ_TO_G if isinstance(v, (int, float)) and v > 0 else None
+
+def spot_eur_per_g_from(spot: dict, eurusd: float | None) -> float | None:
+    usd_per_kg = spot_usd_per_kg_from(spot)
+    if not usd_per_kg or not eurusd: return None
+    return usd_per_kg / 1000.0 / eurusd
+
+def load_spot_json() -> dict:
     try:
-        j = json.loads(p.read_text(encoding="utf-8"))
-        v = j.get("XAUUSD")
-        return float(v) if isinstance(v, (int, float)) else None
+        return json.loads((DATA_DIR / "spot.json").read_text(encoding="utf-8"))
     except Exception:
-        return None
+        return {}
 
 # robots.txt
 _robots_cache: dict[str, robotparser.RobotFileParser] = {}
+# robots.txt nicht erreichbar → nur offensichtliche Bereiche meiden
+ROBOTS_FALLBACK = "User-agent: *\nDisallow: /wp-admin\nDisallow: /admin\nDisallow: /cart\n"
+
+def robots_parser(status: int | None, text: str) -> robotparser.RobotFileParser:
+    """Regeln wie RobotFileParser.read(), aber aus bereits geholtem Inhalt."""
+    rp = robotparser.RobotFileParser()
+    if status in (401, 403):
+        rp.disallow_all = True
+    elif status is not None and 400 <= status < 500:
+        rp.allow_all = True
+    else:
+        rp.parse((text if status == 200 else ROBOTS_FALLBACK).splitlines())
+    rp.modified()
+    return rp
+
+async def load_robots(ctx: CrawlCtx, domain: str) -> str:
+    """robots.txt aus dem Discovery-Store oder über den gemeinsamen Client (mit Timeout) laden."""
+    store = ctx.discovery
+    cached = store.get("robots", domain) if store else None
+    if cached is not None:
+        _robots_cache[domain] = robots_parser(cached["status"], cached["text"])
+        return "store"
+    r = await afetch(ctx, domain, f"https://{domain}/robots.txt")
+    status = r.status_code if r is not None else None
+    text = r.text if status == 200 else ""
+    _robots_cache[domain] = robots_parser(status, text)
+    if status is None or status >= 500:
+        return "fallback"
+    if store: store.put("robots", domain, {"status": status, "text": text})
+    return "fetched"
+
 def robots_ok(domain: str, url: str) -> bool:
+    rp = _robots_cache.get(domain)
+    if rp is None:
+        rp = robots_parser(None, "")  # noch nicht geladen (z. B. Testmodus)
     try:
-        rp = _robots_cache.get(domain)
-        if rp is None:
-            rp = robotparser.RobotFileParser()
-            rp.set_url(f"https://{domain}/robots.txt")
-            try: rp.read()
-            except Exception:
-                _robots_cache[domain] = rp
-                return not any(seg in url for seg in ("/wp-admin", "/admin", "/cart"))
-            _robots_cache[domain] = rp
         return rp.can_fetch(HEADERS.get("User-Agent","*"), url)
     except Exception:
         return True
@@ -163,35 +492,142 @@ def looks_product_path(domain: str, path: str) -> bool:
 
     return looks_product_path_generic(p)
 
-def discover_from_sitemaps(client: httpx.Client, domain: str) -> list[str]:
-    urls=set()
-    for sm in (f"https://{domain}/sitemap.xml", f"https://{domain}/sitemap_index.xml"):
-        if not robots_ok(domain, sm): continue
-        r = fetch(client, sm); time.sleep(REQ_DELAY)
-        if not (r and r.status_code==200 and r.content): continue
+# Tokens, die eher auf eine konkrete Produktseite als auf eine Kategorie deuten
+KW_PATH_STRONG = ("100g", "100-g", "1oz", "1-oz", "unze", "maple", "kruger", "krügerrand", "kruegerrand", "barren")
+
+def path_score(domain: str, path: str) -> float:
+    """Abgestufte Variante von looks_product_path für die Frontier (0 = kein Kandidat)."""
+    if not looks_product_path(domain, path): return 0.0
+    p = path.lower().rstrip("/")
+    s = 1.0 + 0.25 * min(2, sum(k in p for k in KW_PATH_STRONG))
+    if domain == "philoro.de" and p.startswith("/produkt/"): s += 0.5
+    last = p.split("/")[-1]
+    if p.count("/") <= 1 and "-" not in last: s -= 0.5  # z. B. /goldbarren (Listing)
+    return s
+
+def robots_crawl_delay(domain: str) -> float | None:
+    """`Crawl-delay` aus robots.txt für unseren User-Agent (bzw. *); setzt load_robots voraus."""
+    rp = _robots_cache.get(domain)
+    try:
+        d = rp.crawl_delay(HEADERS.get("User-Agent", "*")) if rp is not None else None
+        return float(d) if d is not None else None
+    except Exception:
+        return None
+
+def robots_sitemaps(domain: str) -> list[str]:
+    """`Sitemap:`-Zeilen aus robots.txt (setzt einen vorherigen load_robots-Aufruf voraus)."""
+    rp = _robots_cache.get(domain)
+    try:
+        return list(rp.site_maps() or []) if rp is not None else []
+    except Exception:
+        return []
+
+async def iter_sitemap(ctx: CrawlCtx, domain: str, url: str, stats: dict):
+    """
+    Sitemap streamen und Einträge liefern, sobald sie vollständig gelesen sind.
+    Bricht der Aufrufer ab (Budget voll), wird der Download sofort beendet.
+    Frische/revalidierte Cache-Einträge werden ebenfalls stückweise gelesen.
+    """
+    cache = ctx.cache
+    entry = cache.lookup(url) if cache else None
+    if cache and cache.fresh(entry):
+        stats["read"] += 1
+        for e in iter_sitemap_bytes(cache.hit(entry).content): yield e
+        return
+    async with ctx.pacer.slot(domain):
+        t0 = time.perf_counter()
         try:
-            doc = html.fromstring(r.content)
-            locs = [l for l in doc.xpath("//loc/text()") if isinstance(l,str)]
-        except Exception:
-            locs = []
-        submaps = [u for u in locs if u.endswith(".xml")]
-        for u in submaps[:MAX_SITEMAPS]:
-            if not robots_ok(domain, u): continue
-            r2 = fetch(client, u); time.sleep(REQ_DELAY)
-            if not (r2 and r2.status_code==200 and r2.content): continue
-            try:
-                doc2 = html.fromstring(r2.content)
-                locs += [l for l in doc2.xpath("//loc/text()") if isinstance(l,str)]
-            except Exception:
-                pass
-        for u in locs:
-            pu = urlparse(u)
-            if not pu.netloc.endswith(domain): continue
-            if looks_product_path(domain, pu.path):
-                urls.add(u)
-                if len(urls) >= MAX_URLS_PER_DOMAIN: break
-        if len(urls) >= MAX_URLS_PER_DOMAIN: break
-    return list(urls)
+            async with ctx.client.stream("GET", url, timeout=HTTP_TIMEOUT, follow_redirects=True,
+                                         headers={**HEADERS, **(cache.validators(entry) if cache else {})}) as r:
+                ctx.pacer.observe(domain, r.status_code, time.perf_counter() - t0, r.headers.get("retry-after"))
+                if r.status_code == 304 and entry:
+                    stats["read"] += 1
+                    for e in iter_sitemap_bytes(cache.hit(entry, revalidated=True).content): yield e
+                    return
+                if r.status_code != 200:
+                    if cache: cache.miss(0)
+                    return
+                stats["read"] += 1
+                reader = SitemapReader()
+                keep = bytearray() if cache and cache.storable(url, r.headers) else None
+                try:
+                    async for chunk in r.aiter_bytes():
+                        if keep is not None:
+                            keep += chunk
+                            if len(keep) > SITEMAP_CACHE_MAX_BYTES: keep = None
+                        for e in reader.feed(chunk): yield e
+                    for e in reader.close(): yield e
+                    # nur vollständig gelesene Sitemaps cachen
+                    if keep: cache.store(url, bytes(keep), r.headers)
+                finally:
+                    stats["bytes"] += reader.bytes_in
+                    if cache: cache.miss(reader.bytes_in)
+        except (httpx.HTTPError, OSError):
+            ctx.pacer.observe(domain, None, time.perf_counter() - t0)
+            return
+
+async def discover_from_sitemaps(ctx: CrawlCtx, domain: str, frontier: Frontier, dstat: dict | None = None):
+    """
+    Sitemap-Kandidaten in die Frontier übernehmen. Die Kandidatenliste eines
+    vollständigen Durchlaufs landet im Discovery-Store; solange sie gilt, wird
+    nichts gestreamt (der lastmod-Abgleich mit der URL-Historie läuft trotzdem).
+    """
+    stats = {"read": 0, "entries": 0, "skipped_unchanged": 0, "bytes": 0, "truncated": False, "from_store": False}
+
+    def accept(e: dict) -> bool:
+        """Kandidat übernehmen; False, sobald das Kandidatenbudget voll ist."""
+        hist = frontier.history.get(e["loc"])
+        # unverändert seit letztem Abruf und damals ohne Angebot → nicht erneut holen
+        if hist and not hist["hits"] and unchanged_since_crawl(e["lastmod"], hist):
+            stats["skipped_unchanged"] += 1
+            return True
+        frontier.add(e["loc"], "sitemap", e["path_score"], lastmod=e["lastmod"], priority=e["priority"])
+        if len(frontier) >= MAX_CANDIDATES_PER_DOMAIN:
+            stats["truncated"] = True
+            return False
+        return True
+
+    store = ctx.discovery
+    cached = store.get("sitemap", domain) if store else None
+    if cached is not None:
+        stats["from_store"] = True
+        stats["entries"] = cached["entries_seen"]
+        for e in cached["candidates"]:
+            if not accept(e): break
+        if dstat is not None:
+            dstat["sitemaps"] = stats
+        return
+
+    found: list[dict] = []
+    # robots.txt-Sitemaps zuerst, danach die üblichen Standardpfade
+    queue = list(dict.fromkeys(robots_sitemaps(domain) + [f"https://{domain}/sitemap.xml", f"https://{domain}/sitemap_index.xml"]))
+    done: set[str] = set()
+    submaps = 0
+    t0 = time.perf_counter()
+    while queue and not stats["truncated"]:
+        sm = queue.pop(0)
+        if sm in done or not robots_ok(domain, sm): continue
+        done.add(sm)
+        async with aclosing(iter_sitemap(ctx, domain, sm, stats)) as entries:
+            async for e in entries:
+                loc = e["loc"]
+                if e["kind"] == "sitemap":
+                    if submaps < MAX_SITEMAPS and loc not in done:
+                        queue.append(loc); submaps += 1
+                    continue
+                stats["entries"] += 1
+                pu = urlparse(loc)
+                if not pu.netloc.endswith(domain): continue
+                ps = path_score(domain, pu.path)
+                if ps <= 0: continue
+                cand = {"loc": loc, "lastmod": e["lastmod"], "priority": e["priority"], "path_score": ps}
+                found.append(cand)
+                if not accept(cand): break
+    ctx.timer.record("sitemaps", domain, time.perf_counter() - t0, stats["bytes"])
+    if store and stats["read"]:
+        store.put("sitemap", domain, {"entries_seen": stats["entries"], "candidates": found})
+    if dstat is not None:
+        dstat["sitemaps"] = stats
 
 def extract_links_from_page(base_url: str, domain: str, r: httpx.Response) -> list[str]:
     out=[]
@@ -207,36 +643,53 @@ def extract_links_from_page(base_url: str, domain: str, r: httpx.Response) -> li
         pass
     return out
 
-def find_candidate_urls(client: httpx.Client, domain: str) -> list[str]:
-    urls = set()
+async def find_candidate_urls(ctx: CrawlCtx, domain: str, dstat: dict | None = None,
+                              pages: dict | None = None) -> list[str]:
+    """
+    Kandidaten sammeln und nach Frontier-Score (inkl. URL-Historie) priorisiert zurückgeben.
+    pages: nimmt die geholten Link-Seiten auf (URL → Response), damit crawl_domain sie nicht erneut holt.
+    """
+    frontier = Frontier(domain, ctx.url_index.history(domain) if ctx.url_index else None)
+    store = ctx.discovery
+    link_pages = {"store": 0, "fetched": 0}
+
+    async def add_links(page_url: str, source: str):
+        # Linkliste der Seite aus dem Discovery-Store, sonst holen und ablegen
+        links = store.get("links", page_url) if store else None
+        if links is None:
+            r = await afetch(ctx, domain, page_url)
+            if not (r and r.status_code==200 and r.content): return
+            if pages is not None: pages[page_url] = r
+            links = extract_links_from_page(page_url, domain, r)
+            if store: store.put("links", page_url, links)
+            link_pages["fetched"] += 1
+        else:
+            link_pages["store"] += 1
+        for u in links[:MAX_CANDIDATES_PER_DOMAIN]:
+            frontier.add(u, source, path_score(domain, urlparse(u).path))
 
     # Seeds
     for seed in DOMAIN_SEEDS.get(domain, []):
-        if len(urls) >= MAX_URLS_PER_DOMAIN: break
+        if len(frontier) >= MAX_CANDIDATES_PER_DOMAIN: break
         if not robots_ok(domain, seed): continue
-        r = fetch(client, seed); time.sleep(REQ_DELAY)
-        if r and r.status_code==200 and r.content:
-            for u in extract_links_from_page(seed, domain, r):
-                urls.add(u)
-                if len(urls) >= MAX_URLS_PER_DOMAIN: break
+        await add_links(seed, "seed")
 
     # Sitemaps
-    if len(urls) < MAX_URLS_PER_DOMAIN:
-        for u in discover_from_sitemaps(client, domain):
-            urls.add(u)
-            if len(urls) >= MAX_URLS_PER_DOMAIN: break
+    if len(frontier) < MAX_CANDIDATES_PER_DOMAIN:
+        await discover_from_sitemaps(ctx, domain, frontier, dstat)
 
     # Home-Fallback
-    if len(urls) < 20:
+    if len(frontier) < 20:
         home = f"https://{domain}/"
         if robots_ok(domain, home):
-            r = fetch(client, home); time.sleep(REQ_DELAY)
-            if r and r.status_code==200 and r.content:
-                for u in extract_links_from_page(home, domain, r):
-                    urls.add(u)
-                    if len(urls) >= MAX_URLS_PER_DOMAIN: break
+            await add_links(home, "home")
 
-    return list(urls)[:MAX_URLS_PER_DOMAIN]
+    # früher ertragreiche URLs immer im Rennen halten
+    frontier.add_known_good(lambda u: path_score(domain, urlparse(u).path))
+    if dstat is not None:
+        dstat.setdefault("discovery", {})["link_pages"] = link_pages
+
+    return frontier.ranked(MAX_URLS_PER_DOMAIN)
 
 # ----------------------- Structured Data Parsing --------------------------
 
@@ -252,33 +705,82 @@ PRICE_CLASS_HINTS = (
     "price", "preis", "amount", "product-price", "pdp-price", "prices"
 )
 
-def parse_structured(html_bytes: bytes, base_url: str) -> dict:
+# Kaskaden-XPaths einmal beim Import kompilieren statt bei jedem Aufruf
+XP_H1 = etree.XPath("//h1/text()")
+XP_OG_TITLE = etree.XPath('//meta[@property="og:title"]/@content')
+XP_OG_PRICE = etree.XPath("//meta[@property='product:price:amount']/@content")
+XP_OG_CURR = etree.XPath("//meta[@property='product:price:currency']/@content")
+XP_ITEMPROP_PRICE = (etree.XPath('//*[@itemprop="price"]/@content'),
+                     etree.XPath('string((//*[@itemprop="price"])[1])'))
+XP_ITEMPROP_CURR = (etree.XPath('//*[@itemprop="priceCurrency"]/@content'),
+                    etree.XPath('string((//*[@itemprop="priceCurrency"])[1])'))
+XP_SCRIPT_TEXT = etree.XPath("//script/text()")
+XP_VISIBLE_TEXT = etree.XPath("//*[not(self::script)][not(self::style)]/text()")
+XP_PRICE_CLASS = tuple(
+    etree.XPath(f"//*[contains(translate(@class,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), '{cls}')]/text()")
+    for cls in PRICE_CLASS_HINTS)
+
+class Page:
     """
-    Return:
-      {
-        "products": [ ... ],
-        "hints": {jsonld, micro_rdfa, og, itemprop, json_fallback, price_text},
-        "links": [...]
-      }
+    Eine Antwort, genau einmal in einen lxml-Baum geparst. Der Baum wird von
+    extruct (JSON-LD/Microdata/RDFa), allen HTML-Fallbacks, looks_product_detail
+    und der og:title-Namensergänzung gemeinsam genutzt.
     """
-    data = {"products": [], "hints": {"jsonld":0, "micro_rdfa":0, "og":0, "itemprop":0, "json_fallback":0, "price_text":0}}
+    __slots__ = ("body", "url", "doc", "_cache")
 
-    ext = {}
-    if HAS_EXSTRUCT:
+    def __init__(self, body: bytes, url: str):
+        self.body = body
+        self.url = url
+        self._cache: dict = {}
         try:
-            ext = extruct.extract(html_bytes, base_url=base_url, syntaxes=["json-ld","microdata","rdfa"], uniform=True)
+            # extruct-kompatibler Baum (XmlDom für RDFa), sonst normales lxml.html
+            self.doc = parse_xmldom_html(body, encoding="UTF-8") if HAS_EXSTRUCT else html.fromstring(body)
         except Exception:
-            try:
-                ext = {"json-ld": JsonLdExtractor().extract(html_bytes.decode("utf-8","ignore"))}
-            except Exception:
-                ext = {}
+            self.doc = None
 
-    def push_product(node: dict):
-        if isinstance(node, dict):
-            data["products"].append(node)
+    def xpath(self, expr: str | etree.XPath):
+        if self.doc is None: return []
+        try:
+            return expr(self.doc) if isinstance(expr, etree.XPath) else self.doc.xpath(expr)
+        except Exception:
+            return []
+
+    def _first(self, key: str, expr: str | etree.XPath) -> str:
+        if key not in self._cache:
+            v = self.xpath(expr)
+            self._cache[key] = (v or [""])[0].strip() if isinstance(v, list) else ""
+        return self._cache[key]
+
+    @property
+    def h1(self) -> str:
+        return self._first("h1", XP_H1)
+
+    @property
+    def og_title(self) -> str:
+        return self._first("og_title", XP_OG_TITLE)
+
+def extract_embedded(page: Page, syntaxes: list[str]) -> dict:
+    if not HAS_EXSTRUCT:
+        return {}
+    if page.doc is not None:
+        try:
+            return extruct.extract(page.doc, base_url=page.url, syntaxes=syntaxes, uniform=True)
+        except Exception:
+            pass
+    if "json-ld" not in syntaxes:
+        return {}
+    try:
+        return {"json-ld": JsonLdExtractor().extract(page.body.decode("utf-8","ignore"))}
+    except Exception:
+        return {}
+
+def _push_product(data: dict, node, hint: str):
+    if isinstance(node, dict):
+        data["products"].append(node)
+        data["hints"][hint] += 1
 
-    # JSON-LD
-    for node in ext.get("json-ld", []) or []:
+def extract_jsonld(page: Page, data: dict):
+    for node in extract_embedded(page, ["json-ld"]).get("json-ld", []) or []:
         nodes = node if isinstance(node, list) else [node]
         for n in nodes:
             if not isinstance(n, dict): continue
@@ -288,24 +790,25 @@ def parse_structured(html_bytes: bytes, base_url: str) -> dict:
                     if not isinstance(g, dict): continue
                     gt = g.get("@type")
                     if gt == "Product" or (isinstance(gt, list) and "Product" in gt):
-                        push_product(g); data["hints"]["jsonld"] += 1
+                        _push_product(data, g, "jsonld")
                     if gt == "Offer" and isinstance(g.get("itemOffered"), dict):
                         prod = g["itemOffered"]; prod.setdefault("offers", g)
-                        push_product(prod); data["hints"]["jsonld"] += 1
+                        _push_product(data, prod, "jsonld")
                 continue
             if t == "Product" or (isinstance(t, list) and "Product" in t):
-                push_product(n); data["hints"]["jsonld"] += 1; continue
+                _push_product(data, n, "jsonld"); continue
             if t == "Offer" or (isinstance(t, list) and "Offer" in t):
                 if isinstance(n.get("itemOffered"), dict):
                     prod = n["itemOffered"]; prod.setdefault("offers", n)
-                    push_product(prod); data["hints"]["jsonld"] += 1
+                    _push_product(data, prod, "jsonld")
             if n.get("@type") == "ItemList" and isinstance(n.get("itemListElement"), list):
                 for it in n["itemListElement"]:
                     u = it.get("url") or (isinstance(it.get("item"), dict) and it["item"].get("@id"))
                     if isinstance(u, str):
                         data.setdefault("links", []).append(u)
 
-    # Microdata/RDFa
+def extract_micro_rdfa(page: Page, data: dict):
+    ext = extract_embedded(page, ["microdata", "rdfa"])
     for syntax in ("microdata","rdfa"):
         for node in ext.get(syntax, []) or []:
             try:
@@ -314,83 +817,134 @@ def parse_structured(html_bytes: bytes, base_url: str) -> dict:
                 if isinstance(t, list): is_product = any(isinstance(x,str) and x.lower().endswith("product") for x in t)
                 elif isinstance(t, str): is_product = t.lower().endswith("product")
                 if is_product:
-                    props = node.get("properties") or {}
+                    # uniform=True liefert flache Knoten; "properties" nur bei Roh-Microdata
+                    props = node.get("properties") or node
                     prod = {"@type":"Product",
                             "name": props.get("name"),
                             "description": props.get("description"),
                             "weight": props.get("weight"),
                             "offers": props.get("offers")}
-                    push_product(prod); data["hints"]["micro_rdfa"] += 1
+                    _push_product(data, prod, "micro_rdfa")
             except Exception:
                 continue
 
-    # OpenGraph-Product
-    try:
-        doc = html.fromstring(html_bytes)
-        og_price = doc.xpath("//meta[@property='product:price:amount']/@content")
-        og_curr  = doc.xpath("//meta[@property='product:price:currency']/@content")
-        if og_price:
-            prod = {"@type":"Product", "name": (doc.xpath('//meta[@property="og:title"]/@content') or [""])[0].strip()}
-            prod["offers"] = {"@type":"Offer", "price": og_price[0], "priceCurrency": (og_curr[0].upper() if og_curr else "EUR")}
-            push_product(prod); data["hints"]["og"] += 1
-    except Exception:
-        pass
-
-    # itemprop-Fallback
-    try:
-        doc = html.fromstring(html_bytes)
-        price_candidates = []
-        price_candidates += doc.xpath('//*[@itemprop="price"]/@content')
-        price_candidates += doc.xpath('string((//*[@itemprop="price"])[1])')
-        cur_candidates = []
-        cur_candidates += doc.xpath('//*[@itemprop="priceCurrency"]/@content')
-        cur_candidates += doc.xpath('string((//*[@itemprop="priceCurrency"])[1])')
-        price_candidates = [p.strip() for p in price_candidates if isinstance(p, str) and p.strip()]
-        cur_candidates = [c.strip().upper() for c in cur_candidates if isinstance(c, str) and c.strip()]
-        if price_candidates:
-            prod = {"@type":"Product", "name": (doc.xpath("//h1/text()") or [""])[0].strip()}
-            prod["offers"] = {"@type":"Offer", "price": price_candidates[0], "priceCurrency": (cur_candidates[0] if cur_candidates else "EUR")}
-            push_product(prod); data["hints"]["itemprop"] += 1
-    except Exception:
-        pass
+def extract_og(page: Page, data: dict):
+    og_price = page.xpath(XP_OG_PRICE)
+    og_curr  = page.xpath(XP_OG_CURR)
+    if og_price:
+        prod = {"@type":"Product", "name": page.og_title}
+        prod["offers"] = {"@type":"Offer", "price": og_price[0], "priceCurrency": (og_curr[0].upper() if og_curr else "EUR")}
+        _push_product(data, prod, "og")
+
+def extract_itemprop(page: Page, data: dict):
+    price_candidates = []
+    for xp in XP_ITEMPROP_PRICE: price_candidates += page.xpath(xp)
+    cur_candidates = []
+    for xp in XP_ITEMPROP_CURR: cur_candidates += page.xpath(xp)
+    price_candidates = [p.strip() for p in price_candidates if isinstance(p, str) and p.strip()]
+    cur_candidates = [c.strip().upper() for c in cur_candidates if isinstance(c, str) and c.strip()]
+    if price_candidates:
+        prod = {"@type":"Product", "name": page.h1}
+        prod["offers"] = {"@type":"Offer", "price": price_candidates[0], "priceCurrency": (cur_candidates[0] if cur_candidates else "EUR")}
+        _push_product(data, prod, "itemprop")
+
+def extract_json_fallback(page: Page, data: dict):
+    for s in page.xpath(XP_SCRIPT_TEXT):
+        if "price" not in s: continue
+        m1 = RE_PRICE_JSON.search(s)
+        m2 = RE_CURR_JSON.search(s)
+        if m1 and m2:
+            prod = {"@type":"Product", "name": page.h1}
+            prod["offers"] = {"@type":"Offer", "price": m1.group("price"), "priceCurrency": m2.group("cur")}
+            _push_product(data, prod, "json_fallback")
+            break
+
+def extract_price_text(page: Page, data: dict):
+    texts = []
+    # Klassenhinweise
+    for xp in XP_PRICE_CLASS:
+        texts += page.xpath(xp)
+    # generisch: der gesamte sichtbare Text aus H1/Nebenbereichen nützen nichts viel – wir suchen €-Muster
+    blob = " ".join([t.strip() for t in texts if isinstance(t,str)])
+    m = RE_EUR_PRICE_TEXT.search(blob)
+    if not m:
+        # Wenn oben nichts, suche im ganzen Dokument (nur erste 50k, um Performance zu halten)
+        raw = page.body[:50000].decode("utf-8","ignore")
+        m = RE_EUR_PRICE_TEXT.search(raw)
+    if m:
+        val = m.group("val")
+        prod = {"@type":"Product", "name": page.h1}
+        prod["offers"] = {"@type":"Offer", "price": val, "priceCurrency": "EUR"}
+        _push_product(data, prod, "price_text")
+
+# Reihenfolge = Kaskade; die ersten beiden arbeiten auf extruct, der Rest auf dem lxml-Baum
+EXTRACTION_PATHS = (
+    ("jsonld", extract_jsonld),
+    ("micro_rdfa", extract_micro_rdfa),
+    ("og", extract_og),
+    ("itemprop", extract_itemprop),
+    ("json_fallback", extract_json_fallback),
+    ("price_text", extract_price_text),
+)
+FALLBACK_PATHS = ("json_fallback", "price_text")
 
-    # JSON-RegEx-Fallback
-    try:
-        doc = html.fromstring(html_bytes)
-        for s in doc.xpath("//script/text()"):
-            if "price" not in s: continue
-            m1 = RE_PRICE_JSON.search(s)
-            m2 = RE_CURR_JSON.search(s)
-            if m1 and m2:
-                prod = {"@type":"Product", "name": (doc.xpath("//h1/text()") or [""])[0].strip()}
-                prod["offers"] = {"@type":"Offer", "price": m1.group("price"), "priceCurrency": m2.group("cur")}
-                push_product(prod); data["hints"]["json_fallback"] += 1
-                break
-    except Exception:
-        pass
+def parse_structured(page: Page | bytes, base_url: str = "", first_hit: bool = False,
+                     timings: dict | None = None, profile: Profile | None = None) -> dict:
+    """
+    Return:
+      {
+        "products": [ ... ],
+        "hints": {profile, jsonld, micro_rdfa, og, itemprop, json_fallback, price_text},
+        "links": [...]
+      }
 
-    # HTML-Preistext-Fallback (generisch, vorsichtig)
-    try:
-        doc = html.fromstring(html_bytes)
-        texts = []
-        # Klassenhinweise
-        for cls in PRICE_CLASS_HINTS:
-            texts += doc.xpath(f"//*[contains(translate(@class,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), '{cls}')]/text()")
-        # generisch: der gesamte sichtbare Text aus H1/Nebenbereichen nützen nichts viel – wir suchen €-Muster
-        blob = " ".join([t.strip() for t in texts if isinstance(t,str)])
-        m = RE_EUR_PRICE_TEXT.search(blob)
-        if not m:
-            # Wenn oben nichts, suche im ganzen Dokument (nur erste 50k, um Performance zu halten)
-            raw = html_bytes[:50000].decode("utf-8","ignore")
-            m = RE_EUR_PRICE_TEXT.search(raw)
-        if m:
-            val = m.group("val")
-            prod = {"@type":"Product", "name": (doc.xpath("//h1/text()") or [""])[0].strip()}
-            prod["offers"] = {"@type":"Offer", "price": val, "priceCurrency": "EUR"}
-            push_product(prod); data["hints"]["price_text"] += 1
-    except Exception:
-        pass
+    profile: Domain-Profil (vendor_profiles.py). Liefert es Preis + Name, laufen nur
+    die strukturierten Pfade (ohne JSON-RegEx-/€-Text-Fallback, ohne Microdata/RDFa,
+    wenn JSON-LD schon ein Angebot hat) und der Treffer wird
+    auf jedes Produkt mit Angebot gelegt (vendor_profiles.merge); ohne ein solches
+    Produkt steht er allein. Ohne Treffer läuft die Kaskade wie bisher.
 
+    first_hit=True: hat JSON-LD oder Microdata/RDFa bereits ein Produkt mit
+    verwertbarem Angebot geliefert, werden JSON-RegEx- und €-Text-Fallback
+    übersprungen (deren Treffer wären auf solchen Seiten nur Dubletten).
+    timings: optional, summiert die Laufzeit (s) je Extraktionspfad.
+    """
+    if not isinstance(page, Page):
+        page = Page(page, base_url)
+    data = {"products": [], "hints": {"profile": 0, **{name: 0 for name, _ in EXTRACTION_PATHS}}}
+
+    hit = None
+    if profile is not None:
+        t0 = time.perf_counter()
+        hit = extract_profile(profile, page.doc)
+        if timings is not None:
+            timings["profile"] = timings.get("profile", 0.0) + (time.perf_counter() - t0)
+
+    confident = False
+    for name, extractor in EXTRACTION_PATHS:
+        if name == "og":
+            if page.doc is None: break
+            confident = first_hit and any(best_offer(p) for p in data["products"])
+        if (confident or hit) and name in FALLBACK_PATHS:
+            break
+        # Profil-Treffer + JSON-LD-Angebot: Microdata/RDFa (teuerster Pfad) brächte nur eine Dublette
+        if hit and name == "micro_rdfa" and any(best_offer(p) for p in data["products"]):
+            continue
+        t0 = time.perf_counter()
+        try:
+            extractor(page, data)
+        except Exception:
+            pass
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + (time.perf_counter() - t0)
+    if hit:
+        # Produktseite: Produkte mit Angebot sind dasselbe Produkt aus verschiedenen Pfaden
+        idx = [i for i, p in enumerate(data["products"]) if best_offer(p)]
+        for i in idx:
+            data["products"][i] = vendor_profiles.merge(hit, data["products"][i])
+        if not idx:
+            data["products"].insert(0, hit)
+        data["hints"]["profile"] += 1
     return data
 
 # ---------------------- Normalisierung & Klassifikation --------------------
@@ -485,24 +1039,492 @@ def best_offer(prod: dict) -> dict | None:
 
 # --------------------------- Produkt-Erkennung -----------------------------
 
-def looks_product_detail(doc: html.HtmlElement, parsed_hints: dict) -> bool:
+def looks_product_detail(page: Page, parsed_hints: dict) -> bool:
     # Signal 1: strukturierte Daten gefunden
-    if any(parsed_hints.get(k,0) for k in ("jsonld","micro_rdfa","og","itemprop","json_fallback","price_text")):
+    if any(parsed_hints.get(k,0) for k in ("profile","jsonld","micro_rdfa","og","itemprop","json_fallback","price_text")):
         return True
     # Signal 2: H1 vorhanden + irgendwo Preistext
-    h1 = (doc.xpath("//h1/text()") or [""])[0].strip()
+    h1 = page.h1
     if h1:
         # Suche sichtbare Texte mit €
-        texts = [t.strip() for t in doc.xpath("//*[not(self::script)][not(self::style)]/text()") if isinstance(t,str) and "€" in t]
+        texts = [t.strip() for t in page.xpath(XP_VISIBLE_TEXT) if isinstance(t,str) and "€" in t]
         blob = " ".join(texts)[:100000]
         if RE_EUR_PRICE_TEXT.search(blob):
             return True
     return False
 
+# ------------------------------ Crawl je Domain ----------------------------
+
+EXAMPLE_KEYS = (
+    ("jsonld", "pages_with_jsonld", "jsonld"),
+    ("micro_rdfa", "pages_with_micro", "micro"),
+    ("og", "pages_with_og", "og"),
+    ("itemprop", "pages_with_itemprop", "itemprop"),
+    ("json_fallback", "pages_with_json_fallback", "json_fallback"),
+    ("price_text", "pages_with_price_text", "price_text"),
+)
+
+def new_dstat(domain: str) -> dict:
+    return {
+        "domain": domain, "pages": 0, "products": 0, "offers": 0, "items": 0, "notes": [],
+        "pages_with_jsonld": 0, "pages_with_micro": 0, "pages_with_og": 0, "pages_with_itemprop": 0,
+        "pages_with_json_fallback": 0, "pages_with_price_text": 0, "pages_blocked": 0, "pages_product_like": 0,
+        "examples": {"jsonld": [], "micro": [], "og": [], "itemprop": [], "json_fallback": [], "price_text": [], "blocked": [], "product_like": []}
+    }
+
+def count_profile(dstat: dict, res: dict):
+    """Trefferquote des Domain-Profils (nur analysierte Seiten mit Profil)."""
+    if not res.get("profile"): return
+    st = dstat.setdefault("profile", {"name": res["profile"], "pages": 0, "hits": 0, "hit_rate": 0.0})
+    st["pages"] += 1
+    st["hits"] += 1 if res["hints"].get("profile") else 0
+    st["hit_rate"] = round(st["hits"] / st["pages"], 3)
+
+def note_blocked(dstat: dict, totals: dict, url: str):
+    dstat["pages_blocked"] += 1
+    totals["pages_blocked"] += 1
+    if len(dstat["examples"]["blocked"]) < 3:
+        dstat["examples"]["blocked"].append(url)
+    dstat["pages"] += 1
+
+def count_hints(dstat: dict, totals: dict, hints: dict, url: str):
+    for hint, counter, example in EXAMPLE_KEYS:
+        if not hints.get(hint): continue
+        dstat[counter] += 1
+        if hint == "price_text":
+            totals["pages_with_price_text"] += 1
+        if len(dstat["examples"][example]) < 3: dstat["examples"][example].append(url)
+
+def analyze_page(body: bytes, url: str, first_hit: bool = False, profiles: bool = True) -> dict:
+    """
+    CPU-Teil einer Seite: Parsing, Produkt-Detail-Heuristik und Angebotsauswahl.
+    Reine Funktion mit picklebarem Ergebnis → läuft inline oder im Prozess-Pool.
+    "timings" enthält die Laufzeiten (s) je Stufe, gemessen dort, wo geparst wurde.
+    Das Domain-Profil wird aus der URL bestimmt (profiles=False → nur Kaskade).
+    """
+    t0 = time.perf_counter()
+    page = Page(body, url)
+    profile = profile_for(urlparse(url).netloc) if profiles else None
+    t1 = time.perf_counter()
+    ext: dict[str, float] = {}
+    parsed = parse_structured(page, first_hit=first_hit, timings=ext, profile=profile)
+    hints = parsed.get("hints") or {}
+    products = parsed.get("products") or []
+    t2 = time.perf_counter()
+    # best_offer, Fallback normalize_offer (price_text-Treffer)
+    offers = [best_offer(p) or normalize_offer(p.get("offers") or {}) for p in products]
+    t3 = time.perf_counter()
+    product_like = looks_product_detail(page, hints)
+    t4 = time.perf_counter()
+    timings = {"page_parse": t1 - t0, **{f"extract.{k}": v for k, v in ext.items()},
+               "offers": t3 - t2, "product_detail": t4 - t3}
+    return {
+        "hints": hints,
+        "links": parsed.get("links") or [],
+        "products": products,
+        "offers": offers,
+        "product_like": product_like,
+        "og_title": page.og_title,
+        "profile": profile.key if profile else None,
+        "timings": timings,
+    }
+
+def parse_cache_version() -> str:
+    """Ändert sich mit dem Extraktor-Code und den Parser-Bibliotheken → alte Analysen ungültig."""
+    from importlib.metadata import version
+    libs = []
+    for lib in ("extruct", "lxml"):
+        try:
+            libs.append(f"{lib}={version(lib)}")
+        except Exception:
+            libs.append(f"{lib}=-")
+    return code_version(Path(__file__), Path(vendor_profiles.__file__),
+                        extra=";".join(libs) + f";extruct_active={HAS_EXSTRUCT}")
+
+async def analyze(ctx: CrawlCtx, body: bytes, url: str) -> dict:
+    pc = ctx.parse_cache
+    if pc is not None:
+        t0 = time.perf_counter()
+        key = pc.key(url, body, f"first_hit={ctx.first_hit};profiles={ctx.profiles}")
+        res = pc.get(key, len(body))
+        if res is not None:
+            res["timings"] = {"parse_cache": time.perf_counter() - t0}
+            return res
+    res = None
+    if ctx.pool is not None:
+        try:
+            res = await asyncio.get_running_loop().run_in_executor(ctx.pool, analyze_page, body, url, ctx.first_hit, ctx.profiles)
+        except BrokenProcessPool:
+            ctx.pool = None  # Pool defekt → inline weiter
+    if res is None:
+        res = analyze_page(body, url, ctx.first_hit, ctx.profiles)
+    if pc is not None:
+        pc.put(key, {k: v for k, v in res.items() if k != "timings"})
+    return res
+
+def items_from_products(ctx: CrawlCtx, dstat: dict, products: list, offers: list, og_title: str, url: str) -> list[dict]:
+    items = []
+    for prod, offer in zip(products, offers):
+        name = (prod.get("name") or "").strip()
+        if not name:
+            # try OG title
+            name = og_title
+
+        if not name:
+            continue
+
+        w_g = extract_weight_g(prod)
+        cls = classify_product(name, w_g)
+        if not cls:
+            # Toleranz: 100g im Namen ohne "Barren" trotzdem als 100g werten
+            if w_g and 95 <= w_g <= 105:
+                cls = "bar-100g"
+            else:
+                continue
+
+        if not offer:
+            continue
+
+        dstat["offers"] += 1
+        price = offer["price"]; cur = offer["currency"]
+
+        # USD → EUR
+        if cur == "USD":
+            price = price / ctx.eurusd; cur = "EUR"
+        if cur != "EUR":
+            continue
+
+        item = {
+            "product": cls,
+            "name": name,
+            "weight_g": round(w_g, 3) if w_g else None,
+            "price": {"value": round(price, 2), "currency": "EUR", "shipping_included": offer["shipping_included"]},
+            "availability": offer["availability"] or "Unknown",
+            "checked_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "source": "structured_or_fallback",
+            "url": url
+        }
+
+        if ctx.spot_eur_per_g and w_g and ctx.spot_eur_per_g > 0:
+            item["premium"] = premium_ratio(price, ctx.spot_eur_per_g * w_g)
+
+        items.append(item)
+    return items
+
+def premium_ratio(price: float, fair: float) -> float | None:
+    prem = (price / fair) - 1.0
+    return round(prem, 4) if -0.2 <= prem <= 2.0 else None
+
+def reprice(ctx: CrawlCtx, item: dict) -> dict:
+    """Item aus dem letzten Lauf übernehmen, Aufpreis gegen den Spot dieses Laufs."""
+    item = {k: v for k, v in item.items() if k != "premium"}
+    w_g = item.get("weight_g")
+    if ctx.spot_eur_per_g and w_g and ctx.spot_eur_per_g > 0:
+        item["premium"] = premium_ratio(item["price"]["value"], ctx.spot_eur_per_g * w_g)
+    return item
+
+def best_per_product(items: list[dict]) -> list[dict]:
+    best = {}
+    for it in items:
+        p = it["product"]
+        if p not in best:
+            best[p] = it
+        else:
+            # bevorzugt kleinstes Premium; sonst kleinster Preis
+            a, b = best[p], it
+            pa = a.get("premium"); pb = b.get("premium")
+            if pa is None and pb is not None:
+                best[p] = b
+            elif pa is not None and pb is not None and pb < pa:
+                best[p] = b
+            elif pa is None and pb is None and b["price"]["value"] < a["price"]["value"]:
+                best[p] = b
+    return list(best.values())
+
+async def crawl_domain(ctx: CrawlCtx, dstat: dict, vendor: dict):
+    domain = dstat["domain"]
+    totals = ctx.totals
+    breaker = ctx.breakers.get(domain)
+
+    known, urls, prefetched = [], [], {}
+    if breaker and breaker.is_open:
+        # Circuit offen und Cooldown läuft: keine Discovery, keine Seiten
+        breaker.skipped += breaker.last_urls
+        dstat["discovery"] = {}
+        dstat["notes"].append(f"circuit open ({breaker.reason}): Domain übersprungen")
+    else:
+        # robots.txt einmal je Domain laden (Discovery-Store oder gemeinsamer Client)
+        with ctx.timer.span("robots", domain):
+            dstat["discovery"] = {"robots": await load_robots(ctx, domain)}
+        ctx.pacer.set_crawl_delay(domain, robots_crawl_delay(domain))
+
+        known = ctx.url_index.known_good(domain, MAX_URLS_PER_DOMAIN) if ctx.refresh_only and ctx.url_index else []
+        if known:
+            # nur bekannte Produktseiten neu holen, keine Seeds/Sitemaps/Startseite
+            urls = known
+            dstat["discovery"]["refresh"] = {"known": len(known)}
+        else:
+            if ctx.refresh_only:
+                dstat["notes"].append("refresh-only: keine bekannten Produkt-URLs → volle Discovery")
+            urls = await find_candidate_urls(ctx, domain, dstat, prefetched)
+        if breaker:
+            breaker.last_urls = len(urls)
+    seen = set()
+    fetched_ok = set()
+    # je URL genau ein Fetch: Fetcher und ItemList-Fanout teilen sich die laufenden Abrufe,
+    # Link-Seiten aus der Discovery (Seeds/Startseite) werden wiederverwendet
+    claimed: dict[str, asyncio.Future] = {}
+
+    def fetch_once(u: str) -> asyncio.Future:
+        if u not in claimed:
+            claimed[u] = asyncio.ensure_future(fetch_page(ctx, domain, u, prefetched.pop(u, None)))
+        return claimed[u]
+
+    # Pipeline: Fetcher läuft bis zu PIPELINE_DEPTH Seiten voraus und startet die
+    # Analyse sofort (ggf. im Prozess-Pool); ausgewertet wird streng in URL-Reihenfolge.
+    queue: asyncio.Queue = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+
+    async def produce():
+        for i, u in enumerate(urls):
+            if breaker and breaker.is_open:
+                breaker.skipped += len(urls) - i
+                dstat["notes"].append(f"circuit open ({breaker.reason}): {len(urls) - i} URLs übersprungen")
+                break
+            if u in claimed: continue  # Dublette oder schon als ItemList-Link geholt
+            pu = urlparse(u)
+            if pu.netloc and not pu.netloc.endswith(domain): continue
+            if not robots_ok(domain, u):
+                await queue.put((u, "robots", None, None)); continue
+            r, early = await fetch_once(u)
+            if not r or r.status_code != 200 or not r.content:
+                await queue.put((u, "bad", r, None)); continue
+            if r.extensions["blocked"]:
+                await queue.put((u, "blocked", r, None)); continue
+            if early is not None:
+                pending = asyncio.get_running_loop().create_future()
+                pending.set_result(early)  # schon aus dem <head> ausgewertet
+            else:
+                pending = asyncio.ensure_future(analyze(ctx, r.content, u))
+            await queue.put((u, "ok", r, pending))
+        await queue.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (job := await queue.get()) is not None:
+            u, kind, r, pending = job
+            if u in seen:
+                # bereits als ItemList-Link verarbeitet
+                if pending: pending.cancel()
+                continue
+            seen.add(u)
+            if kind == "robots":
+                dstat["notes"].append(f"blocked robots: {u}")
+                continue
+
+            if kind == "bad":
+                dstat["notes"].append(f"bad status: {u} ({getattr(r,'status_code',None)})")
+                if ctx.url_index: ctx.url_index.record(domain, u, getattr(r, "status_code", None))
+                continue
+
+            if kind == "blocked":
+                note_blocked(dstat, totals, u)
+                if ctx.url_index: ctx.url_index.record(domain, u, r.status_code, blocked=True)
+                continue
+
+            dstat["pages"] += 1
+            fetched_ok.add(u)
+
+            res = await pending
+            ctx.timer.record_many(domain, res["timings"])
+
+            # Hints + Beispiele
+            count_hints(dstat, totals, res["hints"], u)
+            count_profile(dstat, res)
+
+            # Produkt-Detail-Heuristik
+            if res["product_like"]:
+                dstat["pages_product_like"] += 1
+                totals["pages_product_like"] += 1
+                if len(dstat["examples"]["product_like"]) < 3:
+                    dstat["examples"]["product_like"].append(u)
+
+            products = list(res["products"])
+            offers = list(res["offers"])
+
+            # geringes Fanout von ItemList-Links
+            for link in res["links"][:6]:
+                if link in seen: continue
+                if not robots_ok(domain, link): continue
+                r2, early2 = await fetch_once(link)  # läuft der Fetcher schon darauf, kein zweiter Request
+                seen.add(link)
+                if not (r2 and r2.status_code==200 and r2.content):
+                    continue
+                if r2.extensions["blocked"]:
+                    note_blocked(dstat, totals, link)
+                    continue
+                dstat["pages"] += 1
+                res2 = early2 or await analyze(ctx, r2.content, link)
+                ctx.timer.record_many(domain, res2["timings"])
+                count_hints(dstat, totals, res2["hints"], link)
+                count_profile(dstat, res2)
+                products.extend(res2["products"]); offers.extend(res2["offers"])
+
+            dstat["products"] += len(products)
+
+            # Produkte in Items umsetzen
+            with ctx.timer.span("items", domain):
+                items = items_from_products(ctx, dstat, products, offers, res["og_title"], u)
+            vendor["items"].extend(items)
+            if ctx.url_index: ctx.url_index.record(domain, u, r.status_code, offers=len(items))
+    finally:
+        producer.cancel()
+        for fut in claimed.values(): fut.cancel()
+
+    # alle Beobachtungen in die Preis-Historie, danach bestes Angebot je Produkt (pro Vendor)
+    if ctx.prices: ctx.prices.append(domain, vendor["items"])
+    if ctx.url_index: ctx.url_index.commit()
+    if ctx.parse_cache: ctx.parse_cache.commit()
+    if known or (ctx.refresh_only and breaker and breaker.start_state == "open"):
+        # Seiten, die diesmal nicht geholt werden konnten: letztes Item mit neuem Aufpreis
+        carried = [reprice(ctx, it) for it in ctx.previous.get(domain, []) if it.get("url") not in fetched_ok]
+        dstat["discovery"].setdefault("refresh", {"known": len(known)})["carried"] = len(carried)
+        vendor["items"].extend(carried)
+    vendor["items"] = best_per_product(vendor["items"])
+
+    dstat["items"] += len(vendor["items"])
+    dstat["timing"] = ctx.timer.domain_summary(domain)
+    dstat["rate_limit"] = ctx.pacer.summary(domain)
+    if ctx.max_body:
+        dstat["stream"] = ctx.stream_stats.get(domain) or new_stream_stats()
+    if breaker:
+        dstat["breaker"] = breaker.summary()
+    totals["pages"]              += dstat["pages"]
+    totals["products"]           += dstat["products"]
+    totals["offers"]             += dstat["offers"]
+    totals["items"]              += dstat["items"]
+    totals["pages_blocked"]      += dstat["pages_blocked"]
+    totals["pages_product_like"] += dstat["pages_product_like"]
+
 # --------------------------------- Main -----------------------------------
 
-def main():
-    out = {
+async def crawl(out: dict, args: argparse.Namespace, client: httpx.AsyncClient | None = None,
+                spot: dict | None = None, eurusd: float | None = None):
+    """
+    Crawl aller WHITELIST-Domains nach out. pipeline.py reicht den gemeinsamen Client,
+    den im selben Lauf geholten Spot und den ECB-Kurs herein; sonst spot.json + eigener Client.
+    """
+    if client is None:
+        async with httpx.AsyncClient(http2=True, transport=http_transport(args)) as client:
+            return await crawl(out, args, client, spot, eurusd)
+    out["diagnostics"]["spot"] = {"source": "run" if spot is not None else "spot.json"}
+    spot = load_spot_json() if spot is None else spot
+    out["diagnostics"]["spot"]["spot_date"] = spot.get("spot_date")
+    out["diagnostics"]["spot"]["usd_per_kg"] = spot_usd_per_kg_from(spot)
+    cache = None if args.no_cache else HttpCache(CACHE_DIR / "http_cache.sqlite3")
+    discovery = None if args.no_cache else DiscoveryStore(CACHE_DIR / "discovery.sqlite3")
+    parse_cache = None if args.no_cache or args.no_parse_cache else \
+        ParseCache(CACHE_DIR / "parse_cache.sqlite3", parse_cache_version())
+    ctx = CrawlCtx(client=client, pacer=Pacer(args.max_inflight, min_interval=args.min_delay), totals=out["diagnostics"]["totals"],
+                   first_hit=args.first_hit, cache=cache, url_index=UrlIndex(CACHE_DIR / "frontier.sqlite3"),
+                   discovery=discovery, parse_cache=parse_cache,
+                   prices=None if args.no_history else PriceStore(CACHE_DIR / "prices.sqlite3"))
+    ctx.max_body = args.max_body if args.stream else None
+    ctx.profiles = not args.no_profiles
+    breakers = None
+    if args.breaker_threshold > 0:
+        breakers = None if args.no_cache else BreakerStore(CACHE_DIR / "breakers.sqlite3",
+                                                           args.breaker_threshold, args.breaker_cooldown)
+        ctx.breakers = {d: breakers.load(d) if breakers else Breaker(d, args.breaker_threshold, args.breaker_cooldown)
+                        for d in WHITELIST}
+    out["diagnostics"]["mode"] = "refresh-only" if args.refresh_only else "full"
+    if args.refresh_only:
+        ctx.refresh_only = True
+        prev = load_previous_output()
+        ctx.previous = {v["domain"]: v.get("items") or [] for v in prev.get("vendors") or []}
+        out["diagnostics"]["last_discovery"] = (prev.get("diagnostics") or {}).get("last_discovery") or prev.get("generated")
+    else:
+        out["diagnostics"]["last_discovery"] = out["generated"]
+    ctx.eurusd = eurusd or await ecb_eurusd(ctx)
+    out["fx"]["EURUSD"] = ctx.eurusd
+
+    ctx.spot_eur_per_g = spot_eur_per_g_from(spot, ctx.eurusd)
+
+    # Reihenfolge von vendors/diagnostics bleibt WHITELIST-Reihenfolge
+    jobs = []
+    for domain in WHITELIST:
+        dstat = new_dstat(domain)
+        out["diagnostics"]["domains"].append(dstat)
+        out["diagnostics"]["totals"]["domains"] += 1
+        vendor = {"domain": domain, "trust": 98 if domain == "philoro.de" else 90, "items": []}
+        out["vendors"].append(vendor)
+        jobs.append((dstat, vendor))
+
+    workers = (os.cpu_count() or 1) if args.workers < 0 else args.workers
+    ctx.pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    try:
+        if not args.serial:
+            # Domains parallel; innerhalb einer Domain seriell mit Mindestabstand
+            await asyncio.gather(*(crawl_domain(ctx, d, v) for d, v in jobs))
+        else:
+            for d, v in jobs:
+                await crawl_domain(ctx, d, v)
+    finally:
+        if ctx.pool: ctx.pool.shutdown(cancel_futures=True)
+
+    out["diagnostics"]["timing"] = ctx.timer.summary()
+    prof = [d["profile"] for d in out["diagnostics"]["domains"] if d.get("profile")]
+    pages, hits = sum(p["pages"] for p in prof), sum(p["hits"] for p in prof)
+    out["diagnostics"]["profiles"] = {"enabled": ctx.profiles, "pages": pages, "hits": hits,
+                                      "hit_rate": round(hits / pages, 3) if pages else None}
+    if ctx.max_body:
+        tot = new_stream_stats()
+        for st in ctx.stream_stats.values():
+            for k, v in st.items(): tot[k] += v
+        out["diagnostics"]["stream"] = {"max_body": ctx.max_body, **tot}
+    if cache:
+        out["diagnostics"]["cache"] = cache.summary()
+        cache.close()
+    if discovery:
+        out["diagnostics"]["discovery_store"] = discovery.summary()
+        discovery.close()
+    if parse_cache:
+        out["diagnostics"]["parse_cache"] = parse_cache.summary()
+        parse_cache.close()
+    if ctx.breakers:
+        bs = [d["breaker"] for d in out["diagnostics"]["domains"] if d.get("breaker")]
+        out["diagnostics"]["breakers"] = {
+            "threshold": args.breaker_threshold, "cooldown_s": args.breaker_cooldown,
+            "open": [d for d, b in ctx.breakers.items() if b.is_open],
+            "skipped": sum(b["skipped"] for b in bs), "saved_s_est": round(sum(b["saved_s_est"] for b in bs), 1)}
+        if breakers:
+            for b in ctx.breakers.values(): breakers.save(b)
+            breakers.close()
+    ctx.url_index.close()
+    if ctx.prices:
+        out["diagnostics"]["price_store"] = {"appended": ctx.prices.appended, "rows": ctx.prices.stats()["rows"]}
+        ctx.prices.close()
+
+def http_transport(args: argparse.Namespace) -> httpx.AsyncBaseTransport | None:
+    """--record/--replay (http_replay.py); None = normaler HTTP/2-Transport."""
+    import http_replay as hr
+    if getattr(args, "record", None):
+        return hr.RecordingTransport(Path(args.record))
+    src = getattr(args, "replay", None)
+    if not src:
+        return None
+    if src.startswith(("http://", "https://")):
+        return hr.LocalServerTransport(src)
+    return hr.ReplayTransport(hr.load_archive(src),
+                              hr.Injector(args.replay_latency, 0.0, args.replay_errors, args.replay_error_kind))
+
+def load_previous_output() -> dict:
+    try:
+        return json.loads((DATA_DIR / "vendors_auto.json").read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+def new_output() -> dict:
+    return {
         "generated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "fx": {},
         "products": ["bar-100g","coin-1oz-maple","coin-1oz-krugerrand","coin-1oz"],
@@ -516,223 +1538,47 @@ def main():
         }
     }
 
-    spot_usd_per_kg = get_spot_usd_per_kg()
-    with httpx.Client(http2=True) as client:
-        eurusd = ecb_eurusd(client)
-        out["fx"]["EURUSD"] = eurusd
-
-        spot_eur_per_g = None
-        if spot_usd_per_kg:
-            usd_per_g = spot_usd_per_kg / 1000.0
-            eur_per_g = usd_per_g / eurusd
-            spot_eur_per_g = eur_per_g
-
-        for domain in WHITELIST:
-            dstat = {
-                "domain": domain, "pages": 0, "products": 0, "offers": 0, "items": 0, "notes": [],
-                "pages_with_jsonld": 0, "pages_with_micro": 0, "pages_with_og": 0, "pages_with_itemprop": 0,
-                "pages_with_json_fallback": 0, "pages_with_price_text": 0, "pages_blocked": 0, "pages_product_like": 0,
-                "examples": {"jsonld": [], "micro": [], "og": [], "itemprop": [], "json_fallback": [], "price_text": [], "blocked": [], "product_like": []}
-            }
-            out["diagnostics"]["domains"].append(dstat)
-            out["diagnostics"]["totals"]["domains"] += 1
-
-            vendor = {"domain": domain, "trust": 98 if domain == "philoro.de" else 90, "items": []}
-            urls = find_candidate_urls(client, domain)
-            seen = set()
-
-            for u in urls:
-                pu = urlparse(u)
-                if pu.netloc and not pu.netloc.endswith(domain): continue
-                if u in seen: continue
-                seen.add(u)
-                if not robots_ok(domain, u):
-                    dstat["notes"].append(f"blocked robots: {u}")
-                    continue
-
-                r = fetch(client, u); time.sleep(REQ_DELAY)
-                if not r or r.status_code != 200 or not r.content:
-                    dstat["notes"].append(f"bad status: {u} ({getattr(r,'status_code',None)})")
-                    continue
-
-                if looks_blocked(r.content):
-                    dstat["pages_blocked"] += 1
-                    out["diagnostics"]["totals"]["pages_blocked"] += 1
-                    if len(dstat["examples"]["blocked"]) < 3:
-                        dstat["examples"]["blocked"].append(u)
-                    dstat["pages"] += 1
-                    continue
+def _content(out: dict) -> dict:
+    # was die UI anzeigt: ohne generated/diagnostics und ohne checked_at je Item
+    vendors = [{**v, "items": [{k: x for k, x in it.items() if k != "checked_at"} for it in v.get("items", [])]}
+               for v in out.get("vendors", [])]
+    return {"fx": out.get("fx"), "products": out.get("products"), "vendors": vendors}
 
-                dstat["pages"] += 1
-
-                parsed = parse_structured(r.content, u)
-                hints = parsed.get("hints") or {}
-                doc = html.fromstring(r.content)
-
-                # Hints + Beispiele
-                if hints.get("jsonld"):
-                    dstat["pages_with_jsonld"] += 1
-                    if len(dstat["examples"]["jsonld"]) < 3: dstat["examples"]["jsonld"].append(u)
-                if hints.get("micro_rdfa"):
-                    dstat["pages_with_micro"] += 1
-                    if len(dstat["examples"]["micro"]) < 3: dstat["examples"]["micro"].append(u)
-                if hints.get("og"):
-                    dstat["pages_with_og"] += 1
-                    if len(dstat["examples"]["og"]) < 3: dstat["examples"]["og"].append(u)
-                if hints.get("itemprop"):
-                    dstat["pages_with_itemprop"] += 1
-                    if len(dstat["examples"]["itemprop"]) < 3: dstat["examples"]["itemprop"].append(u)
-                if hints.get("json_fallback"):
-                    dstat["pages_with_json_fallback"] += 1
-                    if len(dstat["examples"]["json_fallback"]) < 3: dstat["examples"]["json_fallback"].append(u)
-                if hints.get("price_text"):
-                    dstat["pages_with_price_text"] += 1
-                    out["diagnostics"]["totals"]["pages_with_price_text"] += 1
-                    if len(dstat["examples"]["price_text"]) < 3: dstat["examples"]["price_text"].append(u)
-
-                # Produkt-Detail-Heuristik
-                if looks_product_detail(doc, hints):
-                    dstat["pages_product_like"] += 1
-                    out["diagnostics"]["totals"]["pages_product_like"] += 1
-                    if len(dstat["examples"]["product_like"]) < 3:
-                        dstat["examples"]["product_like"].append(u)
-
-                products = parsed.get("products") or []
-
-                # geringes Fanout von ItemList-Links
-                for link in (parsed.get("links") or [])[:6]:
-                    if link in seen: continue
-                    if not robots_ok(domain, link): continue
-                    r2 = fetch(client, link); time.sleep(REQ_DELAY)
-                    seen.add(link)
-                    if not (r2 and r2.status_code==200 and r2.content):
-                        continue
-                    if looks_blocked(r2.content):
-                        dstat["pages_blocked"] += 1
-                        out["diagnostics"]["totals"]["pages_blocked"] += 1
-                        if len(dstat["examples"]["blocked"]) < 3:
-                            dstat["examples"]["blocked"].append(link)
-                        dstat["pages"] += 1
-                        continue
-                    dstat["pages"] += 1
-                    parsed2 = parse_structured(r2.content, link)
-                    hints2 = parsed2.get("hints") or {}
-                    if hints2.get("jsonld"):
-                        dstat["pages_with_jsonld"] += 1
-                        if len(dstat["examples"]["jsonld"]) < 3: dstat["examples"]["jsonld"].append(link)
-                    if hints2.get("micro_rdfa"):
-                        dstat["pages_with_micro"] += 1
-                        if len(dstat["examples"]["micro"]) < 3: dstat["examples"]["micro"].append(link)
-                    if hints2.get("og"):
-                        dstat["pages_with_og"] += 1
-                        if len(dstat["examples"]["og"]) < 3: dstat["examples"]["og"].append(link)
-                    if hints2.get("itemprop"):
-                        dstat["pages_with_itemprop"] += 1
-                        if len(dstat["examples"]["itemprop"]) < 3: dstat["examples"]["itemprop"].append(link)
-                    if hints2.get("json_fallback"):
-                        dstat["pages_with_json_fallback"] += 1
-                        if len(dstat["examples"]["json_fallback"]) < 3: dstat["examples"]["json_fallback"].append(link)
-                    if hints2.get("price_text"):
-                        dstat["pages_with_price_text"] += 1
-                        out["diagnostics"]["totals"]["pages_with_price_text"] += 1
-                        if len(dstat["examples"]["price_text"]) < 3: dstat["examples"]["price_text"].append(link)
-
-                    products.extend(parsed2.get("products") or [])
-
-                dstat["products"] += len(products)
-
-                # Produkte in Items umsetzen
-                for prod in products:
-                    name = (prod.get("name") or "").strip()
-                    if not name:
-                        # try OG title
-                        name = (doc.xpath('//meta[@property="og:title"]/@content') or [""])[0].strip()
-
-                    if not name:
-                        continue
-
-                    w_g = extract_weight_g(prod)
-                    cls = classify_product(name, w_g)
-                    if not cls:
-                        # Toleranz: 100g im Namen ohne "Barren" trotzdem als 100g werten
-                        if w_g and 95 <= w_g <= 105:
-                            cls = "bar-100g"
-                        else:
-                            continue
-
-                    offer = best_offer(prod)
-                    if not offer:
-                        # Fallback: wenn wir im price_text getroffen haben, vorher in parse_structured bereits gesetzt
-                        offer = normalize_offer(prod.get("offers") or {})
-                        if not offer:
-                            continue
-
-                    dstat["offers"] += 1
-                    price = offer["price"]; cur = offer["currency"]
-
-                    # USD → EUR
-                    if cur == "USD":
-                        price = price / eurusd; cur = "EUR"
-                    if cur != "EUR":
-                        continue
-
-                    item = {
-                        "product": cls,
-                        "name": name,
-                        "weight_g": round(w_g, 3) if w_g else None,
-                        "price": {"value": round(price, 2), "currency": "EUR", "shipping_included": offer["shipping_included"]},
-                        "availability": offer["availability"] or "Unknown",
-                        "checked_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-                        "source": "structured_or_fallback",
-                        "url": u
-                    }
-
-                    if spot_eur_per_g and w_g and spot_eur_per_g > 0:
-                        fair = spot_eur_per_g * w_g
-                        prem = (price / fair) - 1.0
-                        if -0.2 <= prem <= 2.0:
-                            item["premium"] = round(prem, 4)
-                        else:
-                            item["premium"] = None
-
-                    vendor["items"].append(item)
-
-            # bestes Angebot je Produkt (pro Vendor)
-            best = {}
-            for it in vendor["items"]:
-                p = it["product"]
-                if p not in best:
-                    best[p] = it
-                else:
-                    # bevorzugt kleinstes Premium; sonst kleinster Preis
-                    a, b = best[p], it
-                    pa = a.get("premium"); pb = b.get("premium")
-                    if pa is None and pb is not None:
-                        best[p] = b
-                    elif pa is not None and pb is not None and pb < pa:
-                        best[p] = b
-                    elif pa is None and pb is None and b["price"]["value"] < a["price"]["value"]:
-                        best[p] = b
-
-            vendor["items"] = list(best.values())
-
-            dstat["items"] += len(vendor["items"])
-            out["diagnostics"]["totals"]["pages"]              += dstat["pages"]
-            out["diagnostics"]["totals"]["products"]           += dstat["products"]
-            out["diagnostics"]["totals"]["offers"]             += dstat["offers"]
-            out["diagnostics"]["totals"]["items"]              += dstat["items"]
-            out["diagnostics"]["totals"]["pages_blocked"]      += dstat["pages_blocked"]
-            out["diagnostics"]["totals"]["pages_product_like"] += dstat["pages_product_like"]
-
-            out["vendors"].append(vendor)
-
-    (DATA_DIR / "vendors_auto.json").write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
-    print("Wrote data/vendors_auto.json with", len(out["vendors"]), "vendors")
+def vendors_changed(out: dict, path: Path | None = None) -> bool:
+    """Weichen Items/Produkte/FX von der gespeicherten vendors_auto.json ab? (Zeitstempel und Diagnose zählen nicht)"""
+    try:
+        cur = json.loads((path or DATA_DIR / "vendors_auto.json").read_text(encoding="utf-8"))
+    except Exception:
+        return True
+    return _content(cur) != _content(out)
+
+def main(args: argparse.Namespace | None = None):
+    import run_metrics
+    if args is None:
+        args = parse_args([])
+    out = new_output()
+    t0 = time.perf_counter()
+
+    if args.profile:
+        # cProfile sieht nur diesen Prozess → für Parser-Hotspots mit --workers 0 laufen lassen
+        with RunProfiler(Path(args.profile)):
+            asyncio.run(crawl(out, args))
+        print("Profile written to", args.profile)
+    else:
+        asyncio.run(crawl(out, args))
+
+    if vendors_changed(out):
+        (DATA_DIR / "vendors_auto.json").write_text(json.dumps(out, ensure_ascii=False, indent=2), encoding="utf-8")
+        print("Wrote data/vendors_auto.json with", len(out["vendors"]), "vendors")
+    else:
+        print("data/vendors_auto.json unverändert (nur generated/diagnostics/checked_at neu)")
     print("Diagnostics:", json.dumps(out["diagnostics"], ensure_ascii=False))
+    run_metrics.log_run(run_metrics.vendors_record(out, time.perf_counter() - t0),
+                        path=CACHE_DIR / run_metrics.METRICS_FILE.name)
 
 # ------------------------------ Testmodus ---------------------------------
 
-def run_testmode(url: str):
+def run_testmode(url: str, first_hit: bool = False):
     print(f"[TEST] Fetching {url}")
     with httpx.Client(http2=True, headers=HEADERS, follow_redirects=True, timeout=30) as client:
         r = fetch(client, url)
@@ -741,12 +1587,14 @@ def run_testmode(url: str):
         print(f"[TEST] Status={r.status_code} bytes={len(r.content)}")
         if looks_blocked(r.content):
             print("[TEST] Consent/Bot-Wall erkannt")
-        parsed = parse_structured(r.content, url)
+        page = Page(r.content, url)
+        profile = profile_for(urlparse(url).netloc)
+        parsed = parse_structured(page, first_hit=first_hit, profile=profile)
         hints = parsed.get("hints", {})
+        print("[TEST] Profil:", profile.key if profile else "—", "Treffer" if hints.get("profile") else "")
         print("[TEST] Hints:", hints)
-        doc = html.fromstring(r.content)
-        print("[TEST] H1:", (doc.xpath("//h1/text()") or [""])[0].strip()[:140])
-        is_detail = looks_product_detail(doc, hints)
+        print("[TEST] H1:", page.h1[:140])
+        is_detail = looks_product_detail(page, hints)
         print("[TEST] looks_product_detail:", is_detail)
         # Zeige ersten Preis, falls vorhanden
         for prod in parsed.get("products") or []:
@@ -757,11 +1605,48 @@ def run_testmode(url: str):
                 print("[TEST] OFFER:", off)
                 break
 
-if __name__ == "__main__":
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
     ap = argparse.ArgumentParser()
     ap.add_argument("--test", help="Test a single product URL")
-    args = ap.parse_args()
+    ap.add_argument("--serial", action="store_true", help="Domains nacheinander statt parallel crawlen")
+    ap.add_argument("--max-inflight", type=int, default=MAX_INFLIGHT, help="Max. gleichzeitige Requests (alle Domains)")
+    ap.add_argument("--min-delay", type=float, default=MIN_REQ_DELAY,
+                    help="kleinstes Intervall (s) je Domain, bis zu dem der Pacer bei schnellen Antworten beschleunigt")
+    ap.add_argument("--first-hit", action="store_true",
+                    help="RegEx-/€-Text-Fallback überspringen, sobald JSON-LD/Microdata ein Angebot liefert")
+    ap.add_argument("--no-profiles", action="store_true",
+                    help="Domain-Profile (vendor_profiles.py) auslassen, nur generische Kaskade")
+    ap.add_argument("--refresh-only", action="store_true",
+                    help="nur Produktseiten neu holen, die früher Angebote lieferten (URL-Index), ohne Discovery")
+    ap.add_argument("--stream", action="store_true",
+                    help="Seiten streamen: Abbruch bei Consent-/Bot-Wall oder wenn der <head> schon ein Angebot liefert")
+    ap.add_argument("--max-body", type=int, default=MAX_BODY_BYTES, metavar="BYTES",
+                    help="mit --stream: höchstens so viele Bytes je Seite lesen")
+    ap.add_argument("--no-cache", action="store_true", help="HTTP-Revalidierungs-Cache und Discovery-Store (.cache/) nicht verwenden")
+    ap.add_argument("--no-parse-cache", action="store_true",
+                    help="jede Seite neu analysieren (Analyse-Cache .cache/parse_cache.sqlite3 aus)")
+    ap.add_argument("--breaker-threshold", type=int, default=DEFAULT_THRESHOLD, metavar="N",
+                    help="Domain nach N Timeouts/5xx/Walls in Folge überspringen (0 = aus)")
+    ap.add_argument("--breaker-cooldown", type=float, default=DEFAULT_COOLDOWN, metavar="S",
+                    help="so lange (s) bleibt eine offene Domain in späteren Läufen aus, dann eine Probe")
+    ap.add_argument("--no-history", action="store_true",
+                    help="Items nicht an die Preis-Historie (.cache/prices.sqlite3) anhängen")
+    ap.add_argument("--workers", type=int, default=0,
+                    help="Parser-Prozesse parallel zum Fetchen (0 = im Crawl-Prozess, -1 = alle Kerne)")
+    rec = ap.add_mutually_exclusive_group()
+    rec.add_argument("--record", metavar="ARCHIVE", help="allen HTTP-Verkehr in ein Archiv (.jsonl.gz) mitschneiden")
+    rec.add_argument("--replay", metavar="ARCHIVE|URL",
+                     help="aus Archiv abspielen ('corpus' = bench/corpus/) oder lokalen Mock-Server (http://…) nutzen")
+    ap.add_argument("--replay-latency", type=float, default=0.0, metavar="S", help="mit --replay ARCHIVE: Latenz je Request")
+    ap.add_argument("--replay-errors", type=float, default=0.0, metavar="RATE", help="mit --replay ARCHIVE: Fehleranteil 0..1")
+    ap.add_argument("--replay-error-kind", choices=("timeout", "503", "429", "mix"), default="timeout")
+    ap.add_argument("--profile", nargs="?", const=str(ROOT / "profile"), default=None, metavar="DIR",
+                    help="cProfile- und tracemalloc-Report des Laufs nach DIR schreiben (Standard: profile/)")
+    return ap.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
     if args.test:
-        run_testmode(args.test)
+        run_testmode(args.test, first_hit=args.first_hit)
         sys.exit(0)
-    main()
+    main(args)